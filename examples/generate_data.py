@@ -3,7 +3,7 @@ from pyonda.utils.schemas import (
     ONDA_SIGNALS_SCHEMA,
     timespan_namedtuple,
 )
-from pyonda.utils.processing import convert_python_uuid_to_uuid_bytestring
+from pyonda.utils.processing import encode_julia_uuid_array
 
 from pyonda.save_arrow import save_table_to_arrow_file
 from pyonda.save_lpcm import save_array_to_lpcm_file
@@ -32,8 +32,8 @@ print("Original annotations UUIDs:", original_annot_uuids)
 
 # Reverse bytes for UUIDs
 rows = {
-    "recording": [convert_python_uuid_to_uuid_bytestring(original_record_uuid)] * 3,
-    "id": [convert_python_uuid_to_uuid_bytestring(x) for x in original_annot_uuids],
+    "recording": encode_julia_uuid_array([original_record_uuid] * 3),
+    "id": encode_julia_uuid_array(original_annot_uuids),
     "span": [
         timespan_namedtuple(start=int(n * 30 * (1e9)), stop=int((n + 1) * 30 * (1e9)))
         for n in range(3)
@@ -61,8 +61,8 @@ save_array_to_lpcm_file(proba_array, data_folder / "array_test.lpcm")
 original_signal_uuid = uuid.uuid4()
 print(str(data_folder / "array_test.lpcm"))
 rows = {
-    "recording": [convert_python_uuid_to_uuid_bytestring(original_record_uuid)],
-    "id": [convert_python_uuid_to_uuid_bytestring(original_signal_uuid)],
+    "recording": encode_julia_uuid_array([original_record_uuid]),
+    "id": encode_julia_uuid_array([original_signal_uuid]),
     "file_path": [str(data_folder / "array_test.lpcm")],
     "file_format": ["lpcm"],
     "span": [timespan_namedtuple(start=0, stop=int(300 * (1e9)))],
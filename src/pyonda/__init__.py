@@ -0,0 +1,2 @@
+# register the arrow extension types of the Onda.jl tables (JuliaLang.UUID, JuliaLang.TimeSpan)
+from pyonda.utils import extension_types
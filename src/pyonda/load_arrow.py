@@ -1,12 +1,117 @@
 import pyarrow as pa
+import pyarrow.compute as pc
 
 from pyonda.utils.s3_download import download_s3_fileobj
-from pyonda.utils.processing import arrow_to_processed_pandas
+from pyonda.utils.processing import arrow_to_processed_pandas, encode_julia_uuid_array
 
 from botocore.client import BaseClient
 
+RECORDING_COLUMN = "recording"
+DEFAULT_CHUNK_ROWS = 2**16
 
-def load_table_from_arrow_file_buffer(buffer, processed_pandas=True):
+
+def _filter_record_batch(batch, recordings):
+    """Keep the rows of a record batch whose recording is in recordings (julia byte order UUIDs)"""
+    recording_column = batch.column(RECORDING_COLUMN)
+    if isinstance(recording_column, pa.ExtensionArray):
+        recording_column = recording_column.storage
+    return batch.filter(pc.is_in(recording_column, value_set=recordings))
+
+
+def _selected_schema(reader, columns=None):
+    """Schema of the columns selected from an arrow file (schema metadata kept)"""
+    if columns is None:
+        return reader.schema
+    schema = pa.schema([reader.schema.field(name) for name in columns])
+    return schema.with_metadata(reader.schema.metadata)
+
+
+def iter_filtered_record_batches(reader, columns=None, recordings=None):
+    """Iterate over the record batches of an arrow file keeping only some columns and the rows of some recordings.
+    Columns are selected and rows filtered batch by batch, so that unused data is never materialized.
+
+    Parameters
+    ----------
+    reader : pyarrow.ipc.RecordBatchFileReader
+        opened arrow file
+    columns : list of str, optional
+        names of the columns to keep, by default all columns
+    recordings : iterable, optional
+        recording UUIDs (uuid.UUID or hex strings) of the rows to keep, by default all rows
+
+    Yields
+    ------
+    batch: pyarrow.RecordBatch
+        selected columns and rows of a record batch of the file
+    """
+    columns = reader.schema.names if columns is None else list(columns)
+    read_columns = list(columns)
+    if recordings is not None:
+        if RECORDING_COLUMN not in reader.schema.names:
+            raise ValueError(
+                f"Cannot filter recordings of a table without {RECORDING_COLUMN} column"
+            )
+        recordings = encode_julia_uuid_array(list(recordings))
+        if RECORDING_COLUMN not in read_columns:
+            read_columns.append(RECORDING_COLUMN)
+
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i).select(read_columns)
+        if recordings is not None:
+            batch = _filter_record_batch(batch, recordings)
+        yield batch.select(columns)
+
+
+def read_filtered_table(reader, columns=None, recordings=None):
+    """Read an arrow file keeping only some columns and the rows of some recordings (cf. iter_filtered_record_batches)
+
+    Parameters
+    ----------
+    reader : pyarrow.ipc.RecordBatchFileReader
+        opened arrow file
+    columns : list of str, optional
+        names of the columns to keep, by default all columns
+    recordings : iterable, optional
+        recording UUIDs (uuid.UUID or hex strings) of the rows to keep, by default all rows
+
+    Returns
+    -------
+    table: pyarrow.Table
+        selected columns and rows
+    """
+    if columns is None and recordings is None:
+        return reader.read_all()
+    return pa.Table.from_batches(
+        iter_filtered_record_batches(reader, columns, recordings),
+        schema=_selected_schema(reader, columns),
+    )
+
+
+def _iter_table_chunks(reader, chunk_rows, columns=None, recordings=None):
+    """Regroup the filtered record batches of an arrow file in tables of chunk_rows rows (zero-copy slices)"""
+    if chunk_rows <= 0:
+        raise ValueError(f"chunk_rows should be > 0 (you have {chunk_rows})")
+    schema = _selected_schema(reader, columns)
+    pieces = []
+    n_rows = 0
+    for batch in iter_filtered_record_batches(reader, columns, recordings):
+        offset = 0
+        while offset < batch.num_rows:
+            piece = batch.slice(offset, chunk_rows - n_rows)
+            pieces.append(piece)
+            n_rows += piece.num_rows
+            offset += piece.num_rows
+            if n_rows == chunk_rows:
+                yield pa.Table.from_batches(pieces, schema=schema)
+                pieces = []
+                n_rows = 0
+    if n_rows > 0:
+        yield pa.Table.from_batches(pieces, schema=schema)
+
+
+def load_table_from_arrow_file_buffer(
+    buffer, processed_pandas=True, columns=None, recordings=None
+):
     """Load arrow table into pyarrow table or pandas dataframe with a processing step
 
     Parameters
@@ -16,18 +121,24 @@ def load_table_from_arrow_file_buffer(buffer, processed_pandas=True):
 
     processed_pandas : bool, optional
         if True apply arrow_to_processed_pandas to loaded table, by default True
+    columns : list of str, optional
+        names of the columns to load, by default all columns
+    recordings : iterable, optional
+        recording UUIDs (uuid.UUID or hex strings) of the rows to load, by default all rows
 
     Returns
     -------
     dataframe: pandas.DataFrame
         table contents loaded into a pandas DataFrame
     """
-    table = pa.ipc.open_file(buffer).read_all()
+    table = read_filtered_table(pa.ipc.open_file(buffer), columns, recordings)
     table = arrow_to_processed_pandas(table) if processed_pandas else table
     return table
 
 
-def load_table_from_arrow_file(path_to_table, processed_pandas=True):
+def load_table_from_arrow_file(
+    path_to_table, processed_pandas=True, columns=None, recordings=None
+):
     """Load arrow table into pyarrow table or pandas dataframe with a processing step
 
     Parameters
@@ -36,6 +147,10 @@ def load_table_from_arrow_file(path_to_table, processed_pandas=True):
         path to arrow table
     processed_pandas : bool, optional
         if True apply arrow_to_processed_pandas to loaded table, by default True
+    columns : list of str, optional
+        names of the columns to load, by default all columns
+    recordings : iterable, optional
+        recording UUIDs (uuid.UUID or hex strings) of the rows to load, by default all rows
 
     Returns
     -------
@@ -43,12 +158,16 @@ def load_table_from_arrow_file(path_to_table, processed_pandas=True):
         table contents loaded into a pandas DataFrame
     """
     return load_table_from_arrow_file_buffer(
-        pa.memory_map(str(path_to_table), "r"), processed_pandas
+        pa.memory_map(str(path_to_table), "r"), processed_pandas, columns, recordings
     )
 
 
 def load_table_from_arrow_file_in_s3(
-    table_url, processed_pandas=True, client: BaseClient = None
+    table_url,
+    processed_pandas=True,
+    client: BaseClient = None,
+    columns=None,
+    recordings=None,
 ):
     """Load arrow table from S3 into pyarrow table or pandas dataframe with a processing step
 
@@ -59,7 +178,11 @@ def load_table_from_arrow_file_in_s3(
     processed_pandas : bool, optional
         if True apply arrow_to_processed_pandas to loaded table, by default True
     client: BaseClient, default=None
-        boto3 client instance
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+    columns : list of str, optional
+        names of the columns to load, by default all columns
+    recordings : iterable, optional
+        recording UUIDs (uuid.UUID or hex strings) of the rows to load, by default all rows
 
     Returns
     -------
@@ -67,4 +190,110 @@ def load_table_from_arrow_file_in_s3(
         table contents loaded into a pandas DataFrame
     """
     table_buf = download_s3_fileobj(table_url, client)
-    return load_table_from_arrow_file_buffer(table_buf, processed_pandas)
+    return load_table_from_arrow_file_buffer(
+        table_buf, processed_pandas, columns, recordings
+    )
+
+
+def iter_tables_from_arrow_file_buffer(
+    buffer,
+    chunk_rows=DEFAULT_CHUNK_ROWS,
+    processed_pandas=True,
+    columns=None,
+    recordings=None,
+):
+    """Load arrow table by chunks of rows into pyarrow tables or pandas dataframes with a processing step,
+    so that memory usage is bounded by the chunk size instead of the table size
+
+    Parameters
+    ----------
+    buffer : io.BytesIO or pyarrow.MemoryMappedFile
+        Used to fill the array with data.
+    chunk_rows : int, optional
+        number of rows per chunk (the last chunk can be smaller), by default DEFAULT_CHUNK_ROWS
+    processed_pandas : bool, optional
+        if True apply arrow_to_processed_pandas to each chunk, by default True
+    columns : list of str, optional
+        names of the columns to load, by default all columns
+    recordings : iterable, optional
+        recording UUIDs (uuid.UUID or hex strings) of the rows to load, by default all rows
+
+    Yields
+    ------
+    chunk: pandas.DataFrame or pyarrow.Table
+        chunk_rows rows of the table
+    """
+    reader = pa.ipc.open_file(buffer)
+    for table in _iter_table_chunks(reader, chunk_rows, columns, recordings):
+        yield arrow_to_processed_pandas(table) if processed_pandas else table
+
+
+def iter_tables_from_arrow_file(
+    path_to_table,
+    chunk_rows=DEFAULT_CHUNK_ROWS,
+    processed_pandas=True,
+    columns=None,
+    recordings=None,
+):
+    """Load memory mapped arrow table by chunks of rows into pyarrow tables or pandas dataframes
+    with a processing step, so that memory usage is bounded by the chunk size instead of the table size
+
+    Parameters
+    ----------
+    path_to_table : str or Path
+        path to arrow table
+    chunk_rows : int, optional
+        number of rows per chunk (the last chunk can be smaller), by default DEFAULT_CHUNK_ROWS
+    processed_pandas : bool, optional
+        if True apply arrow_to_processed_pandas to each chunk, by default True
+    columns : list of str, optional
+        names of the columns to load, by default all columns
+    recordings : iterable, optional
+        recording UUIDs (uuid.UUID or hex strings) of the rows to load, by default all rows
+
+    Yields
+    ------
+    chunk: pandas.DataFrame or pyarrow.Table
+        chunk_rows rows of the table
+    """
+    with pa.memory_map(str(path_to_table), "r") as source:
+        yield from iter_tables_from_arrow_file_buffer(
+            source, chunk_rows, processed_pandas, columns, recordings
+        )
+
+
+def iter_tables_from_arrow_file_in_s3(
+    table_url,
+    chunk_rows=DEFAULT_CHUNK_ROWS,
+    processed_pandas=True,
+    client: BaseClient = None,
+    columns=None,
+    recordings=None,
+):
+    """Load arrow table from S3 by chunks of rows into pyarrow tables or pandas dataframes with a processing step.
+    The object is downloaded in memory, or memory mapped if the S3 disk cache is enabled (cf. pyonda.utils.s3_cache)
+
+    Parameters
+    ----------
+    table_url : str
+        S3 URL to table
+    chunk_rows : int, optional
+        number of rows per chunk (the last chunk can be smaller), by default DEFAULT_CHUNK_ROWS
+    processed_pandas : bool, optional
+        if True apply arrow_to_processed_pandas to each chunk, by default True
+    client: BaseClient, default=None
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+    columns : list of str, optional
+        names of the columns to load, by default all columns
+    recordings : iterable, optional
+        recording UUIDs (uuid.UUID or hex strings) of the rows to load, by default all rows
+
+    Yields
+    ------
+    chunk: pandas.DataFrame or pyarrow.Table
+        chunk_rows rows of the table
+    """
+    table_buf = download_s3_fileobj(table_url, client)
+    yield from iter_tables_from_arrow_file_buffer(
+        table_buf, chunk_rows, processed_pandas, columns, recordings
+    )
@@ -1,11 +1,27 @@
 import numpy as np
 import io
+import os
 
-from pyonda.utils.s3_download import download_s3_fileobj
+from pyonda.utils.s3_download import (
+    download_s3_fileobj,
+    download_s3_byte_range,
+    get_s3_object_size,
+)
+from pyonda.utils.lpcm_layout import (
+    check_lpcm_array_length,
+    n_samples_from_byte_size,
+    resolve_sample_range,
+    plan_lpcm_window,
+    merge_byte_ranges,
+    read_byte_ranges,
+    lpcm_window_from_flat_array,
+)
+from pyonda.utils.zstd_seekable import read_seek_table, decompress_seekable_zst_range
 from pyonda.utils.decompression import (
-    decompress_zstandard_file_to_stream,
-    decompress_zstandard_stream_to_stream,
+    decompress_zstandard_file_to_array,
+    decompress_zstandard_stream_to_array,
 )
+from pyonda.utils.s3_client import get_s3_client
 from botocore.client import BaseClient
 
 
@@ -14,7 +30,7 @@ def load_array_from_lpcm_file_buffer(buffer, dtype, n_channels, order="F"):
 
     Parameters
     ----------
-    buffer : io.BytesIO
+    buffer : io.BytesIO or MemoryMappedStream
         Used to fill the array with data.
     dtype : type
         data sample type (passed to dtype argument in numpy)
@@ -29,15 +45,11 @@ def load_array_from_lpcm_file_buffer(buffer, dtype, n_channels, order="F"):
         numpy array with lpcm file content
     """
     data = np.frombuffer(buffer.getbuffer(), dtype=dtype)
-    full_length = len(data)
-    if full_length % n_channels != 0:
-        raise ValueError(
-            f"n_channels ({n_channels}) not a multiple of array length ({full_length})"
-        )
+    check_lpcm_array_length(len(data), n_channels)
     return data.reshape(n_channels, -1, order=order)
 
 
-def load_array_from_lpcm_file(path_to_file, dtype, n_channels, order="F"):
+def load_array_from_lpcm_file(path_to_file, dtype, n_channels, order="F", mmap=True):
     """Load lpcm file content as a numpy array with correct data type and shape
 
     Parameters
@@ -50,18 +62,94 @@ def load_array_from_lpcm_file(path_to_file, dtype, n_channels, order="F"):
         number of channels used to reshape data
     order : str
         C or F, use F to read files from Julia, use C to save files for Julia
-
+    mmap : bool, optional
+        if True return a read-only numpy.memmap view of the file, pages are only read from disk
+        when they are accessed. If False the whole file is read in memory, by default True
 
     Returns
     -------
     data: ndarray
-        numpy array with lpcm file content
+        numpy array with lpcm file content (numpy.memmap if mmap is True)
     """
+    if mmap:
+        path_to_file = str(path_to_file)
+        n_samples = n_samples_from_byte_size(
+            os.path.getsize(path_to_file), dtype, n_channels
+        )
+        # numpy.memmap cannot map empty files
+        if n_samples > 0:
+            return np.memmap(
+                path_to_file,
+                dtype=dtype,
+                mode="r",
+                shape=(n_channels, n_samples),
+                order=order,
+            )
+
     with open(path_to_file, "rb") as fh:
         buffer = io.BytesIO(fh.read())
     return load_array_from_lpcm_file_buffer(buffer, dtype, n_channels, order)
 
 
+def load_array_window_from_lpcm_file(
+    path_to_file,
+    dtype,
+    n_channels,
+    sample_range=None,
+    channels=None,
+    order="F",
+    time_range=None,
+    sample_rate=None,
+):
+    """Load a window of samples for a subset of channels from an lpcm file
+    Only the bytes holding the requested samples are read from disk.
+
+    Parameters
+    ----------
+    path_to_file : str or Path
+        path to lpcm file
+    dtype : type
+        data sample type (passed to dtype argument in numpy)
+    n_channels : int
+        number of channels stored in the file
+    sample_range : tuple of int, optional
+        (first, last) sample indices, last excluded, by default all samples
+    channels : list of int, optional
+        channel indices to load, by default all channels
+    order : str
+        C or F, use F to read files from Julia, use C to save files for Julia
+    time_range : tuple of int, optional
+        (start, stop) in nanoseconds, used instead of sample_range, requires sample_rate
+    sample_rate : float, optional
+        sample rate of the signal in Hz, used to convert time_range to a sample range
+
+    Returns
+    -------
+    data: ndarray
+        numpy array of shape (n_selected_channels, n_window_samples)
+    """
+    sample_range = resolve_sample_range(sample_range, time_range, sample_rate)
+    with open(path_to_file, "rb") as fh:
+        n_samples = n_samples_from_byte_size(
+            os.fstat(fh.fileno()).st_size, dtype, n_channels
+        )
+        plan = plan_lpcm_window(
+            n_samples, dtype, n_channels, sample_range, channels, order
+        )
+        data = np.empty(int(np.prod(plan.read_shape)), dtype=plan.dtype)
+        data_bytes = memoryview(data.view(np.uint8))
+        position = 0
+        for offset, length in merge_byte_ranges(plan.byte_ranges):
+            fh.seek(offset)
+            n_read = fh.readinto(data_bytes[position : position + length])
+            if n_read != length:
+                raise ValueError(
+                    f"expected {length} bytes at offset {offset} in {path_to_file}, got {n_read}"
+                )
+            position += length
+    return lpcm_window_from_flat_array(plan, data)
+
+
 def load_array_from_lpcm_file_in_s3(
     file_url, dtype, n_channels, order="F", client: BaseClient = None
 ):
@@ -78,7 +166,7 @@ def load_array_from_lpcm_file_in_s3(
     order : str
         C or F, use F to read files from Julia, use C to save files for Julia
     client: BaseClient, default=None
-        boto3 client instance
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
 
     Returns
     -------
@@ -89,8 +177,85 @@ def load_array_from_lpcm_file_in_s3(
     return load_array_from_lpcm_file_buffer(file_buf, dtype, n_channels, order)
 
 
-def load_array_from_lpcm_zst_file(path_to_file, dtype, n_channels, order="F"):
+def load_array_window_from_lpcm_file_in_s3(
+    file_url,
+    dtype,
+    n_channels,
+    sample_range=None,
+    channels=None,
+    order="F",
+    time_range=None,
+    sample_rate=None,
+    client: BaseClient = None,
+    max_gap=0,
+):
+    """Load a window of samples for a subset of channels from an lpcm file in S3
+    Only the bytes holding the requested samples are downloaded, using ranged GetObject requests.
+
+    Parameters
+    ----------
+    file_url : str
+        S3 URL to lpcm file, can hold a ?versionId= suffix
+    dtype : type
+        data sample type (passed to dtype argument in numpy)
+    n_channels : int
+        number of channels stored in the file
+    sample_range : tuple of int, optional
+        (first, last) sample indices, last excluded, by default all samples
+    channels : list of int, optional
+        channel indices to load, by default all channels
+    order : str
+        C or F, use F to read files from Julia, use C to save files for Julia
+    time_range : tuple of int, optional
+        (start, stop) in nanoseconds, used instead of sample_range, requires sample_rate
+    sample_rate : float, optional
+        sample rate of the signal in Hz, used to convert time_range to a sample range
+    client: BaseClient, default=None
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+    max_gap : int, optional
+        byte ranges separated by at most max_gap bytes are fetched with a single request,
+        by default 0 (adjacent ranges only)
+
+    Returns
+    -------
+    data: ndarray
+        numpy array of shape (n_selected_channels, n_window_samples)
+    """
+    if client is None:
+        client = get_s3_client()
+    sample_range = resolve_sample_range(sample_range, time_range, sample_rate)
+    n_samples = n_samples_from_byte_size(
+        get_s3_object_size(file_url, client), dtype, n_channels
+    )
+    plan = plan_lpcm_window(n_samples, dtype, n_channels, sample_range, channels, order)
+    data = np.empty(int(np.prod(plan.read_shape)), dtype=plan.dtype)
+    read_byte_ranges(
+        plan.byte_ranges,
+        lambda offset, length: download_s3_byte_range(file_url, offset, length, client),
+        data,
+        max_gap,
+    )
+    return lpcm_window_from_flat_array(plan, data)
+
+
+def _expected_lpcm_byte_size(dtype, n_channels, n_samples):
+    """Decompressed size of an lpcm file, None if n_samples is unknown"""
+    if n_samples is None:
+        return None
+    return int(n_samples) * n_channels * np.dtype(dtype).itemsize
+
+
+def _lpcm_array_from_bytes(data, dtype, n_channels, order):
+    """Reshape a uint8 array holding lpcm file content without copy"""
+    n_samples_from_byte_size(data.nbytes, dtype, n_channels)
+    return data.view(dtype).reshape(n_channels, -1, order=order)
+
+
+def load_array_from_lpcm_zst_file(
+    path_to_file, dtype, n_channels, order="F", n_samples=None
+):
     """Decompress lpcm zst and load file content as a numpy array with correct data type and shape
+    The content is decompressed directly in the memory of the returned array.
 
     Parameters
     ----------
@@ -102,20 +267,26 @@ def load_array_from_lpcm_zst_file(path_to_file, dtype, n_channels, order="F"):
         number of channels used to reshape data
     order : str
         C or F, use F to read files from Julia, use C to save files for Julia
+    n_samples : int, optional
+        expected number of samples per channel (e.g. derived from the signal span and sample rate),
+        used to allocate the output array when the archive does not store its decompressed size
 
     Returns
     -------
     data: ndarray
         numpy array with lpcm file content
     """
-    file_buf = decompress_zstandard_file_to_stream(path_to_file)
-    return load_array_from_lpcm_file_buffer(file_buf, dtype, n_channels, order)
+    data = decompress_zstandard_file_to_array(
+        path_to_file, _expected_lpcm_byte_size(dtype, n_channels, n_samples)
+    )
+    return _lpcm_array_from_bytes(data, dtype, n_channels, order)
 
 
 def load_array_from_lpcm_zst_file_in_s3(
-    file_url, dtype, n_channels, order="F", client: BaseClient = None
+    file_url, dtype, n_channels, order="F", client: BaseClient = None, n_samples=None
 ):
     """Decompress lpcm zst from s3 and load file content as a numpy array with correct data type and shape
+    The content is decompressed directly in the memory of the returned array.
 
     Parameters
     ----------
@@ -128,7 +299,10 @@ def load_array_from_lpcm_zst_file_in_s3(
     order : str
         C or F, use F to read files from Julia, use C to save files for Julia
     client: BaseClient, default=None
-        boto3 client instance
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+    n_samples : int, optional
+        expected number of samples per channel (e.g. derived from the signal span and sample rate),
+        used to allocate the output array when the archive does not store its decompressed size
 
     Returns
     -------
@@ -136,5 +310,173 @@ def load_array_from_lpcm_zst_file_in_s3(
         numpy array with lpcm file content
     """
     file_buf = download_s3_fileobj(file_url, client)
-    file_buf = decompress_zstandard_stream_to_stream(file_buf)
-    return load_array_from_lpcm_file_buffer(file_buf, dtype, n_channels, order)
+    data = decompress_zstandard_stream_to_array(
+        file_buf, _expected_lpcm_byte_size(dtype, n_channels, n_samples)
+    )
+    return _lpcm_array_from_bytes(data, dtype, n_channels, order)
+
+
+def _load_array_window_from_lpcm_zst(
+    read_range, size, dtype, n_channels, sample_range, channels, order, max_gap
+):
+    """Load a window of a seekable lpcm zst file given a function reading ranges of the compressed file
+    Return None if the file has no seek table"""
+    seek_table = read_seek_table(read_range, size)
+    if seek_table is None:
+        return None
+    n_samples = n_samples_from_byte_size(
+        int(seek_table.decompressed_offsets[-1]), dtype, n_channels
+    )
+    plan = plan_lpcm_window(n_samples, dtype, n_channels, sample_range, channels, order)
+    data = np.empty(int(np.prod(plan.read_shape)), dtype=plan.dtype)
+    read_byte_ranges(
+        plan.byte_ranges,
+        lambda offset, length: decompress_seekable_zst_range(
+            read_range, seek_table, offset, length
+        ),
+        data,
+        max_gap,
+    )
+    return lpcm_window_from_flat_array(plan, data)
+
+
+def _select_lpcm_window(data, sample_range, channels):
+    """Extract a window from a fully loaded array, with the same validation as plan_lpcm_window"""
+    n_channels, n_samples = data.shape
+    plan_lpcm_window(n_samples, data.dtype, n_channels, sample_range, channels)
+    if sample_range is not None:
+        data = data[:, sample_range[0] : sample_range[1]]
+    if channels is not None:
+        data = data[channels]
+    return data
+
+
+def load_array_window_from_lpcm_zst_file(
+    path_to_file,
+    dtype,
+    n_channels,
+    sample_range=None,
+    channels=None,
+    order="F",
+    time_range=None,
+    sample_rate=None,
+    max_gap=0,
+):
+    """Load a window of samples for a subset of channels from an lpcm zst file
+    For seekable files (cf. save_array_to_lpcm_zst_file) only the frames covering the requested samples
+    are read and decompressed, other files are fully decompressed before extracting the window.
+
+    Parameters
+    ----------
+    path_to_file : str or Path
+        path to lpcm zst file
+    dtype : type
+        data sample type (passed to dtype argument in numpy)
+    n_channels : int
+        number of channels stored in the file
+    sample_range : tuple of int, optional
+        (first, last) sample indices, last excluded, by default all samples
+    channels : list of int, optional
+        channel indices to load, by default all channels
+    order : str
+        C or F, use F to read files from Julia, use C to save files for Julia
+    time_range : tuple of int, optional
+        (start, stop) in nanoseconds, used instead of sample_range, requires sample_rate
+    sample_rate : float, optional
+        sample rate of the signal in Hz, used to convert time_range to a sample range
+    max_gap : int, optional
+        decompressed byte ranges separated by at most max_gap bytes are decompressed together,
+        by default 0 (adjacent ranges only)
+
+    Returns
+    -------
+    data: ndarray
+        numpy array of shape (n_selected_channels, n_window_samples)
+    """
+    sample_range = resolve_sample_range(sample_range, time_range, sample_rate)
+    with open(path_to_file, "rb") as fh:
+
+        def read_range(offset, length):
+            fh.seek(offset)
+            return fh.read(length)
+
+        data = _load_array_window_from_lpcm_zst(
+            read_range,
+            os.fstat(fh.fileno()).st_size,
+            dtype,
+            n_channels,
+            sample_range,
+            channels,
+            order,
+            max_gap,
+        )
+    if data is None:
+        data = load_array_from_lpcm_zst_file(path_to_file, dtype, n_channels, order)
+        data = _select_lpcm_window(data, sample_range, channels)
+    return data
+
+
+def load_array_window_from_lpcm_zst_file_in_s3(
+    file_url,
+    dtype,
+    n_channels,
+    sample_range=None,
+    channels=None,
+    order="F",
+    time_range=None,
+    sample_rate=None,
+    client: BaseClient = None,
+    max_gap=0,
+):
+    """Load a window of samples for a subset of channels from an lpcm zst file in S3
+    For seekable files (cf. save_array_to_lpcm_zst_file) only the frames covering the requested samples
+    are downloaded with ranged GetObject requests, other files are fully downloaded and decompressed.
+
+    Parameters
+    ----------
+    file_url : str
+        S3 URL to lpcm zst file, can hold a ?versionId= suffix
+    dtype : type
+        data sample type (passed to dtype argument in numpy)
+    n_channels : int
+        number of channels stored in the file
+    sample_range : tuple of int, optional
+        (first, last) sample indices, last excluded, by default all samples
+    channels : list of int, optional
+        channel indices to load, by default all channels
+    order : str
+        C or F, use F to read files from Julia, use C to save files for Julia
+    time_range : tuple of int, optional
+        (start, stop) in nanoseconds, used instead of sample_range, requires sample_rate
+    sample_rate : float, optional
+        sample rate of the signal in Hz, used to convert time_range to a sample range
+    client: BaseClient, default=None
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+    max_gap : int, optional
+        decompressed byte ranges separated by at most max_gap bytes are fetched together,
+        by default 0 (adjacent ranges only)
+
+    Returns
+    -------
+    data: ndarray
+        numpy array of shape (n_selected_channels, n_window_samples)
+    """
+    if client is None:
+        client = get_s3_client()
+    sample_range = resolve_sample_range(sample_range, time_range, sample_rate)
+    data = _load_array_window_from_lpcm_zst(
+        lambda offset, length: download_s3_byte_range(file_url, offset, length, client),
+        get_s3_object_size(file_url, client),
+        dtype,
+        n_channels,
+        sample_range,
+        channels,
+        order,
+        max_gap,
+    )
+    if data is None:
+        data = load_array_from_lpcm_zst_file_in_s3(
+            file_url, dtype, n_channels, order, client
+        )
+        data = _select_lpcm_window(data, sample_range, channels)
+    return data
@@ -0,0 +1,198 @@
+import numpy as np
+import pyarrow as pa
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from pyonda.load_lpcm import (
+    load_array_from_lpcm_file,
+    load_array_from_lpcm_file_in_s3,
+    load_array_from_lpcm_zst_file,
+    load_array_from_lpcm_zst_file_in_s3,
+)
+from pyonda.utils.lpcm_layout import time_range_to_sample_range
+from pyonda.utils.processing import arrow_to_processed_pandas
+from pyonda.utils.sample_conversion import DEFAULT_CHUNK_VALUES, decode_samples
+from pyonda.utils.s3_download import path_is_an_s3_url
+from botocore.client import BaseClient
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def _signal_n_samples(signal):
+    """Expected number of samples of a signal from its span and sample rate, None if unknown
+    Only an allocation hint for archives which do not store their decompressed size: the span rounded
+    to samples can differ from the stored number of samples, the size stored in the file takes precedence.
+    """
+    span = signal.get("span")
+    if span is None or signal.get("sample_rate") is None:
+        return None
+    duration = int(span["stop"]) - int(span["start"])
+    return time_range_to_sample_range((0, duration), signal["sample_rate"])[1]
+
+
+def load_array_from_signal(signal, client: BaseClient = None):
+    """Load the samples of a signal described by a row of a table following ONDA_SIGNALS_SCHEMA
+
+    The loader is chosen from the file_format (lpcm or lpcm.zst) and the file_path (local path or s3:// URL),
+    the data type from sample_type and the number of channels from channels.
+
+    Parameters
+    ----------
+    signal : pandas.Series or dict
+        signal row, as returned by arrow_to_processed_pandas
+    client: BaseClient, default=None
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+
+    Returns
+    -------
+    data: ndarray
+        numpy array of shape (n_channels, n_samples)
+
+    Raises
+    ------
+    ValueError
+        if the file format is not supported
+    """
+    file_path = signal["file_path"]
+    file_format = signal["file_format"]
+    dtype = np.dtype(signal["sample_type"])
+    n_channels = len(signal["channels"])
+    is_in_s3 = path_is_an_s3_url(file_path)
+
+    if file_format == "lpcm":
+        if is_in_s3:
+            return load_array_from_lpcm_file_in_s3(
+                file_path, dtype, n_channels, client=client
+            )
+        return load_array_from_lpcm_file(file_path, dtype, n_channels)
+    if file_format == "lpcm.zst":
+        n_samples = _signal_n_samples(signal)
+        if is_in_s3:
+            return load_array_from_lpcm_zst_file_in_s3(
+                file_path, dtype, n_channels, client=client, n_samples=n_samples
+            )
+        return load_array_from_lpcm_zst_file(
+            file_path, dtype, n_channels, n_samples=n_samples
+        )
+    raise ValueError(
+        f"Unsupported file format {file_format} for {file_path} (expected lpcm or lpcm.zst)"
+    )
+
+
+def load_decoded_array_from_signal(
+    signal,
+    dtype=np.float64,
+    out=None,
+    chunk_values=DEFAULT_CHUNK_VALUES,
+    max_workers=None,
+    client: BaseClient = None,
+):
+    """Load the samples of a signal in physical units
+    (sample_resolution_in_unit * samples + sample_offset_in_unit, cf. pyonda.utils.sample_conversion.decode_samples)
+
+    Local lpcm files are memory mapped and decoded chunk by chunk: only the output array is allocated.
+
+    Parameters
+    ----------
+    signal : pandas.Series or dict
+        signal row, as returned by arrow_to_processed_pandas
+    dtype : type, optional
+        float32 or float64, by default float64 (ignored if out is given)
+    out : ndarray, optional
+        float32 or float64 array of shape (n_channels, n_samples) to decode into, by default a new array
+    chunk_values : int, optional
+        number of values decoded at once, by default DEFAULT_CHUNK_VALUES
+    max_workers : int, optional
+        number of threads decoding chunks concurrently, by default None (no threads)
+    client: BaseClient, default=None
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+
+    Returns
+    -------
+    data: ndarray
+        float array of shape (n_channels, n_samples)
+    """
+    data = load_array_from_signal(signal, client)
+    return decode_samples(
+        data,
+        signal["sample_resolution_in_unit"],
+        signal["sample_offset_in_unit"],
+        dtype=dtype,
+        out=out,
+        chunk_values=chunk_values,
+        max_workers=max_workers,
+    )
+
+
+def _signal_records(signals):
+    """Rows of a signals table as a list of (signal id, row dict), rows are keyed by their index
+    in tables without an id column"""
+    if isinstance(signals, pa.Table):
+        signals = arrow_to_processed_pandas(signals)
+    records = signals.to_dict("records")
+    signal_ids = signals["id"] if "id" in signals.columns else signals.index
+    return list(zip(signal_ids, records))
+
+
+def iter_arrays_from_signals(
+    signals, max_workers=DEFAULT_MAX_WORKERS, client: BaseClient = None
+):
+    """Load the samples of all the signals of a table concurrently, yielding them as they are loaded
+
+    At most max_workers signals are loaded at the same time, the next signals are only loaded once
+    the previous results have been consumed, so that memory usage is bounded.
+
+    Parameters
+    ----------
+    signals : pandas.DataFrame or pyarrow.Table
+        table following ONDA_SIGNALS_SCHEMA, as a processed pandas dataframe or an arrow table
+    max_workers : int, optional
+        maximum number of signals loaded concurrently, by default DEFAULT_MAX_WORKERS
+    client: BaseClient, default=None
+        boto3 client instance shared by all the workers, by default the shared client
+        (cf. pyonda.utils.s3_client.get_s3_client)
+
+    Yields
+    ------
+    signal_id : uuid.UUID
+        id of the loaded signal (row index if the table has no id column)
+    data : ndarray
+        numpy array of shape (n_channels, n_samples)
+    """
+    records = iter(_signal_records(signals))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        while True:
+            for signal_id, record in records:
+                future = executor.submit(load_array_from_signal, record, client)
+                pending[future] = signal_id
+                if len(pending) >= max_workers:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                signal_id = pending.pop(future)
+                yield signal_id, future.result()
+
+
+def load_arrays_from_signals(
+    signals, max_workers=DEFAULT_MAX_WORKERS, client: BaseClient = None
+):
+    """Load the samples of all the signals of a table concurrently
+
+    Parameters
+    ----------
+    signals : pandas.DataFrame or pyarrow.Table
+        table following ONDA_SIGNALS_SCHEMA, as a processed pandas dataframe or an arrow table
+    max_workers : int, optional
+        maximum number of signals loaded concurrently, by default DEFAULT_MAX_WORKERS
+    client: BaseClient, default=None
+        boto3 client instance shared by all the workers, by default the shared client
+        (cf. pyonda.utils.s3_client.get_s3_client)
+
+    Returns
+    -------
+    arrays: dict
+        numpy arrays of shape (n_channels, n_samples) keyed by signal id (row index if the table has no id column)
+    """
+    return dict(iter_arrays_from_signals(signals, max_workers, client))
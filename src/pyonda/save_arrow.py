@@ -1,35 +1,147 @@
 import pyarrow as pa
-import tempfile
 
-from pyonda.utils.s3_upload import upload_file_to_s3
-from pathlib import Path
+from pyonda.utils.s3_upload import S3UploadStream
+from pyonda.utils.schemas import table_from_storage_arrays
 from botocore.client import BaseClient
 
+ARROW_COMPRESSIONS = ("lz4", "zstd")
 
-def save_table_to_arrow_file(table, schema, output_path):
+
+def _ipc_write_options(compression=None, compression_level=None):
+    """IPC write options compressing the record batch buffers with compression (None for no compression)"""
+    if compression is None:
+        if compression_level is not None:
+            raise ValueError("compression_level requires a compression")
+        return pa.ipc.IpcWriteOptions()
+    if compression not in ARROW_COMPRESSIONS:
+        raise ValueError(
+            f"compression should be one of {', '.join(ARROW_COMPRESSIONS)} or None (you have {compression})"
+        )
+    return pa.ipc.IpcWriteOptions(
+        compression=pa.Codec(compression, compression_level=compression_level)
+    )
+
+
+def _dictionary_encode_columns(table, schema, dictionary_columns):
+    """Dictionary encode some columns of a table and update the schema accordingly
+    (a single dictionary per column, as required by the IPC file format)"""
+    for name in dictionary_columns:
+        index = schema.get_field_index(name)
+        if index < 0:
+            raise ValueError(f"Column {name} not found in schema")
+        field = schema.field(index)
+        if not pa.types.is_dictionary(field.type):
+            schema = schema.set(
+                index, field.with_type(pa.dictionary(pa.int32(), field.type))
+            )
+            table = table.set_column(
+                index, schema.field(index), table.column(index).dictionary_encode()
+            )
+    return table.unify_dictionaries(), schema
+
+
+def _with_schema_types(table, schema):
+    """Table with the extension columns of schema wrapping their storage columns if needed"""
+    if table.schema.equals(schema):
+        return table
+    return table_from_storage_arrays(table, schema)
+
+
+def _write_arrow_stream(
+    sink,
+    table,
+    schema,
+    compression=None,
+    compression_level=None,
+    max_chunksize=None,
+    dictionary_columns=None,
+):
+    """Write a table or an iterable of record batches to sink in the Arrow IPC file format"""
+    options = _ipc_write_options(compression, compression_level)
+    if isinstance(table, pa.RecordBatch):
+        table = pa.Table.from_batches([table])
+    if dictionary_columns:
+        if not isinstance(table, pa.Table):
+            raise ValueError(
+                "dictionary_columns requires a Table (the IPC file format allows one dictionary per column)"
+            )
+        table = _with_schema_types(table, schema)
+        table, schema = _dictionary_encode_columns(table, schema, dictionary_columns)
+    batches = [table] if isinstance(table, pa.Table) else table
+    with pa.ipc.new_file(sink, schema=schema, options=options) as writer:
+        for batch in batches:
+            if isinstance(batch, pa.RecordBatch):
+                batch = pa.Table.from_batches([batch])
+            writer.write_table(
+                _with_schema_types(batch, schema), max_chunksize=max_chunksize
+            )
+
+
+def save_table_to_arrow_file(
+    table,
+    schema,
+    output_path,
+    compression=None,
+    compression_level=None,
+    max_chunksize=None,
+    dictionary_columns=None,
+):
     """Sable pyarrow Table to output_path
 
+    Compressed files are decompressed transparently by the loaders, but their record batches cannot be
+    memory mapped without copy: keep the default (no compression) for tables read repeatedly from local disk.
+
     Parameters
     ----------
-    table : pyarrow.lib.Table
-        table to save
+    table : pyarrow.lib.Table, pyarrow.lib.RecordBatch or iterable of pyarrow.lib.RecordBatch
+        table to save, an iterable of record batches is written incrementally
+        extension columns of schema can hold their storage values (cf. pyonda.utils.schemas.table_from_storage_arrays)
     schema : pyarrow.lib.Schema
         schema of the table to save
     output_path : str or Path
         output file path
+    compression : str, optional
+        lz4 or zstd to compress the record batch buffers, by default None (no compression)
+    compression_level : int, optional
+        compression level, by default the codec default
+    max_chunksize : int, optional
+        maximum number of rows per record batch, by default the chunks of the table
+    dictionary_columns : list of str, optional
+        columns to dictionary encode (e.g. low cardinality string columns), read back as dictionary columns,
+        only supported for tables
     """
     with pa.OSFile(str(output_path), "wb") as sink:
-        with pa.ipc.new_file(sink, schema=schema) as writer:
-            writer.write(table)
+        _write_arrow_stream(
+            sink,
+            table,
+            schema,
+            compression,
+            compression_level,
+            max_chunksize,
+            dictionary_columns,
+        )
 
 
-def save_table_to_s3(table, schema, bucket, key, client: BaseClient = None):
-    """Save table in a temp dir and upload it to s3
+def save_table_to_s3(
+    table,
+    schema,
+    bucket,
+    key,
+    client: BaseClient = None,
+    compression=None,
+    compression_level=None,
+    max_chunksize=None,
+    dictionary_columns=None,
+):
+    """Stream a table to s3 with a multipart upload, without writing it to disk
+    Record batches are serialized into the upload stream, the parts already full are uploaded while
+    the next batches are serialized (cf. pyonda.utils.s3_upload.S3UploadStream).
 
     Parameters
     ----------
-    table : pyarrow.lib.Table
-        table to save
+    table : pyarrow.lib.Table, pyarrow.lib.RecordBatch or iterable of pyarrow.lib.RecordBatch
+        table to save, an iterable of record batches is consumed incrementally (e.g. for tables larger than memory)
+        extension columns of schema can hold their storage values (cf. pyonda.utils.schemas.table_from_storage_arrays)
     schema : pyarrow.lib.Schema
         schema of the table to save
     bucket : str
@@ -37,17 +149,30 @@ def save_table_to_s3(table, schema, bucket, key, client: BaseClient = None):
     key : str
         destination file key
     client: BaseClient, default=None
-        boto3 client instance
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+    compression : str, optional
+        lz4 or zstd to compress the record batch buffers, by default None (no compression)
+    compression_level : int, optional
+        compression level, by default the codec default
+    max_chunksize : int, optional
+        maximum number of rows per record batch, by default the chunks of the table
+    dictionary_columns : list of str, optional
+        columns to dictionary encode (e.g. low cardinality string columns), only supported for tables
 
-    Returns
-    -------
-    upload_status: bool
-        False if ClientError is catched during upload
+    Raises
+    ------
+    ValueError
+        if the compression is not supported or dictionary_columns is given with record batches
+    botocore.exceptions.ClientError
+        if the upload fails, the multipart upload is then aborted
     """
-    temp_dir = tempfile.TemporaryDirectory()
-    temp_file_path = Path(temp_dir.name) / "table_to_upload.arrow"
-    try:
-        save_table_to_arrow_file(table, schema, temp_file_path)
-        upload_file_to_s3(temp_file_path, bucket, key, client)
-    finally:
-        temp_dir.cleanup()
+    with S3UploadStream(bucket, key, client) as stream:
+        _write_arrow_stream(
+            stream,
+            table,
+            schema,
+            compression,
+            compression_level,
+            max_chunksize,
+            dictionary_columns,
+        )
@@ -1,12 +1,15 @@
 import numpy as np
-import tempfile
-from pathlib import Path
-from pyonda.utils.s3_upload import upload_file_to_s3
-from pyonda.utils.compression import compress_file_to_zst
+from pyonda.utils.s3_upload import S3UploadStream
+from pyonda.utils.compression import (
+    compress_array_to_zst_stream,
+    get_zstd_compressor,
+)
+from pyonda.utils.sample_conversion import encode_samples, iter_encoded_lpcm_chunks
+from pyonda.utils.zstd_seekable import write_seekable_zst
 from botocore.client import BaseClient
 
 
-def save_array_to_lpcm_file(array, output_path, order="C"):
+def save_array_to_lpcm_file(array, output_path, order="C", encoding=None):
     """Save numpy array to .lpcm binary file
 
     Parameters
@@ -17,6 +20,9 @@ def save_array_to_lpcm_file(array, output_path, order="C"):
         output file path
     order : str
         C or F, use F to read files from Julia, use C to save files for Julia
+    encoding : SampleEncoding, optional
+        if given, array holds samples in physical units, encoded to encoding.dtype chunk by chunk while writing
+        (cf. pyonda.utils.sample_conversion.SampleEncoding), by default array is written as is
     """
     output_path = str(output_path)
     if output_path[-5:] != ".lpcm":
@@ -24,13 +30,24 @@ def save_array_to_lpcm_file(array, output_path, order="C"):
             f"output path should have .lpcm extension (you have {output_path[:-5]})"
         )
 
+    dtype = array.dtype if encoding is None else encoding.dtype
     holder = np.memmap(
-        output_path, dtype=array.dtype, mode="w+", shape=array.shape, order=order
+        output_path, dtype=dtype, mode="w+", shape=array.shape, order=order
     )
-    holder[:] = array
-
-
-def save_array_to_lpcm_zst_file(array, output_path, order="C"):
+    if encoding is None:
+        holder[:] = array
+    else:
+        encode_samples(array, encoding.resolution, encoding.offset, dtype, out=holder)
+
+
+def save_array_to_lpcm_zst_file(
+    array,
+    output_path,
+    order="C",
+    frame_samples=None,
+    compression_options=None,
+    encoding=None,
+):
     """Save numpy array to .lpcm.zst compressed binary file
 
     Parameters
@@ -41,27 +58,66 @@ def save_array_to_lpcm_zst_file(array, output_path, order="C"):
         output file path
     order : str
         C or F, use F to read files from Julia, use C to save files for Julia
+    frame_samples : int, optional
+        if given, write a seekable .lpcm.zst: each zstd frame holds frame_samples * n_channels values
+        (frame_samples samples of all channels in the F layout) and a seek table is appended in a
+        skippable frame, so that sample ranges can be decompressed independently.
+        By default the file is a single zstd frame
+    compression_options : dict, optional
+        zstd compression options: level, threads, window_log, long_distance_matching
+        (cf. pyonda.utils.compression.get_zstd_compressor), by default the default compression options
+    encoding : SampleEncoding, optional
+        if given, array holds samples in physical units, encoded to encoding.dtype chunk by chunk while writing
+        (cf. pyonda.utils.sample_conversion.SampleEncoding), by default array is written as is
     """
     if str(output_path)[-9:] != ".lpcm.zst":
         raise ValueError(
             f"output path should have .lpcm.zst extension (you have {str(output_path)[:-9]})"
         )
+    # checked before the output file is created
+    _check_frame_samples(frame_samples)
+
+    with open(output_path, "wb") as destination:
+        _write_array_to_lpcm_zst_stream(
+            array, destination, order, frame_samples, compression_options, encoding
+        )
 
-    output_path = Path(output_path)
-    temp_dir = tempfile.TemporaryDirectory()
 
-    lpcm_path = Path(temp_dir.name, output_path.stem)
-    try:
-        save_array_to_lpcm_file(array, lpcm_path, order)
-        compress_file_to_zst(lpcm_path, output_path.parent)
-    finally:
-        temp_dir.cleanup()
+def _check_frame_samples(frame_samples):
+    if frame_samples is not None and (
+        isinstance(frame_samples, bool)
+        or not isinstance(frame_samples, (int, np.integer))
+        or frame_samples <= 0
+    ):
+        raise ValueError(
+            f"frame_samples should be a positive integer or None (you have {frame_samples})"
+        )
+
+
+def _write_array_to_lpcm_zst_stream(
+    array, destination, order, frame_samples, compression_options, encoding=None
+):
+    """Compress array to a single frame or seekable .lpcm.zst stream"""
+    _check_frame_samples(frame_samples)
+    if frame_samples is not None:
+        n_channels = array.shape[0] if array.ndim > 1 else 1
+        write_seekable_zst(
+            iter_encoded_lpcm_chunks(
+                array, encoding, order, frame_samples * n_channels
+            ),
+            destination,
+            get_zstd_compressor(compression_options),
+        )
+    else:
+        compress_array_to_zst_stream(
+            array, destination, order, compression_options, encoding
+        )
 
 
 def save_array_to_lpcm_file_in_s3(
-    array, bucket, key, client: BaseClient = None, order="C"
+    array, bucket, key, client: BaseClient = None, order="C", encoding=None
 ):
-    """Save a numpy array in a temp dir as a .lpcm and upload it to s3
+    """Stream a numpy array as a .lpcm to s3 with a multipart upload, without writing it to disk
 
     Parameters
     ----------
@@ -72,28 +128,35 @@ def save_array_to_lpcm_file_in_s3(
     key : str
         destination file key
     client: BaseClient, default=None
-        boto3 client instance
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
     order : str
         C or F, use F to read files from Julia, use C to save files for Julia
-
-    Returns
-    -------
-    upload_status: bool
-        False if ClientError is catched during upload
+    encoding : SampleEncoding, optional
+        if given, array holds samples in physical units, encoded to encoding.dtype chunk by chunk while writing
+        (cf. pyonda.utils.sample_conversion.SampleEncoding), by default array is written as is
+
+    Raises
+    ------
+    botocore.exceptions.ClientError
+        if the upload fails, the multipart upload is then aborted
     """
-    temp_dir = tempfile.TemporaryDirectory()
-    temp_file_path = Path(temp_dir.name) / "array_to_upload.lpcm"
-    try:
-        save_array_to_lpcm_file(array, temp_file_path, order)
-        upload_file_to_s3(temp_file_path, bucket, key, client)
-    finally:
-        temp_dir.cleanup()
+    with S3UploadStream(bucket, key, client) as stream:
+        for chunk in iter_encoded_lpcm_chunks(array, encoding, order):
+            stream.write(chunk)
 
 
 def save_array_to_lpcm_zst_file_in_s3(
-    array, bucket, key, client: BaseClient = None, order="C"
+    array,
+    bucket,
+    key,
+    client: BaseClient = None,
+    order="C",
+    frame_samples=None,
+    compression_options=None,
+    encoding=None,
 ):
-    """Save a numpy array in a temp dir as a .lpcm and upload it to s3
+    """Stream a numpy array compressed as a .lpcm.zst to s3 with a multipart upload, without writing it to disk
+    Compression overlaps with the upload of the already compressed parts.
 
     Parameters
     ----------
@@ -103,25 +166,26 @@ def save_array_to_lpcm_zst_file_in_s3(
         destination bucket name
     key : str
         destination file key
-    compress : bool, default=False
-        if true, compress file to .zst
     client: BaseClient, default=None
-        boto3 client instance
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
     order : str
         C or F, use F to read files from Julia, use C to save files for Julia
-
-    Returns
-    -------
-    upload_status: bool
-        False if ClientError is catched during upload
+    frame_samples : int, optional
+        if given, write a seekable .lpcm.zst (cf. save_array_to_lpcm_zst_file)
+    compression_options : dict, optional
+        zstd compression options (cf. save_array_to_lpcm_zst_file)
+    encoding : SampleEncoding, optional
+        if given, array holds samples in physical units, encoded to encoding.dtype chunk by chunk while writing
+        (cf. pyonda.utils.sample_conversion.SampleEncoding), by default array is written as is
+
+    Raises
+    ------
+    ValueError
+        if frame_samples is not a positive integer
+    botocore.exceptions.ClientError
+        if the upload fails, the multipart upload is then aborted
     """
-    temp_dir = tempfile.TemporaryDirectory()
-    temp_file_path = Path(temp_dir.name) / "array_to_upload.lpcm"
-    try:
-        save_array_to_lpcm_file(array, temp_file_path, order)
-        compress_file_to_zst(temp_file_path, Path(temp_dir.name))
-
-        compressed_file_path = Path(temp_dir.name) / "array_to_upload.lpcm.zst"
-        upload_file_to_s3(compressed_file_path, bucket, key, client)
-    finally:
-        temp_dir.cleanup()
+    with S3UploadStream(bucket, key, client) as stream:
+        _write_array_to_lpcm_zst_stream(
+            array, stream, order, frame_samples, compression_options, encoding
+        )
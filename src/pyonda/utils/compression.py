@@ -1,8 +1,108 @@
 import zstandard
 from pathlib import Path
 
+from pyonda.utils.sample_conversion import encoded_nbytes, iter_encoded_lpcm_chunks
 
-def compress_file_to_zst(input_file, output_dir):
+# Largest window log decoders accept without an explicit override (ZSTD_WINDOWLOG_LIMIT_DEFAULT),
+# larger windows would make files unreadable by Onda.jl and other default configured decoders
+MAX_PORTABLE_WINDOW_LOG = 27
+
+# level: compression level (1 to 22)
+# threads: number of compression worker threads, -1 to use all logical cores, 0 to compress in the calling thread
+# window_log: base 2 log of the compression window size (10 to 27), None to use the level default
+# long_distance_matching: enable long distance matching, window_log defaults to MAX_PORTABLE_WINDOW_LOG (27) with it
+DEFAULT_COMPRESSION_OPTIONS = {
+    "level": 3,
+    "threads": -1,
+    "window_log": None,
+    "long_distance_matching": False,
+}
+
+_compression_options = dict(DEFAULT_COMPRESSION_OPTIONS)
+
+
+def _resolve_compression_options(compression_options=None):
+    """Merge compression options with the defaults, raise ValueError for unknown options"""
+    compression_options = compression_options or {}
+    unknown_options = set(compression_options) - set(DEFAULT_COMPRESSION_OPTIONS)
+    if unknown_options:
+        raise ValueError(
+            f"Unknown compression options {sorted(unknown_options)}, expected keys in {list(DEFAULT_COMPRESSION_OPTIONS)}"
+        )
+    return {**_compression_options, **compression_options}
+
+
+def set_default_compression_options(**compression_options):
+    """Set the zstd compression options used when none are given to the compression and save functions
+
+    Parameters
+    ----------
+    **compression_options
+        any of level, threads, window_log, long_distance_matching (cf. DEFAULT_COMPRESSION_OPTIONS)
+
+    Examples
+    --------
+    >>> set_default_compression_options(level=10, threads=8)
+    """
+    options = _resolve_compression_options(compression_options)
+    # build a compressor to validate the options before storing them
+    get_zstd_compressor(options)
+    _compression_options.update(options)
+
+
+def get_default_compression_options():
+    """Get the zstd compression options used when none are given to the compression and save functions
+
+    Returns
+    -------
+    compression_options: dict
+        copy of the current default compression options
+    """
+    return dict(_compression_options)
+
+
+def get_zstd_compressor(compression_options=None):
+    """Build a zstd compressor producing standard .zst frames
+    https://python-zstandard.readthedocs.io/en/latest/compressor.html
+
+    Parameters
+    ----------
+    compression_options : dict, optional
+        any of level, threads, window_log, long_distance_matching (cf. DEFAULT_COMPRESSION_OPTIONS),
+        missing options are taken from the defaults (cf. set_default_compression_options)
+
+    Returns
+    -------
+    compressor: zstandard.ZstdCompressor
+        configured compressor
+
+    Raises
+    ------
+    ValueError
+        if an option is unknown or if window_log is larger than MAX_PORTABLE_WINDOW_LOG
+    """
+    options = _resolve_compression_options(compression_options)
+    window_log = options["window_log"]
+    if window_log is not None and window_log > MAX_PORTABLE_WINDOW_LOG:
+        raise ValueError(
+            f"window_log should be <= {MAX_PORTABLE_WINDOW_LOG} for the files to be readable by default decoders (you have {window_log})"
+        )
+    parameters = {
+        "threads": options["threads"],
+        "enable_ldm": options["long_distance_matching"],
+    }
+    if window_log is None and options["long_distance_matching"]:
+        # long distance matching only helps with a large window, the level default can be much smaller
+        window_log = MAX_PORTABLE_WINDOW_LOG
+    if window_log is not None:
+        parameters["window_log"] = window_log
+    compression_params = zstandard.ZstdCompressionParameters.from_level(
+        options["level"], **parameters
+    )
+    return zstandard.ZstdCompressor(compression_params=compression_params)
+
+
+def compress_file_to_zst(input_file, output_dir, compression_options=None):
     """Compress file to .zst
     https://python-zstandard.readthedocs.io/en/latest/compressor.html
 
@@ -12,11 +112,42 @@ def compress_file_to_zst(input_file, output_dir):
         path to original file
     output_file : str or Path
         path of output .zst file
+    compression_options : dict, optional
+        zstd compression options (cf. get_zstd_compressor), by default the default compression options
     """
     input_file = Path(input_file)
     output_file = Path(output_dir) / f"{input_file.name}.zst"
 
     with open(input_file, "rb") as f:
-        c = zstandard.ZstdCompressor()
+        c = get_zstd_compressor(compression_options)
         with open(output_file, "wb") as destination:
             c.copy_stream(f, destination)
+
+
+def compress_array_to_zst_stream(
+    array, destination, order="C", compression_options=None, encoding=None
+):
+    """Compress the values of a numpy array, in the given memory order, to a .zst stream
+    The array is fed to the compressor in bounded chunks, no uncompressed copy of the array is made.
+    The decompressed size is written in the frame header.
+
+    Parameters
+    ----------
+    array : ndarray
+        input numpy array to be compressed
+    destination : file-like
+        binary stream the .zst content is written to (left open)
+    order : str
+        C or F, use F to read files from Julia, use C to save files for Julia
+    compression_options : dict, optional
+        zstd compression options (cf. get_zstd_compressor), by default the default compression options
+    encoding : SampleEncoding, optional
+        if given, array holds samples in physical units encoded chunk by chunk before compression
+        (cf. pyonda.utils.sample_conversion.iter_encoded_lpcm_chunks)
+    """
+    compressor = get_zstd_compressor(compression_options)
+    with compressor.stream_writer(
+        destination, size=encoded_nbytes(array, encoding), closefd=False
+    ) as writer:
+        for chunk in iter_encoded_lpcm_chunks(array, encoding, order):
+            writer.write(chunk)
@@ -1,7 +1,16 @@
 import io
+import numpy as np
 import zstandard
 from pathlib import Path
 
+from pyonda.utils.zstd_seekable import read_seek_table
+
+# size of the chunks allocated when the decompressed size is unknown
+DECOMPRESSION_CHUNK_SIZE = 2**24
+# the frame header is at most 18 bytes long
+# https://github.com/facebook/zstd/blob/dev/doc/zstd_compression_format.md#frame_header
+ZSTD_FRAME_HEADER_MAX_SIZE = 18
+
 
 def decompress_zstandard_file_to_folder(input_file, destination_dir):
     """Decompress .zst archive to file
@@ -72,3 +81,131 @@ def decompress_zstandard_stream_to_stream(input_stream):
     decomp.copy_stream(input_stream, output_stream)
     output_stream.seek(0)
     return output_stream
+
+
+def get_zstandard_stream_decompressed_size(input_stream):
+    """Get the decompressed size of a seekable .zst stream without decompressing it
+    The size is read from the seek table if the stream has one (cf. zstd_seekable), else from the
+    content size field of the first frame header (only valid for single frame archives).
+    The stream position is left unchanged.
+
+    Parameters
+    ----------
+    input_stream: io.BytesIO or file object
+        input stream of a .zst archive
+
+    Returns
+    -------
+    size: int or None
+        decompressed size in bytes, None if unknown
+    """
+    if not input_stream.seekable():
+        return None
+    position = input_stream.tell()
+    try:
+
+        def read_range(offset, length):
+            input_stream.seek(offset)
+            return input_stream.read(length)
+
+        input_stream.seek(0, io.SEEK_END)
+        seek_table = read_seek_table(read_range, input_stream.tell())
+        if seek_table is not None:
+            return int(seek_table.decompressed_offsets[-1])
+
+        header = read_range(position, ZSTD_FRAME_HEADER_MAX_SIZE)
+        try:
+            content_size = zstandard.frame_content_size(header)
+        except zstandard.ZstdError:
+            return None
+        return content_size if content_size >= 0 else None
+    finally:
+        input_stream.seek(position)
+
+
+def decompress_zstandard_stream_to_array(input_stream, size=None):
+    """Decompress .zst stream directly into a numpy array allocated once
+
+    If the decompressed size is known (read from the seek table or from the frame header, else given),
+    the output array is allocated once and filled in place. Otherwise the content is decompressed in
+    chunks of DECOMPRESSION_CHUNK_SIZE bytes which are concatenated once at the end.
+
+    Parameters
+    ----------
+    input_stream: io.BytesIO or file object
+        input stream of a .zst archive
+    size : int, optional
+        expected decompressed size in bytes, only used when the archive does not store its decompressed size
+
+    Returns
+    -------
+    data: ndarray
+        uint8 array holding the decompressed content
+    """
+    # the size stored in the archive is exact, the given size is only a hint
+    stored_size = get_zstandard_stream_decompressed_size(input_stream)
+    if stored_size is not None:
+        size = stored_size
+
+    reader = zstandard.ZstdDecompressor().stream_reader(
+        input_stream, read_across_frames=True, closefd=False
+    )
+    chunks = []
+    if size is not None:
+        data = np.empty(size, dtype=np.uint8)
+        n_read = _readinto_full(reader, data)
+        if n_read < size:
+            # shrink the buffer in place (realloc) instead of copying the data to a smaller array
+            data.resize(n_read, refcheck=False)
+            return data
+        extra = reader.read(1)
+        if not extra:
+            return data
+        chunks.extend([data, np.frombuffer(extra, dtype=np.uint8)])
+
+    # unknown size or content larger than expected
+    while True:
+        chunk = np.empty(DECOMPRESSION_CHUNK_SIZE, dtype=np.uint8)
+        n_read = _readinto_full(reader, chunk)
+        if n_read > 0:
+            chunks.append(chunk[:n_read])
+        if n_read < DECOMPRESSION_CHUNK_SIZE:
+            break
+
+    if len(chunks) == 0:
+        return np.empty(0, dtype=np.uint8)
+    if len(chunks) == 1:
+        return chunks[0]
+    return np.concatenate(chunks)
+
+
+def decompress_zstandard_file_to_array(input_file, size=None):
+    """Decompress .zst archive directly into a numpy array allocated once
+    (cf. decompress_zstandard_stream_to_array)
+
+    Parameters
+    ----------
+    input_file : str or Path
+        path to .zst compressed file
+    size : int, optional
+        expected decompressed size in bytes, only used when the archive does not store its decompressed size
+
+    Returns
+    -------
+    data: ndarray
+        uint8 array holding the decompressed content
+    """
+    with open(Path(input_file), "rb") as compressed:
+        return decompress_zstandard_stream_to_array(compressed, size)
+
+
+def _readinto_full(reader, output):
+    """Fill output with data from reader, return the number of bytes read (smaller than output at EOF)"""
+    output_bytes = memoryview(output)
+    n_read = 0
+    while n_read < len(output_bytes):
+        n = reader.readinto(output_bytes[n_read:])
+        if n == 0:
+            break
+        n_read += n
+    return n_read
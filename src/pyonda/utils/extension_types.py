@@ -0,0 +1,314 @@
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pandas.api.extensions import (
+    ExtensionArray,
+    ExtensionDtype,
+    register_extension_dtype,
+    take,
+)
+from pandas.api.indexers import check_array_indexer
+
+from pyonda.utils.processing import (
+    decode_julia_uuid_array,
+    encode_julia_uuid_array,
+    timespan_array_to_start_stop,
+)
+
+JULIA_UUID_EXTENSION_NAME = "JuliaLang.UUID"
+JULIA_TIMESPAN_EXTENSION_NAME = "JuliaLang.TimeSpan"
+
+TIMESPAN_STORAGE_TYPE = pa.struct([("start", pa.int64()), ("stop", pa.int64())])
+
+
+def _is_timespan_storage_type(storage_type):
+    """Whether storage_type is a struct with start and stop fields"""
+    return (
+        isinstance(storage_type, pa.StructType)
+        and storage_type.get_field_index("start") >= 0
+        and storage_type.get_field_index("stop") >= 0
+    )
+
+
+class JuliaUUIDType(pa.ExtensionType):
+    """Arrow extension type of the UUIDs written by julia: fixed_size_binary(16) storage with reversed bytes
+    (cf. pyonda.utils.processing.convert_julia_uuid_bytestring_to_uuid).
+    Converted to a JuliaUUIDArray of uuid.UUID by to_pandas.
+    """
+
+    def __init__(self):
+        super().__init__(pa.binary(16), JULIA_UUID_EXTENSION_NAME)
+
+    def __arrow_ext_serialize__(self):
+        # Onda.jl writes an empty ARROW:extension:metadata
+        return b""
+
+    @classmethod
+    def __arrow_ext_deserialize__(cls, storage_type, serialized):
+        if storage_type != pa.binary(16):
+            # foreign column using the same extension name: read as its storage type,
+            # as pyarrow does for unregistered extensions
+            return storage_type
+        return cls()
+
+    def to_pandas_dtype(self):
+        return JuliaUUIDDtype()
+
+    def __reduce__(self):
+        # the default reduce looks the type up by alias, which fails for extension types
+        return JuliaUUIDType, ()
+
+    def __hash__(self):
+        return hash((self.extension_name, self.storage_type))
+
+
+class JuliaTimeSpanType(pa.ExtensionType):
+    """Arrow extension type of the TimeSpans written by julia (https://github.com/beacon-biosignals/TimeSpans.jl):
+    struct storage with start and stop children in nanoseconds (int64 or duration[ns]).
+    Converted to a JuliaTimeSpanArray of {"start": int, "stop": int} dicts by to_pandas.
+
+    Parameters
+    ----------
+    storage_type : pyarrow.StructType, optional
+        storage type, by default TIMESPAN_STORAGE_TYPE
+    """
+
+    def __init__(self, storage_type=TIMESPAN_STORAGE_TYPE):
+        if not _is_timespan_storage_type(storage_type):
+            raise ValueError(
+                f"{JULIA_TIMESPAN_EXTENSION_NAME} storage should be a struct with start and stop fields (you have {storage_type})"
+            )
+        super().__init__(storage_type, JULIA_TIMESPAN_EXTENSION_NAME)
+
+    def __arrow_ext_serialize__(self):
+        # Onda.jl writes an empty ARROW:extension:metadata
+        return b""
+
+    @classmethod
+    def __arrow_ext_deserialize__(cls, storage_type, serialized):
+        if not _is_timespan_storage_type(storage_type):
+            # foreign column using the same extension name: read as its storage type,
+            # as pyarrow does for unregistered extensions
+            return storage_type
+        return cls(storage_type)
+
+    def to_pandas_dtype(self):
+        return JuliaTimeSpanDtype()
+
+    def __reduce__(self):
+        return JuliaTimeSpanType, (self.storage_type,)
+
+    def __hash__(self):
+        return hash((self.extension_name, self.storage_type))
+
+
+def _object_array(values):
+    """1D object ndarray from values, without numpy inspecting the objects (e.g. tuples or dicts)"""
+    if isinstance(values, np.ndarray) and values.dtype == object and values.ndim == 1:
+        return values
+    values = list(values)
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+class _ObjectExtensionArray(ExtensionArray):
+    """pandas ExtensionArray holding python objects in a 1D object ndarray, None for null values"""
+
+    _dtype_class = None
+
+    def __init__(self, values):
+        self._data = _object_array(values)
+
+    @classmethod
+    def _from_sequence(cls, scalars, *, dtype=None, copy=False):
+        return cls(scalars)
+
+    @classmethod
+    def _from_factorized(cls, values, original):
+        return cls(values)
+
+    @classmethod
+    def _concat_same_type(cls, to_concat):
+        return cls(np.concatenate([array._data for array in to_concat]))
+
+    @property
+    def dtype(self):
+        return self._dtype_class()
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __getitem__(self, item):
+        if pd.api.types.is_integer(item):
+            return self._data[item]
+        item = check_array_indexer(self, item)
+        return type(self)(self._data[item])
+
+    def __setitem__(self, key, value):
+        if isinstance(value, _ObjectExtensionArray):
+            value = value._data
+        key = check_array_indexer(self, key)
+        self._data[key] = value
+
+    def __eq__(self, other):
+        if isinstance(other, (pd.Series, pd.Index, pd.DataFrame)):
+            return NotImplemented
+        if isinstance(other, _ObjectExtensionArray):
+            other = other._data
+        return np.asarray(self._data == other, dtype=bool)
+
+    def __array__(self, dtype=None):
+        return self._data if dtype is None else self._data.astype(dtype)
+
+    def isna(self):
+        return pd.isna(self._data)
+
+    def take(self, indices, allow_fill=False, fill_value=None):
+        if allow_fill and fill_value is None:
+            fill_value = self.dtype.na_value
+        values = take(self._data, indices, allow_fill=allow_fill, fill_value=fill_value)
+        return type(self)(values)
+
+    def copy(self):
+        return type(self)(self._data.copy())
+
+    def _hashable_values(self):
+        """Hashable keys of the values (the values themselves by default), used to count them"""
+        return self._data
+
+    def value_counts(self, dropna=True):
+        codes, _ = pd.factorize(self._hashable_values(), use_na_sentinel=dropna)
+        unique_codes, first, counts = np.unique(
+            codes, return_index=True, return_counts=True
+        )
+        counted = unique_codes >= 0
+        index = pd.Index(type(self)(self._data[first[counted]]))
+        return pd.Series(counts[counted], index=index, name="count")
+
+
+@register_extension_dtype
+class JuliaUUIDDtype(ExtensionDtype):
+    """pandas dtype of JuliaLang.UUID columns (cf. JuliaUUIDType)"""
+
+    name = JULIA_UUID_EXTENSION_NAME
+    type = uuid.UUID
+    na_value = None
+
+    @classmethod
+    def construct_array_type(cls):
+        return JuliaUUIDArray
+
+    def __from_arrow__(self, array):
+        return JuliaUUIDArray(decode_julia_uuid_array(array))
+
+
+class JuliaUUIDArray(_ObjectExtensionArray):
+    """pandas ExtensionArray of uuid.UUID, converted back to a JuliaUUIDType arrow array"""
+
+    _dtype_class = JuliaUUIDDtype
+
+    @classmethod
+    def _from_sequence(cls, scalars, *, dtype=None, copy=False):
+        return cls(
+            [
+                (
+                    value
+                    if value is None or isinstance(value, uuid.UUID)
+                    else uuid.UUID(value)
+                )
+                for value in scalars
+            ]
+        )
+
+    def __arrow_array__(self, type=None):
+        storage = encode_julia_uuid_array(self._data)
+        return pa.ExtensionArray.from_storage(JuliaUUIDType(), storage)
+
+
+def _decode_julia_timespan_array(array):
+    """{"start": int, "stop": int} dicts of a JuliaTimeSpanType array as an object ndarray, None for null values"""
+    start, stop = timespan_array_to_start_stop(array)
+    values = _object_array(
+        {"start": span_start, "stop": span_stop}
+        for span_start, span_stop in zip(
+            start.fill_null(0).to_numpy().tolist(),
+            stop.fill_null(0).to_numpy().tolist(),
+        )
+    )
+    if array.null_count > 0:
+        values[array.is_null().to_numpy()] = None
+    return values
+
+
+@register_extension_dtype
+class JuliaTimeSpanDtype(ExtensionDtype):
+    """pandas dtype of JuliaLang.TimeSpan columns (cf. JuliaTimeSpanType)"""
+
+    name = JULIA_TIMESPAN_EXTENSION_NAME
+    type = dict
+    na_value = None
+
+    @classmethod
+    def construct_array_type(cls):
+        return JuliaTimeSpanArray
+
+    def __from_arrow__(self, array):
+        return JuliaTimeSpanArray(_decode_julia_timespan_array(array))
+
+
+class JuliaTimeSpanArray(_ObjectExtensionArray):
+    """pandas ExtensionArray of {"start": int, "stop": int} dicts (or TimeSpan namedtuples,
+    cf. pyonda.utils.schemas.timespan_namedtuple), converted back to a JuliaTimeSpanType arrow array
+    """
+
+    _dtype_class = JuliaTimeSpanDtype
+
+    def _hashable_values(self):
+        return _object_array(
+            (
+                value
+                if value is None
+                else (
+                    (value["start"], value["stop"])
+                    if isinstance(value, dict)
+                    else (value.start, value.stop)
+                )
+            )
+            for value in self._data
+        )
+
+    def __arrow_array__(self, type=None):
+        extension_type = (
+            type if isinstance(type, JuliaTimeSpanType) else JuliaTimeSpanType()
+        )
+        storage = pa.array(
+            [
+                value if value is None or isinstance(value, dict) else value._asdict()
+                for value in self._data
+            ],
+            type=extension_type.storage_type,
+        )
+        return pa.ExtensionArray.from_storage(extension_type, storage)
+
+
+def register_julia_extension_types():
+    """Register the JuliaLang.UUID and JuliaLang.TimeSpan arrow extension types, so that columns with
+    these ARROW:extension:name are read as JuliaUUIDType and JuliaTimeSpanType (done when pyonda is imported)
+    """
+    for extension_type in [JuliaUUIDType(), JuliaTimeSpanType()]:
+        try:
+            pa.register_extension_type(extension_type)
+        except pa.ArrowKeyError:
+            # already registered (e.g. module reloaded)
+            pa.unregister_extension_type(extension_type.extension_name)
+            pa.register_extension_type(extension_type)
+
+
+register_julia_extension_types()
@@ -0,0 +1,499 @@
+import os
+import uuid
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from pyonda.utils.extension_types import JuliaTimeSpanArray
+from pyonda.utils.processing import (
+    encode_julia_uuid_array,
+    julia_uuid_array_to_uint8,
+    timespan_array_to_start_stop,
+    uuid_value_to_bytes,
+)
+
+RECORDING_COLUMN = "recording"
+SPAN_COLUMN = "span"
+RECORDING_INDEX_SUFFIX = ".recording_index.npz"
+SPAN_PREDICATES = ("overlaps", "within", "contains")
+
+
+def _uuid_bytes_to_keys(uuid_bytes):
+    """Two big-endian uint64 sort keys (high, low) per row of an (n, 16) uint8 array of UUID bytes"""
+    halves = np.ascontiguousarray(uuid_bytes).view(">u8").astype(np.uint64)
+    return halves[:, 0], halves[:, 1]
+
+
+def _recording_column_to_uint8(column):
+    """UUID bytes of a recording column (arrow JuliaLang.UUID column or sequence of UUIDs) and its null mask"""
+    if isinstance(column, pd.Series):
+        column = column.tolist()
+    if not isinstance(column, (pa.Array, pa.ChunkedArray)):
+        column = encode_julia_uuid_array(column)
+    is_null = np.asarray(column.is_null(), dtype=bool)
+    return julia_uuid_array_to_uint8(column), is_null
+
+
+class RecordingIndex:
+    """Index of the rows of an Onda table (signals, annotations...) by recording UUID
+
+    The index is built in one vectorized pass: the 16 bytes recording keys are sorted (stable lexsort on
+    two uint64 halves), so that the rows of each recording are contiguous in the positions array.
+    Lookups are O(1) (dict of the unique recordings) and return the row positions in table order.
+
+    Parameters
+    ----------
+    recordings : ndarray
+        uint8 array of shape (n_recordings, 16), sorted unique recording UUID bytes (uuid.UUID.bytes)
+    offsets : ndarray
+        int64 array of shape (n_recordings + 1,), rows of recording i are positions[offsets[i]:offsets[i + 1]]
+    positions : ndarray
+        int64 row positions grouped by recording
+    n_rows : int
+        number of rows of the indexed table
+    """
+
+    def __init__(self, recordings, offsets, positions, n_rows):
+        self.recordings = np.asarray(recordings, dtype=np.uint8).reshape(-1, 16)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.n_rows = int(n_rows)
+        if len(self.offsets) != len(self.recordings) + 1:
+            raise ValueError(
+                f"Expected {len(self.recordings) + 1} offsets (you have {len(self.offsets)})"
+            )
+        # recording UUID bytes -> group index, for O(1) lookups
+        keys = self.recordings.tobytes()
+        self._groups = {
+            keys[16 * i : 16 * (i + 1)]: i for i in range(len(self.recordings))
+        }
+
+    @classmethod
+    def from_table(cls, table, column=RECORDING_COLUMN):
+        """Build the index of a table
+
+        Parameters
+        ----------
+        table : pyarrow.Table or pandas.DataFrame
+            table with a recording column, JuliaLang.UUID arrow column or column of uuid.UUID
+        column : str, optional
+            name of the recording column, by default recording
+
+        Returns
+        -------
+        index: RecordingIndex
+            index of the rows of the table by recording, rows with a null recording are not indexed
+        """
+        uuid_bytes, is_null = _recording_column_to_uint8(table[column])
+        n_rows = len(uuid_bytes)
+        positions = np.flatnonzero(~is_null)
+        high, low = _uuid_bytes_to_keys(uuid_bytes[positions])
+        order = np.lexsort((low, high))
+        positions = positions[order]
+        high, low = high[order], low[order]
+
+        is_start = np.ones(len(positions), dtype=bool)
+        is_start[1:] = (high[1:] != high[:-1]) | (low[1:] != low[:-1])
+        starts = np.flatnonzero(is_start)
+        offsets = np.append(starts, len(positions))
+        return cls(uuid_bytes[positions[starts]], offsets, positions, n_rows)
+
+    def __len__(self):
+        return len(self.recordings)
+
+    def __contains__(self, recording):
+        return uuid_value_to_bytes(recording) in self._groups
+
+    def _group(self, recording):
+        """Index of the group of a recording, None if the recording is not indexed"""
+        return self._groups.get(uuid_value_to_bytes(recording))
+
+    def get_recordings(self):
+        """Get the indexed recordings
+
+        Returns
+        -------
+        recordings: list of uuid.UUID
+            sorted recording UUIDs
+        """
+        return [uuid.UUID(bytes=key) for key in self._groups]
+
+    def get_rows(self, recording):
+        """Get the rows of a recording
+
+        Parameters
+        ----------
+        recording : uuid.UUID, str or bytes
+            recording UUID (uuid.UUID, hex string or 16 bytes uuid.UUID.bytes)
+
+        Returns
+        -------
+        rows: ndarray
+            int64 row positions of the recording in table order, empty if the recording is not indexed
+        """
+        group = self._group(recording)
+        if group is None:
+            return np.empty(0, dtype=np.int64)
+        return self.positions[self.offsets[group] : self.offsets[group + 1]]
+
+    def get_rows_of_recordings(self, recordings):
+        """Get the rows of several recordings
+
+        Parameters
+        ----------
+        recordings : iterable
+            recording UUIDs (uuid.UUID, hex strings or 16 bytes uuid.UUID.bytes)
+
+        Returns
+        -------
+        rows: ndarray
+            sorted int64 row positions of the recordings
+        """
+        rows = [self.get_rows(recording) for recording in recordings]
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(rows))
+
+    def take(self, table, recordings):
+        """Select the rows of some recordings in the indexed table
+
+        Parameters
+        ----------
+        table : pyarrow.Table or pandas.DataFrame
+            indexed table
+        recordings : uuid.UUID, str, bytes or iterable
+            recording UUID or UUIDs
+
+        Returns
+        -------
+        table: pyarrow.Table or pandas.DataFrame
+            rows of the recordings in table order
+        """
+        if len(table) != self.n_rows:
+            raise ValueError(
+                f"Table has {len(table)} rows but the index was built on {self.n_rows} rows"
+            )
+        if isinstance(recordings, (uuid.UUID, str, bytes)):
+            recordings = [recordings]
+        rows = self.get_rows_of_recordings(recordings)
+        if isinstance(table, pd.DataFrame):
+            return table.iloc[rows]
+        return table.take(rows)
+
+    def save(self, path, source_stat=None):
+        """Save the index to a npz file, written atomically
+
+        Parameters
+        ----------
+        path : str or Path
+            output file path
+        source_stat : tuple of int, optional
+            (size, mtime_ns) of the indexed table file, used to detect stale sidecar files
+        """
+        directory = os.path.dirname(os.path.abspath(str(path)))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(
+                    fh,
+                    recordings=self.recordings,
+                    offsets=self.offsets,
+                    positions=self.positions,
+                    n_rows=np.int64(self.n_rows),
+                    source_stat=np.asarray(
+                        (-1, -1) if source_stat is None else source_stat,
+                        dtype=np.int64,
+                    ),
+                )
+            os.replace(temp_path, str(path))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Load an index saved with RecordingIndex.save
+
+        Parameters
+        ----------
+        path : str or Path
+            index file path
+
+        Returns
+        -------
+        index: RecordingIndex
+            loaded index
+        """
+        index, _ = cls._load_with_source_stat(path)
+        return index
+
+    @classmethod
+    def _load_with_source_stat(cls, path):
+        with np.load(str(path), allow_pickle=False) as data:
+            index = cls(
+                data["recordings"], data["offsets"], data["positions"], data["n_rows"]
+            )
+            return index, tuple(data["source_stat"].tolist())
+
+
+def recording_index_path(path_to_table):
+    """Path of the sidecar index file of an arrow table (table path + RECORDING_INDEX_SUFFIX)"""
+    return str(path_to_table) + RECORDING_INDEX_SUFFIX
+
+
+def get_recording_index(path_to_table, column=RECORDING_COLUMN, save=True):
+    """Get the recording index of an arrow table file, from its sidecar file if it is up to date,
+    otherwise built from the recording column only and saved as a sidecar file
+
+    Parameters
+    ----------
+    path_to_table : str or Path
+        path to arrow table
+    column : str, optional
+        name of the recording column, by default recording
+    save : bool, optional
+        if True save the index next to the table when it is (re)built, by default True
+
+    Returns
+    -------
+    index: RecordingIndex
+        index of the rows of the table by recording
+    """
+    table_stat = os.stat(str(path_to_table))
+    source_stat = (table_stat.st_size, table_stat.st_mtime_ns)
+    index_path = recording_index_path(path_to_table)
+    if os.path.exists(index_path):
+        index, index_source_stat = RecordingIndex._load_with_source_stat(index_path)
+        if index_source_stat == source_stat:
+            return index
+
+    with pa.memory_map(str(path_to_table), "r") as source:
+        table = pa.ipc.open_file(source).read_all().select([column])
+    index = RecordingIndex.from_table(table, column)
+    if save:
+        index.save(index_path, source_stat)
+    return index
+
+
+def _span_column_to_start_stop(column):
+    """int64 start and stop of a span column (arrow JuliaLang.TimeSpan column or sequence of TimeSpans) and its null mask"""
+    if isinstance(column, pd.Series):
+        column = pa.array(JuliaTimeSpanArray(column.to_numpy(dtype=object)))
+    is_null = np.asarray(column.is_null(), dtype=bool)
+    start, stop = timespan_array_to_start_stop(column)
+    return (
+        start.fill_null(0).to_numpy(),
+        stop.fill_null(0).to_numpy(),
+        is_null,
+    )
+
+
+def _grouped_running_max(values, offsets):
+    """Running maximum of int64 values reset at each group values[offsets[i]:offsets[i + 1]], in one pass
+
+    Each value is shifted by group * width, with width larger than the range of the (shifted) values:
+    the values of a group are then larger than those of the previous groups, so that a single running
+    maximum never crosses a group boundary. When the shifted values would overflow int64, the values
+    are first replaced by their ranks.
+    """
+    n_groups = len(offsets) - 1
+    groups = np.repeat(np.arange(n_groups, dtype=np.int64), np.diff(offsets))
+    if len(values) == 0:
+        return values.copy()
+    low, high = int(values.min()), int(values.max())
+    width = high - low + 1
+    if width * n_groups <= np.iinfo(np.int64).max:
+        shifts = groups * width
+        keys = values - low + shifts
+        np.maximum.accumulate(keys, out=keys)
+        return keys - shifts + low
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty_like(order)
+    ranks[order] = np.arange(len(values))
+    shifts = groups * len(values)
+    keys = ranks + shifts
+    np.maximum.accumulate(keys, out=keys)
+    return values[order[keys - shifts]]
+
+
+class SpanIndex:
+    """Interval index of the spans of an Onda table (annotations, signals...) per recording
+
+    Within each recording the spans are sorted by start, with the running maximum of their stops
+    (max-stop augmentation): as both arrays are sorted, the candidates of a query are bounded with two
+    binary searches and only the spans between the bounds are checked, in O(log n + k) for the usual
+    annotation tables (spans that do not contain each other).
+
+    Parameters
+    ----------
+    recording_index : RecordingIndex
+        index of the rows by recording, the rows of each recording sorted by span start
+    starts : ndarray
+        int64 span starts in nanoseconds, aligned with recording_index.positions
+    stops : ndarray
+        int64 span stops in nanoseconds, aligned with recording_index.positions
+    """
+
+    def __init__(self, recording_index, starts, stops):
+        self.recording_index = recording_index
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.stops = np.asarray(stops, dtype=np.int64)
+        if not len(self.starts) == len(self.stops) == len(recording_index.positions):
+            raise ValueError(
+                f"Expected {len(recording_index.positions)} starts and stops "
+                f"(you have {len(self.starts)} and {len(self.stops)})"
+            )
+        self.max_stops = _grouped_running_max(self.stops, recording_index.offsets)
+
+    @classmethod
+    def from_table(cls, table, span_column=SPAN_COLUMN, column=RECORDING_COLUMN):
+        """Build the index of a table in bulk from its span column
+
+        Parameters
+        ----------
+        table : pyarrow.Table or pandas.DataFrame
+            table with a recording column and a JuliaLang.TimeSpan span column
+            (or columns of uuid.UUID and of {"start": int, "stop": int} dicts)
+        span_column : str, optional
+            name of the span column, by default span
+        column : str, optional
+            name of the recording column, by default recording
+
+        Returns
+        -------
+        index: SpanIndex
+            index of the spans of the table, rows with a null recording or span are not indexed
+        """
+        recording_index = RecordingIndex.from_table(table, column)
+        start, stop, is_null = _span_column_to_start_stop(table[span_column])
+        offsets = recording_index.offsets
+        groups = np.repeat(np.arange(len(recording_index)), np.diff(offsets))
+        positions = recording_index.positions
+        is_valid = ~is_null[positions]
+        positions, groups = positions[is_valid], groups[is_valid]
+
+        order = np.lexsort((start[positions], groups))
+        positions, groups = positions[order], groups[order]
+        offsets = np.searchsorted(groups, np.arange(len(recording_index) + 1))
+        recording_index = RecordingIndex(
+            recording_index.recordings, offsets, positions, recording_index.n_rows
+        )
+        return cls(recording_index, start[positions], stop[positions])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _bounds(self, first, last, query_starts, query_stops, predicate):
+        """Candidate bounds of the queries in the spans first:last of a recording and the span check"""
+        starts = self.starts[first:last]
+        max_stops = self.max_stops[first:last]
+        if predicate == "overlaps":
+            # start < query stop and stop > query start
+            upper = np.searchsorted(starts, query_stops, side="left")
+            lower = np.searchsorted(max_stops, query_starts, side="right")
+            return lower, upper, lambda stops, window: stops > query_starts[window]
+        if predicate == "within":
+            # start >= query start and stop <= query stop
+            lower = np.searchsorted(starts, query_starts, side="left")
+            upper = np.searchsorted(starts, query_stops, side="right")
+            return lower, upper, lambda stops, window: stops <= query_stops[window]
+        # contains: start <= query start and stop >= query stop
+        upper = np.searchsorted(starts, query_starts, side="right")
+        lower = np.searchsorted(max_stops, query_stops, side="left")
+        return lower, upper, lambda stops, window: stops >= query_stops[window]
+
+    def query_batch(self, recording, starts, stops, predicate="overlaps"):
+        """Get the spans of a recording matching many time windows at once
+
+        Parameters
+        ----------
+        recording : uuid.UUID, str or bytes
+            recording UUID (uuid.UUID, hex string or 16 bytes uuid.UUID.bytes)
+        starts : array_like
+            int window starts in nanoseconds
+        stops : array_like
+            int window stops in nanoseconds
+        predicate : str, optional
+            overlaps: spans [start, stop) overlapping the window [start, stop),
+            within: spans contained in the window,
+            contains: spans containing the window, by default overlaps
+
+        Returns
+        -------
+        windows: ndarray
+            int64 window index of each match, sorted
+        rows: ndarray
+            int64 row position of each match, in table order for each window
+        """
+        query_starts = np.asarray(starts, dtype=np.int64).reshape(-1)
+        query_stops = np.asarray(stops, dtype=np.int64).reshape(-1)
+        if len(query_starts) != len(query_stops):
+            raise ValueError(
+                f"Expected as many starts as stops (you have {len(query_starts)} and {len(query_stops)})"
+            )
+        if predicate not in SPAN_PREDICATES:
+            raise ValueError(
+                f"predicate should be one of {', '.join(SPAN_PREDICATES)} (you have {predicate})"
+            )
+        group = self.recording_index._group(recording)
+        if group is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        first, last = self.recording_index.offsets[group : group + 2]
+        lower, upper, check = self._bounds(
+            first, last, query_starts, query_stops, predicate
+        )
+
+        # all the candidates lower[i] <= j < upper[i] of all the windows, without python loop
+        counts = np.maximum(upper - lower, 0)
+        windows = np.repeat(np.arange(len(counts)), counts)
+        candidates = (
+            np.arange(counts.sum())
+            - np.repeat(np.cumsum(counts) - counts, counts)
+            + np.repeat(lower, counts)
+            + first
+        )
+        is_match = check(self.stops[candidates], windows)
+        windows = windows[is_match]
+        rows = self.recording_index.positions[candidates[is_match]]
+        order = np.lexsort((rows, windows))
+        return windows[order], rows[order]
+
+    def query(self, recording, start, stop, predicate="overlaps"):
+        """Get the spans of a recording matching a time window
+
+        Parameters
+        ----------
+        recording : uuid.UUID, str or bytes
+            recording UUID (uuid.UUID, hex string or 16 bytes uuid.UUID.bytes)
+        start : int
+            window start in nanoseconds
+        stop : int
+            window stop in nanoseconds
+        predicate : str, optional
+            overlaps, within or contains (cf. query_batch), by default overlaps
+
+        Returns
+        -------
+        rows: ndarray
+            int64 row positions of the matching spans in table order
+        """
+        return self.query_batch(recording, [start], [stop], predicate)[1]
+
+    def at(self, recording, time):
+        """Get the spans of a recording containing a point in time (start <= time < stop)
+
+        Parameters
+        ----------
+        recording : uuid.UUID, str or bytes
+            recording UUID (uuid.UUID, hex string or 16 bytes uuid.UUID.bytes)
+        time : int
+            time in nanoseconds
+
+        Returns
+        -------
+        rows: ndarray
+            int64 row positions of the matching spans in table order
+        """
+        return self.query(recording, time, time + 1, predicate="contains")
@@ -0,0 +1,331 @@
+import numpy as np
+from collections import namedtuple
+
+# Description of the bytes to read from an lpcm file to extract a window of samples
+#   byte_ranges: list of (offset, length) tuples, sorted and non overlapping
+#   read_shape: shape of the array built from the concatenated byte ranges
+#   read_order: memory layout of the array built from the concatenated byte ranges
+#   channel_selection: rows to select from the read array (None to keep all rows)
+LpcmWindowPlan = namedtuple(
+    "LpcmWindowPlan",
+    ["dtype", "byte_ranges", "read_shape", "read_order", "channel_selection"],
+)
+
+
+def check_lpcm_array_length(full_length, n_channels):
+    """Check that the number of samples read from an lpcm file can be split into n_channels
+
+    Parameters
+    ----------
+    full_length : int
+        total number of values stored in the lpcm file
+    n_channels : int
+        number of channels used to reshape data
+
+    Raises
+    ------
+    ValueError
+        if full_length is not a multiple of n_channels
+    """
+    if full_length % n_channels != 0:
+        raise ValueError(
+            f"n_channels ({n_channels}) not a multiple of array length ({full_length})"
+        )
+
+
+def n_samples_from_byte_size(byte_size, dtype, n_channels):
+    """Compute the number of samples per channel stored in an lpcm file of a given size
+
+    Parameters
+    ----------
+    byte_size : int
+        size of the uncompressed lpcm content in bytes
+    dtype : type
+        data sample type (passed to dtype argument in numpy)
+    n_channels : int
+        number of channels stored in the file
+
+    Returns
+    -------
+    n_samples : int
+        number of samples per channel
+
+    Raises
+    ------
+    ValueError
+        if byte_size is not a multiple of the sample type size or of n_channels
+    """
+    itemsize = np.dtype(dtype).itemsize
+    if byte_size % itemsize != 0:
+        raise ValueError(
+            f"file size ({byte_size}) not a multiple of the sample type size ({itemsize})"
+        )
+    full_length = byte_size // itemsize
+    check_lpcm_array_length(full_length, n_channels)
+    return full_length // n_channels
+
+
+def time_range_to_sample_range(time_range, sample_rate):
+    """Convert a time range in nanoseconds to the range of sample indices overlapping it
+    Sample i is considered to cover [i / sample_rate, (i + 1) / sample_rate)
+
+    Parameters
+    ----------
+    time_range : tuple of int
+        (start, stop) in nanoseconds, stop excluded
+    sample_rate : float
+        sample rate of the signal in Hz
+
+    Returns
+    -------
+    sample_range : tuple of int
+        (first, last) sample indices, last excluded
+    """
+    start, stop = time_range
+    if stop < start:
+        raise ValueError(f"start ({start}) should be <= stop ({stop})")
+    first = int(np.floor(start * sample_rate / 1e9))
+    last = int(np.ceil(stop * sample_rate / 1e9))
+    return first, last
+
+
+def resolve_sample_range(sample_range=None, time_range=None, sample_rate=None):
+    """Get the sample range to read from either a sample range or a time range and a sample rate
+
+    Parameters
+    ----------
+    sample_range : tuple of int, optional
+        (first, last) sample indices, last excluded
+    time_range : tuple of int, optional
+        (start, stop) in nanoseconds, stop excluded, requires sample_rate
+    sample_rate : float, optional
+        sample rate of the signal in Hz
+
+    Returns
+    -------
+    sample_range : tuple of int or None
+        (first, last) sample indices, None if neither sample_range nor time_range is given
+    """
+    if time_range is None:
+        return sample_range
+    if sample_range is not None:
+        raise ValueError("sample_range and time_range cannot be given together")
+    if sample_rate is None:
+        raise ValueError("sample_rate is required to read a time_range")
+    return time_range_to_sample_range(time_range, sample_rate)
+
+
+def plan_lpcm_window(
+    n_samples, dtype, n_channels, sample_range=None, channels=None, order="F"
+):
+    """Compute the byte ranges of an lpcm file holding a window of samples for a subset of channels
+
+    With order F (Julia/Onda layout) samples are interleaved: a sample range is a single contiguous
+    byte range covering all channels. With order C each channel is contiguous: one byte range is
+    needed per selected channel.
+
+    Parameters
+    ----------
+    n_samples : int
+        number of samples per channel stored in the file
+    dtype : type
+        data sample type (passed to dtype argument in numpy)
+    n_channels : int
+        number of channels stored in the file
+    sample_range : tuple of int, optional
+        (first, last) sample indices, last excluded, by default all samples
+    channels : list of int, optional
+        channel indices to keep, by default all channels
+    order : str
+        C or F, use F to read files from Julia, use C to save files for Julia
+
+    Returns
+    -------
+    plan: LpcmWindowPlan
+        byte ranges to read and how to reshape them
+    """
+    dtype = np.dtype(dtype)
+    itemsize = dtype.itemsize
+
+    first, last = (0, n_samples) if sample_range is None else sample_range
+    first, last = int(first), int(last)
+    if not 0 <= first <= last <= n_samples:
+        raise ValueError(
+            f"sample range ({first}, {last}) out of bounds for {n_samples} samples"
+        )
+    n_window = last - first
+
+    if channels is not None:
+        channels = np.asarray(channels, dtype=np.int64).reshape(-1)
+        if np.any(channels < 0) or np.any(channels >= n_channels):
+            raise ValueError(
+                f"channel indices {channels.tolist()} out of bounds for {n_channels} channels"
+            )
+
+    if order == "F":
+        byte_ranges = [
+            (first * n_channels * itemsize, n_window * n_channels * itemsize)
+        ]
+        return LpcmWindowPlan(dtype, byte_ranges, (n_channels, n_window), "F", channels)
+    if order == "C":
+        read_channels = (
+            np.arange(n_channels) if channels is None else np.unique(channels)
+        )
+        byte_ranges = [
+            ((int(channel) * n_samples + first) * itemsize, n_window * itemsize)
+            for channel in read_channels
+        ]
+        channel_selection = None
+        if channels is not None and not np.array_equal(channels, read_channels):
+            channel_selection = np.searchsorted(read_channels, channels)
+        return LpcmWindowPlan(
+            dtype, byte_ranges, (len(read_channels), n_window), "C", channel_selection
+        )
+    raise ValueError(f"order should be C or F (you have {order})")
+
+
+def merge_byte_ranges(byte_ranges, max_gap=0):
+    """Merge sorted byte ranges separated by at most max_gap bytes
+
+    Parameters
+    ----------
+    byte_ranges : list of tuple
+        sorted and non overlapping (offset, length) tuples
+    max_gap : int, optional
+        merge ranges separated by at most this number of bytes, by default 0 (adjacent ranges only)
+
+    Returns
+    -------
+    merged_ranges: list of tuple
+        (offset, length) tuples
+    """
+    merged_ranges = []
+    for offset, length in byte_ranges:
+        if length == 0:
+            continue
+        if merged_ranges:
+            previous_offset, previous_length = merged_ranges[-1]
+            if offset - (previous_offset + previous_length) <= max_gap:
+                merged_ranges[-1] = (previous_offset, offset + length - previous_offset)
+                continue
+        merged_ranges.append((offset, length))
+    return merged_ranges
+
+
+def read_byte_ranges(byte_ranges, read_range, output, max_gap=0):
+    """Read byte ranges into a buffer, merging ranges separated by at most max_gap bytes
+    so that each merged range is read with a single call to read_range
+
+    Parameters
+    ----------
+    byte_ranges : list of tuple
+        sorted and non overlapping (offset, length) tuples
+    read_range : callable
+        read_range(offset, length) returns a bytes-like object of the given length
+    output : ndarray
+        contiguous array filled with the concatenated byte ranges
+    max_gap : int, optional
+        merge ranges separated by at most this number of bytes, by default 0 (adjacent ranges only)
+    """
+    output_bytes = output.reshape(-1).view(np.uint8)
+    byte_ranges = [byte_range for byte_range in byte_ranges if byte_range[1] > 0]
+    position = 0
+    index = 0
+    for merged_offset, merged_length in merge_byte_ranges(byte_ranges, max_gap):
+        content = np.frombuffer(read_range(merged_offset, merged_length), np.uint8)
+        while (
+            index < len(byte_ranges)
+            and byte_ranges[index][0] < merged_offset + merged_length
+        ):
+            offset, length = byte_ranges[index]
+            start = offset - merged_offset
+            output_bytes[position : position + length] = content[start : start + length]
+            position += length
+            index += 1
+
+
+def lpcm_window_from_flat_array(plan, flat_array):
+    """Reshape the concatenated content of the byte ranges of a plan into the requested window
+
+    Parameters
+    ----------
+    plan : LpcmWindowPlan
+        plan returned by plan_lpcm_window
+    flat_array : ndarray
+        1D array holding the concatenated byte ranges of the plan
+
+    Returns
+    -------
+    data: ndarray
+        array of shape (n_selected_channels, n_window_samples)
+    """
+    data = flat_array.reshape(plan.read_shape, order=plan.read_order)
+    if plan.channel_selection is not None:
+        data = data[plan.channel_selection]
+    return data
+
+
+def _iter_c_order_pieces(array, max_values):
+    """Yield contiguous 1D pieces of at most max_values values whose concatenation is array in C order"""
+    if array.size == 0:
+        return
+    if array.ndim <= 1 or array.flags.c_contiguous:
+        flat = array.reshape(-1)
+        for start in range(0, flat.size, max_values):
+            yield np.ascontiguousarray(flat[start : start + max_values])
+        return
+    n_rows = max_values // array[0].size
+    if n_rows == 0:
+        for row in array:
+            yield from _iter_c_order_pieces(row, max_values)
+        return
+    for start in range(0, array.shape[0], n_rows):
+        yield np.ascontiguousarray(array[start : start + n_rows]).reshape(-1)
+
+
+def iter_lpcm_chunks(array, order="C", chunk_values=2**20):
+    """Iterate over the values of an array in the order they are stored in an lpcm file, in bounded chunks
+    Each chunk holds exactly chunk_values values (except the last one), no full size copy of the array is made.
+
+    Parameters
+    ----------
+    array : ndarray
+        input numpy array
+    order : str
+        C or F, use F to read files from Julia, use C to save files for Julia
+    chunk_values : int, optional
+        number of values per chunk, by default 2**20
+
+    Yields
+    ------
+    chunk: ndarray
+        contiguous 1D array of at most chunk_values values
+    """
+    if chunk_values <= 0:
+        raise ValueError(
+            f"chunk_values should be a positive integer (you have {chunk_values})"
+        )
+    if order == "F":
+        # the F order values of an array are the C order values of its transpose
+        array = array.T
+    elif order != "C":
+        raise ValueError(f"order should be C or F (you have {order})")
+
+    pending = []
+    n_pending = 0
+    for piece in _iter_c_order_pieces(array, chunk_values):
+        while piece.size > 0:
+            if n_pending == 0 and piece.size >= chunk_values:
+                yield piece[:chunk_values]
+                piece = piece[chunk_values:]
+                continue
+            n_taken = min(chunk_values - n_pending, piece.size)
+            pending.append(piece[:n_taken])
+            n_pending += n_taken
+            piece = piece[n_taken:]
+            if n_pending == chunk_values:
+                yield np.concatenate(pending)
+                pending = []
+                n_pending = 0
+    if n_pending > 0:
+        yield np.concatenate(pending)
@@ -1,5 +1,31 @@
 import uuid
+import functools
+import numpy as np
+import pandas as pd
 import pyarrow as pa
+import pyarrow.compute as pc
+from collections import namedtuple
+
+UUID_FORMATS = ("uuid", "str", "bytes")
+SPAN_FORMATS = ("dict", "columns", "interval", "arrow")
+PROCESSING_PLAN_CACHE_SIZE = 128
+
+# Columns of a table schema requiring a processing step in arrow_to_processed_pandas
+#   uuid_columns: JuliaLang.UUID columns, decoded from the arrow buffers
+#   timespan_columns: JuliaLang.TimeSpan columns, converted according to span_format
+#   list_columns: list columns, converted to python lists
+ProcessingPlan = namedtuple(
+    "ProcessingPlan", ["uuid_columns", "timespan_columns", "list_columns"]
+)
+
+# lowercase hexadecimal digits and positions of the hex digits in the canonical 36 characters UUID string
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_UUID_STR_HEX_POSITIONS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+_UUID_STR_DASH_POSITIONS = np.array([8, 13, 18, 23])
+# value of each ASCII character as a hexadecimal digit, 255 for non hexadecimal characters
+_HEX_VALUES = np.full(256, 255, dtype=np.uint8)
+_HEX_VALUES[np.frombuffer(b"0123456789abcdef", dtype=np.uint8)] = np.arange(16)
+_HEX_VALUES[np.frombuffer(b"ABCDEF", dtype=np.uint8)] = np.arange(10, 16)
 
 
 def convert_julia_uuid_bytestring_to_uuid(uuid_bytestring):
@@ -9,7 +35,7 @@ def convert_julia_uuid_bytestring_to_uuid(uuid_bytestring):
     Parameters
     ----------
     value : bytestring
-        coming from julia
+        coming from julia (uuid.UUID values are returned unchanged)
 
     Returns
     -------
@@ -18,6 +44,9 @@ def convert_julia_uuid_bytestring_to_uuid(uuid_bytestring):
     """
     if uuid_bytestring is None:
         return None
+    if isinstance(uuid_bytestring, uuid.UUID):
+        # already decoded by to_pandas (cf. pyonda.utils.extension_types.JuliaUUIDType)
+        return uuid_bytestring
     x = bytearray(uuid_bytestring)
     x.reverse()
     uuid_obj = uuid.UUID(bytes=bytes(x))
@@ -46,6 +75,129 @@ def convert_python_uuid_to_uuid_bytestring(uuid_instance):
     return uuid_bytes
 
 
+def _hex_str_to_uuid_bytes(values):
+    """UUID bytes of a list of canonical (36 characters) or 32 digits hex strings as an (n, 16) uint8 array,
+    None if the strings do not all have the same one of these formats"""
+    # check each length: strings of invalid lengths could sum up to a valid total length
+    lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+    if np.all(lengths == 36):
+        width = 36
+    elif np.all(lengths == 32):
+        width = 32
+    else:
+        return None
+    try:
+        characters = np.frombuffer("".join(values).encode("ascii"), dtype=np.uint8)
+    except UnicodeEncodeError:
+        return None
+    characters = characters.reshape(-1, width)
+    if width == 36:
+        if np.any(characters[:, _UUID_STR_DASH_POSITIONS] != ord("-")):
+            return None
+        characters = characters[:, _UUID_STR_HEX_POSITIONS]
+    digits = _HEX_VALUES[characters]
+    if np.any(digits == 255):
+        return None
+    return (digits[:, 0::2] << 4) | digits[:, 1::2]
+
+
+def _sequence_to_uuid_bytes(values):
+    """UUID bytes of a list of uuid.UUID, hex strings or bytes (None excluded) as an (n, 16) uint8 array"""
+    if all(type(value) is uuid.UUID for value in values):
+        raw = b"".join([value.bytes for value in values])
+    elif all(isinstance(value, str) for value in values):
+        uuid_bytes = _hex_str_to_uuid_bytes(values)
+        if uuid_bytes is not None:
+            return uuid_bytes
+        # other formats supported by uuid.UUID (braces, urn prefix...)
+        raw = b"".join([uuid.UUID(value).bytes for value in values])
+    else:
+        raw = b"".join([uuid_value_to_bytes(value) for value in values])
+    return np.frombuffer(raw, dtype=np.uint8).reshape(-1, 16)
+
+
+def uuid_value_to_bytes(value):
+    """Get the big-endian bytes (uuid.UUID.bytes) of a single UUID value
+
+    Parameters
+    ----------
+    value : uuid.UUID, str or bytes
+        uuid.UUID, hex string or 16 bytes value
+
+    Returns
+    -------
+    uuid_bytes: bytes
+        16 bytes of the UUID
+
+    Raises
+    ------
+    ValueError
+        if the value cannot be converted to a UUID
+    """
+    if isinstance(value, uuid.UUID):
+        return value.bytes
+    if isinstance(value, str):
+        return uuid.UUID(value).bytes
+    if isinstance(value, (bytes, bytearray)) and len(value) == 16:
+        return bytes(value)
+    raise ValueError(f"Cannot convert {value!r} to a UUID")
+
+
+def encode_julia_uuid_array(values):
+    """Encode UUIDs in bulk to an arrow column readable by julia: the bytes of each UUID are reversed
+    (cf. convert_python_uuid_to_uuid_bytestring) with a single numpy operation.
+    The column should be stored in a field with the JuliaLang.UUID extension metadata (cf. pyonda.utils.schemas.julia_uuid_field)
+
+    Parameters
+    ----------
+    values : sequence or ndarray
+        sequence of uuid.UUID, hex strings or 16 bytes values (None for null values),
+        or numpy array of shape (n, 16) with uint8 dtype or of shape (n,) with a 16 bytes dtype (e.g. S16, V16),
+        holding the big-endian representation of the UUIDs (uuid.UUID.bytes)
+
+    Returns
+    -------
+    array: pyarrow.FixedSizeBinaryArray
+        fixed_size_binary(16) array with reversed bytes
+
+    Raises
+    ------
+    ValueError
+        if the values cannot be converted to UUIDs
+    """
+    null_mask = None
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        if values.dtype.itemsize == 16 and values.ndim == 1:
+            values = values.view(np.uint8).reshape(-1, 16)
+        if values.dtype != np.uint8 or values.ndim != 2 or values.shape[1] != 16:
+            raise ValueError(
+                f"Expected a uint8 array of shape (n, 16) or a 16 bytes dtype array (you have {values.dtype} {values.shape})"
+            )
+        uuid_bytes = values
+    else:
+        values = list(values)
+        null_mask = np.fromiter(
+            (value is None for value in values), dtype=bool, count=len(values)
+        )
+        if null_mask.any():
+            valid_values = [value for value in values if value is not None]
+            uuid_bytes = np.zeros((len(values), 16), dtype=np.uint8)
+            uuid_bytes[~null_mask] = _sequence_to_uuid_bytes(valid_values)
+        else:
+            null_mask = None
+            uuid_bytes = _sequence_to_uuid_bytes(values)
+
+    data = pa.py_buffer(np.ascontiguousarray(uuid_bytes[:, ::-1]))
+    validity = None
+    null_count = 0
+    if null_mask is not None:
+        validity = pa.py_buffer(np.packbits(~null_mask, bitorder="little"))
+        null_count = int(null_mask.sum())
+    return pa.FixedSizeBinaryArray.from_buffers(
+        pa.binary(16), len(uuid_bytes), [validity, data], null_count
+    )
+
+
 def check_if_schema_field_has_unsupported_binary_data(field):
     """Given a pyarrow schema field, check if its type is FixedSizeBinaryType or if it is a StructType
     check if any children have the FixedSizeBinaryType in a recursive manner. Raise ValueError if we cannot
@@ -88,49 +240,336 @@ def check_if_schema_field_has_unsupported_binary_data(field):
                 )
 
 
-def arrow_to_processed_pandas(table):
+def _julia_uuid_array_to_bytes(array):
+    """Reversed UUID bytes of a FixedSizeBinaryArray as an (n, 16) uint8 array, read from the Arrow data buffer"""
+    data_buffer = array.buffers()[1]
+    if data_buffer is None:
+        return np.empty((0, 16), dtype=np.uint8)
+    data = np.frombuffer(data_buffer, dtype=np.uint8)
+    data = data[array.offset * 16 : (array.offset + len(array)) * 16]
+    return np.ascontiguousarray(data.reshape(-1, 16)[:, ::-1])
+
+
+def julia_uuid_array_to_uint8(array):
+    """Get the big-endian bytes (uuid.UUID.bytes) of a JuliaLang.UUID column as a uint8 matrix,
+    with a single byte reversal on the Arrow data buffer
+
+    Parameters
+    ----------
+    array : pyarrow.FixedSizeBinaryArray, pyarrow.ExtensionArray or pyarrow.ChunkedArray
+        fixed_size_binary(16) or JuliaLang.UUID extension column coming from julia
+
+    Returns
+    -------
+    uuid_bytes: ndarray
+        uint8 array of shape (n, 16), zeros for null values
+    """
+    if isinstance(array, pa.ChunkedArray):
+        chunks = [julia_uuid_array_to_uint8(chunk) for chunk in array.chunks]
+        return np.concatenate(chunks) if chunks else np.empty((0, 16), np.uint8)
+    if isinstance(array, pa.ExtensionArray):
+        array = array.storage
+    uuid_bytes = _julia_uuid_array_to_bytes(array)
+    if array.null_count > 0:
+        uuid_bytes[array.is_null().to_numpy(zero_copy_only=False)] = 0
+    return uuid_bytes
+
+
+def _uuid_bytes_to_str(uuid_bytes):
+    """Canonical lowercase UUID strings of an (n, 16) uint8 array, as an object array"""
+    hex_digits = np.empty((len(uuid_bytes), 32), dtype=np.uint8)
+    hex_digits[:, 0::2] = _HEX_DIGITS[uuid_bytes >> 4]
+    hex_digits[:, 1::2] = _HEX_DIGITS[uuid_bytes & 0x0F]
+    characters = np.full((len(uuid_bytes), 36), ord("-"), dtype=np.uint8)
+    characters[:, _UUID_STR_HEX_POSITIONS] = hex_digits
+    return characters.view("S36").reshape(-1).astype("U36").astype(object)
+
+
+def _uuid_bytes_to_int(uuid_bytes):
+    """128 bits integer values of an (n, 16) uint8 array of big-endian UUID bytes, as a list"""
+    halves = uuid_bytes.view(">u8").astype(object)
+    return ((halves[:, 0] << 64) | halves[:, 1]).tolist()
+
+
+def _uuid_from_int(value):
+    """Build a uuid.UUID from its integer value through the pickle protocol,
+    skipping the argument parsing and validation of uuid.UUID.__init__"""
+    uuid_obj = uuid.UUID.__new__(uuid.UUID)
+    uuid_obj.__setstate__({"int": value})
+    return uuid_obj
+
+
+def decode_julia_uuid_array(array, uuid_format="uuid"):
+    """Decode a JuliaLang.UUID arrow column in bulk. Due to endianness difference the bytes of each value
+    are reversed (cf. convert_julia_uuid_bytestring_to_uuid), with a single numpy operation on the Arrow data buffer
+
+    Parameters
+    ----------
+    array : pyarrow.FixedSizeBinaryArray, pyarrow.ExtensionArray or pyarrow.ChunkedArray
+        fixed_size_binary(16) or JuliaLang.UUID extension column coming from julia
+    uuid_format : str, optional
+        uuid for uuid.UUID objects, str for canonical hex strings or bytes for the 16 bytes
+        big-endian representation (uuid.UUID.bytes), by default uuid
+
+    Returns
+    -------
+    values: ndarray
+        object array of decoded values, None for null values
+    """
+    if uuid_format not in UUID_FORMATS:
+        raise ValueError(
+            f"uuid_format should be one of {', '.join(UUID_FORMATS)} (you have {uuid_format})"
+        )
+    if isinstance(array, pa.ChunkedArray):
+        chunks = [decode_julia_uuid_array(chunk, uuid_format) for chunk in array.chunks]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=object)
+    if isinstance(array, pa.ExtensionArray):
+        array = array.storage
+
+    uuid_bytes = _julia_uuid_array_to_bytes(array)
+    if uuid_format == "str":
+        values = _uuid_bytes_to_str(uuid_bytes)
+    else:
+        if uuid_format == "bytes":
+            raw = uuid_bytes.tobytes()
+            values = (raw[i : i + 16] for i in range(0, len(raw), 16))
+        else:
+            values = map(_uuid_from_int, _uuid_bytes_to_int(uuid_bytes))
+        # np.fromiter does not inspect the objects, unlike np.array on a list
+        values = np.fromiter(values, dtype=object, count=len(uuid_bytes))
+    if array.null_count > 0:
+        values[array.is_null().to_numpy(zero_copy_only=False)] = None
+    return values
+
+
+def _field_has_julia_extension(field, extension_name):
+    """Check if a schema field holds values of a julia type, as an extension type or through its metadata"""
+    if isinstance(field.type, pa.ExtensionType):
+        return field.type.extension_name == extension_name
+    if field.metadata is None:
+        return False
+    metadata = {k.decode(): v.decode() for k, v in field.metadata.items()}
+    return metadata.get("ARROW:extension:name") == extension_name
+
+
+def _field_is_julia_uuid(field):
+    """Check if a schema field holds JuliaLang.UUID values"""
+    return _field_has_julia_extension(field, "JuliaLang.UUID")
+
+
+def _field_is_julia_timespan(field):
+    """Check if a schema field holds JuliaLang.TimeSpan values"""
+    return _field_has_julia_extension(field, "JuliaLang.TimeSpan")
+
+
+def _timespan_child_to_int64(child):
+    """Nanosecond int64 values of a start or stop child array (int64 or duration), without copy for int64 and duration[ns]"""
+    if pa.types.is_duration(child.type) and child.type.unit != "ns":
+        child = child.cast(pa.duration("ns"))
+    return child.cast(pa.int64())
+
+
+def timespan_array_to_start_stop(array):
+    """Get the start and stop of a JuliaLang.TimeSpan column from the children of its struct storage,
+    without building python objects per row
+
+    Parameters
+    ----------
+    array : pyarrow.StructArray, pyarrow.ExtensionArray or pyarrow.ChunkedArray
+        JuliaLang.TimeSpan column (struct with start and stop children, int64 or duration)
+
+    Returns
+    -------
+    start: pyarrow.ChunkedArray
+        int64 start of the spans in nanoseconds, null for null spans
+    stop: pyarrow.ChunkedArray
+        int64 stop of the spans in nanoseconds, null for null spans
+    """
+    chunks = array.chunks if isinstance(array, pa.ChunkedArray) else [array]
+    storage_type = array.type
+    if isinstance(storage_type, pa.ExtensionType):
+        storage_type = storage_type.storage_type
+    start_index = storage_type.get_field_index("start")
+    stop_index = storage_type.get_field_index("stop")
+    start_chunks, stop_chunks = [], []
+    for chunk in chunks:
+        if isinstance(chunk, pa.ExtensionArray):
+            chunk = chunk.storage
+        # flatten applies the offset and the null values of the spans to the children
+        children = chunk.flatten()
+        start_chunks.append(_timespan_child_to_int64(children[start_index]))
+        stop_chunks.append(_timespan_child_to_int64(children[stop_index]))
+    return (
+        pa.chunked_array(start_chunks, pa.int64()),
+        pa.chunked_array(stop_chunks, pa.int64()),
+    )
+
+
+def _timespan_storage(array):
+    """Struct storage of a JuliaLang.TimeSpan chunked array"""
+    if not isinstance(array.type, pa.ExtensionType):
+        return array
+    return pa.chunked_array(
+        [chunk.storage for chunk in array.chunks], array.type.storage_type
+    )
+
+
+def _arrow_backed_dtype(arrow_type):
+    """types_mapper keeping the columns in arrow memory (extension types excluded)"""
+    if isinstance(arrow_type, pa.ExtensionType):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def list_column_lengths(column):
+    """Number of values per row of a list column (e.g. the channels of a signals table),
+    computed with the pyarrow list kernels
+
+    Parameters
+    ----------
+    column : pandas.Series, pyarrow.Array or pyarrow.ChunkedArray
+        list column, arrow backed (cf. arrow_to_processed_pandas with arrow_backed=True) or holding python lists
+
+    Returns
+    -------
+    lengths: ndarray
+        int64 number of values per row, 0 for null rows
+    """
+    if isinstance(column, pd.Series):
+        column = pa.array(column.array)
+    lengths = pc.list_value_length(column).fill_null(0)
+    return lengths.to_numpy().astype(np.int64)
+
+
+@functools.lru_cache(maxsize=PROCESSING_PLAN_CACHE_SIZE)
+def _build_processing_plan(serialized_schema):
+    """Validate a serialized schema and compute its ProcessingPlan (cached)"""
+    schema = pa.ipc.read_schema(pa.py_buffer(serialized_schema))
+    uuid_columns, timespan_columns, list_columns = [], [], []
+    for field in schema:
+        check_if_schema_field_has_unsupported_binary_data(field)
+        if _field_is_julia_uuid(field):
+            uuid_columns.append(field.name)
+        elif _field_is_julia_timespan(field):
+            timespan_columns.append(field.name)
+        elif type(field.type) == pa.ListType:
+            list_columns.append(field.name)
+    return ProcessingPlan(
+        frozenset(uuid_columns), frozenset(timespan_columns), frozenset(list_columns)
+    )
+
+
+def get_processing_plan(schema):
+    """Validate a table schema (cf. check_if_schema_field_has_unsupported_binary_data) and get the columns
+    requiring a processing step. Plans are cached by serialized schema (field types and metadata included),
+    so that loading many tables sharing a schema only validates it once.
+
+    Parameters
+    ----------
+    schema : pyarrow.Schema
+        table schema
+
+    Returns
+    -------
+    plan: ProcessingPlan
+        names of the UUID, TimeSpan and list columns
+
+    Raises
+    ------
+    ValueError
+        if the schema has unsupported binary fields
+    """
+    return _build_processing_plan(schema.serialize().to_pybytes())
+
+
+def arrow_to_processed_pandas(
+    table, uuid_format="uuid", span_format="dict", arrow_backed=False
+):
     """Convert pyarrow table to a pandas dataframe with processing
     Used for arrow tables generated with Onda.jl to:
     - decode the UUID fields which are by default loaded as bytestrings by pandas. Due to endianness difference
-    we need to reverse the bytearray before decoding the UUID to obtain the same hex string
-    - TODO leave timespan as a dict or convert ?
+    we need to reverse the bytes before decoding the UUID to obtain the same hex string (cf. decode_julia_uuid_array)
+    - convert the TimeSpan fields, as one dict per row or from the start and stop children of the struct
+    (cf. timespan_array_to_start_stop) without python objects per row
 
     Parameters
     ----------
     table : pyarrow.Table
         input arrow table generated by Onda.jl
+    uuid_format : str, optional
+        uuid for uuid.UUID objects, str for canonical hex strings or bytes for the 16 bytes
+        big-endian representation of the UUID fields, by default uuid
+    span_format : str, optional
+        format of the TimeSpan fields (e.g. span), by default dict:
+        - dict: one {"start": int, "stop": int} dict per row
+        - columns: replace the field with int64 {name}_start and {name}_stop columns
+        - interval: pandas IntervalArray closed on the left
+        - arrow: struct column backed by the arrow data (pandas.ArrowDtype)
+    arrow_backed : bool, optional
+        if True, keep the other columns (lists, strings, numerics...) in arrow memory with pandas.ArrowDtype
+        (near zero-copy conversion), instead of numpy arrays and python objects (e.g. one list per row
+        for list columns), by default False
 
     Returns
     -------
     dataframe: pandas.DataFrame
         arrow table converted to processed pandas dataframe
     """
+    if span_format not in SPAN_FORMATS:
+        raise ValueError(
+            f"span_format should be one of {', '.join(SPAN_FORMATS)} (you have {span_format})"
+        )
     table_schema = table.schema
-    dataframe = table.to_pandas()
-
+    plan = get_processing_plan(table_schema)
+    # columns built from the arrow buffers and inserted after the conversion of the other columns
+    decoded_columns = {}
+    arrow_columns = {}
+    types_mapper = {}
+    column_names = []
     for schema_field in table_schema.names:
-        field = table_schema.field(schema_field)
+        column = table.column(schema_field)
+        is_timespan = schema_field in plan.timespan_columns
 
-        # For a all columns where the value is the list, pass the type to pandas
-        # When dataframe is loaded from storage, the field should be mapped with ast.literal_eval to get back the list
-        if type(field.type) == pa.ListType:
-            dataframe[schema_field] = dataframe[schema_field].map(
-                lambda x: x if x is None else list(x)
+        # Convert JuliaLang.UUIDs with byte reversal, directly from the arrow buffers
+        if schema_field in plan.uuid_columns:
+            decoded_columns[schema_field] = decode_julia_uuid_array(column, uuid_format)
+        elif is_timespan and span_format == "columns":
+            start, stop = timespan_array_to_start_stop(column)
+            for name, values in [("start", start), ("stop", stop)]:
+                arrow_columns[f"{schema_field}_{name}"] = values
+                column_names.append(f"{schema_field}_{name}")
+            continue
+        elif is_timespan and span_format == "interval":
+            start, stop = timespan_array_to_start_stop(column)
+            decoded_columns[schema_field] = pd.arrays.IntervalArray.from_arrays(
+                start.to_numpy(), stop.to_numpy(), closed="left"
             )
+        elif is_timespan and span_format == "arrow":
+            storage = _timespan_storage(column)
+            types_mapper[storage.type] = pd.ArrowDtype(storage.type)
+            arrow_columns[schema_field] = storage
+        else:
+            arrow_columns[schema_field] = column
+        column_names.append(schema_field)
 
-        check_if_schema_field_has_unsupported_binary_data(field)
+    dataframe = pa.table(
+        list(arrow_columns.values()),
+        names=list(arrow_columns.keys()),
+        metadata=table_schema.metadata,
+    ).to_pandas(
+        types_mapper=lambda arrow_type: types_mapper.get(arrow_type)
+        or (_arrow_backed_dtype(arrow_type) if arrow_backed else None)
+    )
 
-        if field.metadata is None:
-            continue
+    for position, column_name in enumerate(column_names):
+        if column_name in decoded_columns:
+            dataframe.insert(position, column_name, decoded_columns[column_name])
 
-        # Convert JuliaLang.UUIDs with byte reversal
-        metadata = {k.decode(): v.decode() for k, v in field.metadata.items()}
-        if (
-            "ARROW:extension:name" in metadata.keys()
-            and metadata["ARROW:extension:name"] == "JuliaLang.UUID"
-        ):
-            dataframe[schema_field] = dataframe[schema_field].map(
-                convert_julia_uuid_bytestring_to_uuid
+        # For a all columns where the value is the list, pass the type to pandas
+        # When dataframe is loaded from storage, the field should be mapped with ast.literal_eval to get back the list
+        elif column_name in plan.list_columns and not arrow_backed:
+            dataframe[column_name] = dataframe[column_name].map(
+                lambda x: x if x is None else list(x)
             )
 
     return dataframe
@@ -0,0 +1,355 @@
+import io
+import os
+import mmap
+import hashlib
+import shutil
+import tempfile
+import threading
+import time
+
+from pyonda.utils.s3_client import get_s3_client
+from botocore.client import BaseClient
+
+CACHE_FILE_SUFFIX = ".cached"
+TEMP_FILE_SUFFIX = ".tmp"
+COPY_BUFFER_SIZE = 2**20
+# temporary files older than this are left by crashed writers and removed by eviction
+STALE_TEMP_FILE_SECONDS = 3600
+# attempts to open an object evicted by another process between the hit check and the opening
+MAX_OPEN_ATTEMPTS = 3
+
+_s3_cache = None
+
+
+def _touch(path):
+    """Set the modification time of a file to the current time with full clock resolution
+    (the timestamps set by the file system can be too coarse to order consecutive accesses)
+    """
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+
+
+class MemoryMappedStream(io.RawIOBase):
+    """Read-only binary stream over a memory mapped file
+    Like io.BytesIO, getbuffer() gives access to the content without copy.
+
+    Parameters
+    ----------
+    path : str or Path
+        path to the file to map
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        with open(path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                # empty files cannot be mapped
+                self._map = b""
+            else:
+                self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._map)
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._position = offset
+        return self._position
+
+    def readinto(self, buffer):
+        content = memoryview(self._map)[self._position : self._position + len(buffer)]
+        n_read = content.nbytes
+        memoryview(buffer).cast("B")[:n_read] = content
+        content.release()
+        self._position += n_read
+        return n_read
+
+    def getbuffer(self):
+        return memoryview(self._map)
+
+
+class S3DiskCache:
+    """Size bounded local disk cache for S3 objects with least recently used eviction
+
+    Objects are stored in directory, keyed by bucket, key and version ID, and validated against the ETag
+    of the object (one HeadObject request per access). Downloads are written to a temporary file and
+    atomically renamed so that several processes can share the same directory. When the total size of
+    the cached objects exceeds max_bytes, the least recently used objects are evicted.
+
+    Parameters
+    ----------
+    directory : str or Path
+        cache directory, created if needed
+    max_bytes : int
+        maximum total size of the cached objects in bytes
+
+    Attributes
+    ----------
+    hits : int
+        number of accesses served from the cache in this process
+    misses : int
+        number of accesses requiring a download in this process
+    evictions : int
+        number of objects evicted by this process
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def stats(self):
+        """Get the cache counters
+
+        Returns
+        -------
+        stats: dict
+            hits, misses and evictions counters of this process and current size of the cache in bytes
+        """
+        with self._lock:
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+        stats["size"] = 0
+        for entry in self._entries():
+            try:
+                stats["size"] += entry.stat().st_size
+            except FileNotFoundError:
+                continue
+        return stats
+
+    def _count(self, counter, n=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def _entries(self):
+        """Cached objects (temporary files excluded)"""
+        try:
+            with os.scandir(self.directory) as entries:
+                return [
+                    entry
+                    for entry in entries
+                    if entry.is_file() and entry.name.endswith(CACHE_FILE_SUFFIX)
+                ]
+        except FileNotFoundError:
+            return []
+
+    def _object_prefix(self, bucket, key, version):
+        return hashlib.sha256(
+            f"{bucket}/{key}?versionId={version}".encode()
+        ).hexdigest()
+
+    def get_path(self, bucket, key, version, client: BaseClient = None):
+        """Get the path of a cached object, downloading it on a miss
+
+        Parameters
+        ----------
+        bucket : str
+            bucket name
+        key : str
+            object key
+        version : str
+            version ID (can be None)
+        client: BaseClient, default=None
+            boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+
+        Returns
+        -------
+        path: str or None
+            path of the cached object, None if the object is larger than the cache
+        """
+        if client is None:
+            client = get_s3_client()
+        version_args = {} if version is None else {"VersionId": version}
+        response = client.head_object(Bucket=bucket, Key=key, **version_args)
+        etag = response["ETag"]
+
+        prefix = self._object_prefix(bucket, key, version)
+        etag_hash = hashlib.sha256(etag.encode()).hexdigest()[:16]
+        path = os.path.join(self.directory, f"{prefix}-{etag_hash}{CACHE_FILE_SUFFIX}")
+        try:
+            # refresh the access time used for the LRU eviction
+            _touch(path)
+            self._count("hits")
+            return path
+        except FileNotFoundError:
+            self._count("misses")
+
+        if response["ContentLength"] > self.max_bytes:
+            return None
+
+        fd, temp_path = tempfile.mkstemp(
+            dir=self.directory, prefix=prefix, suffix=TEMP_FILE_SUFFIX
+        )
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                # IfMatch guarantees the downloaded content matches the ETag used in the file name
+                response = client.get_object(
+                    Bucket=bucket, Key=key, IfMatch=etag, **version_args
+                )
+                shutil.copyfileobj(response["Body"], fh, COPY_BUFFER_SIZE)
+            _touch(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        # remove the copies of previous versions of the object
+        for entry in self._entries():
+            if entry.name.startswith(prefix) and entry.path != path:
+                self._remove(entry.path)
+        self.evict(keep=path)
+        return path
+
+    def open(self, bucket, key, version, client: BaseClient = None):
+        """Open a cached object as a memory mapped stream, downloading it on a miss
+
+        The file is mapped right after the hit check, a mapped file stays readable when it is evicted.
+        If another process sharing the directory evicts the file before it is mapped, the access is
+        counted as a miss and the object is downloaded again.
+
+        Parameters
+        ----------
+        bucket : str
+            bucket name
+        key : str
+            object key
+        version : str
+            version ID (can be None)
+        client: BaseClient, default=None
+            boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+
+        Returns
+        -------
+        stream: MemoryMappedStream or None
+            stream over the cached object, None if the object is larger than the cache
+        """
+        for _ in range(MAX_OPEN_ATTEMPTS):
+            path = self.get_path(bucket, key, version, client)
+            if path is None:
+                return None
+            try:
+                return MemoryMappedStream(path)
+            except FileNotFoundError:
+                # not a hit, the next attempt counts the miss and downloads the object again
+                self._count("hits", -1)
+        raise FileNotFoundError(
+            f"s3://{bucket}/{key} was evicted from {self.directory} {MAX_OPEN_ATTEMPTS} times before it could be opened"
+        )
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _remove_stale_temp_files(self):
+        """Remove the temporary files left by writers which crashed during a download"""
+        oldest = time.time() - STALE_TEMP_FILE_SECONDS
+        try:
+            with os.scandir(self.directory) as entries:
+                temp_files = [
+                    entry
+                    for entry in entries
+                    if entry.is_file() and entry.name.endswith(TEMP_FILE_SUFFIX)
+                ]
+        except FileNotFoundError:
+            return
+        for entry in temp_files:
+            try:
+                is_stale = entry.stat().st_mtime < oldest
+            except FileNotFoundError:
+                continue
+            if is_stale:
+                self._remove(entry.path)
+
+    def evict(self, keep=None):
+        """Remove the least recently used objects until the cache size is below max_bytes,
+        and the temporary files older than STALE_TEMP_FILE_SECONDS
+
+        Parameters
+        ----------
+        keep : str, optional
+            path of an object which should not be evicted
+        """
+        self._remove_stale_temp_files()
+        entries = []
+        for entry in self._entries():
+            try:
+                entry_stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry_stat.st_mtime_ns, entry_stat.st_size, entry.path))
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            if self._remove(path):
+                self._count("evictions")
+            size -= entry_size
+
+    def clear(self):
+        """Remove all the cached objects"""
+        for entry in self._entries():
+            self._remove(entry.path)
+
+
+def enable_s3_cache(directory, max_bytes):
+    """Enable the local disk cache for the S3 objects downloaded by pyonda (cf. S3DiskCache)
+    Whole object downloads (download_s3_fileobj, download_s3_file) and thus all the S3 loaders reading
+    whole objects go through the cache, ranged reads of windows bypass it.
+
+    Parameters
+    ----------
+    directory : str or Path
+        cache directory, can be shared by several processes
+    max_bytes : int
+        maximum total size of the cached objects in bytes
+
+    Returns
+    -------
+    cache: S3DiskCache
+        enabled cache
+    """
+    global _s3_cache
+    _s3_cache = S3DiskCache(directory, max_bytes)
+    return _s3_cache
+
+
+def disable_s3_cache():
+    """Disable the local disk cache for S3 objects, cached files are left on disk"""
+    global _s3_cache
+    _s3_cache = None
+
+
+def get_s3_cache():
+    """Get the enabled S3 disk cache
+
+    Returns
+    -------
+    cache: S3DiskCache or None
+        enabled cache, None if the cache is disabled
+    """
+    return _s3_cache
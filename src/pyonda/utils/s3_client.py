@@ -0,0 +1,84 @@
+import os
+import threading
+import boto3
+from botocore.config import Config
+
+# Configuration of the shared S3 client (passed to botocore.config.Config)
+# https://botocore.amazonaws.com/v1/documentation/api/latest/reference/config.html
+DEFAULT_S3_CLIENT_CONFIG = {
+    "max_pool_connections": 32,
+    "retries": {"max_attempts": 5, "mode": "standard"},
+    "connect_timeout": 10,
+    "read_timeout": 60,
+}
+
+_s3_client_config = dict(DEFAULT_S3_CLIENT_CONFIG)
+_s3_client = None
+_s3_client_pid = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """Get the S3 client shared by all the threads of the process
+    The client is created on first use, with its own boto3 session, and reused afterwards so that credentials
+    resolution and endpoint setup happen once and the connection pool is kept. After a fork, the child process
+    lazily creates its own client on first use.
+
+    Returns
+    -------
+    client: BaseClient
+        boto3 S3 client instance
+    """
+    global _s3_client, _s3_client_pid
+    pid = os.getpid()
+    client = _s3_client
+    if client is not None and _s3_client_pid == pid:
+        return client
+    with _s3_client_lock:
+        if _s3_client is None or _s3_client_pid != pid:
+            # boto3.client uses the default session which is not thread-safe
+            session = boto3.session.Session()
+            _s3_client = session.client("s3", config=Config(**_s3_client_config))
+            _s3_client_pid = pid
+        return _s3_client
+
+
+def configure_s3_client(**config):
+    """Set the configuration of the shared S3 client, the client is recreated on next use
+
+    Parameters
+    ----------
+    **config
+        botocore.config.Config arguments updating DEFAULT_S3_CLIENT_CONFIG, e.g. max_pool_connections,
+        retries, connect_timeout, read_timeout
+
+    Examples
+    --------
+    >>> configure_s3_client(max_pool_connections=64, retries={"max_attempts": 10, "mode": "adaptive"})
+    """
+    # validate the configuration before storing it
+    Config(**{**_s3_client_config, **config})
+    with _s3_client_lock:
+        _s3_client_config.update(config)
+    reset_s3_client()
+
+
+def reset_s3_client():
+    """Drop the shared S3 client, a new one is created on next use (e.g. after credentials change)"""
+    global _s3_client, _s3_client_pid
+    with _s3_client_lock:
+        _s3_client = None
+        _s3_client_pid = None
+
+
+def _reset_s3_client_after_fork():
+    """The lock may have been held by another thread during fork, and the client connections
+    must not be shared with the parent process"""
+    global _s3_client, _s3_client_pid, _s3_client_lock
+    _s3_client_lock = threading.Lock()
+    _s3_client = None
+    _s3_client_pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_s3_client_after_fork)
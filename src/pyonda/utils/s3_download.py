@@ -1,5 +1,6 @@
 import io
-import boto3
+from pyonda.utils.s3_client import get_s3_client
+from pyonda.utils.s3_cache import get_s3_cache
 from botocore.client import BaseClient
 
 
@@ -47,6 +48,14 @@ def parse_s3_url(s3_url):
     return bucket, key, version
 
 
+def _open_cached(bucket, key, version, client):
+    """Memory mapped stream over the object in the S3 cache, None if the cache is disabled or the object too large"""
+    cache = get_s3_cache()
+    if cache is None:
+        return None
+    return cache.open(bucket, key, version, client)
+
+
 def download_s3_file(s3_url, output_file_path, client: BaseClient = None):
     """Given an object URL in S3, download an object from S3 to a file
     See: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/download_file.html
@@ -58,12 +67,16 @@ def download_s3_file(s3_url, output_file_path, client: BaseClient = None):
     output_file_path : str or Path
         new path on local storage for downloaded object
     client: BaseClient, default=None
-        boto3 client instance
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
     """
     if client is None:
-        client = boto3.client("s3")
+        client = get_s3_client()
     bucket, key, version = parse_s3_url(s3_url)
-    if version is not None:
+    cached = _open_cached(bucket, key, version, client)
+    if cached is not None:
+        with cached, open(output_file_path, "wb") as fh:
+            fh.write(cached.getbuffer())
+    elif version is not None:
         client.download_file(
             bucket, key, output_file_path, ExtraArgs={"VersionId": version}
         )
@@ -80,16 +93,20 @@ def download_s3_fileobj(s3_url, client: BaseClient = None):
     s3_url : str or Path
         input S3 URL string
     client: BaseClient, default=None
-        boto3 client instance
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
 
     Returns
     -------
-    buf: BytesIO
-        binary stream holding the downloaded object
+    buf: BytesIO or MemoryMappedStream
+        binary stream holding the downloaded object, memory mapped from the cache if the S3 cache is enabled
+        (cf. pyonda.utils.s3_cache.enable_s3_cache)
     """
     if client is None:
-        client = boto3.client("s3")
+        client = get_s3_client()
     bucket, key, version = parse_s3_url(s3_url)
+    cached = _open_cached(bucket, key, version, client)
+    if cached is not None:
+        return cached
     buf = io.BytesIO()
     if version is not None:
         client.download_fileobj(bucket, key, buf, ExtraArgs={"VersionId": version})
@@ -97,3 +114,69 @@ def download_s3_fileobj(s3_url, client: BaseClient = None):
         client.download_fileobj(bucket, key, buf)
     buf.seek(0)
     return buf
+
+
+def get_s3_object_size(s3_url, client: BaseClient = None):
+    """Given an object URL in S3, get the size of the object in bytes without downloading it
+    See: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/head_object.html
+
+    Parameters
+    ----------
+    s3_url : str or Path
+        input S3 URL string
+    client: BaseClient, default=None
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+
+    Returns
+    -------
+    size: int
+        object size in bytes
+    """
+    if client is None:
+        client = get_s3_client()
+    bucket, key, version = parse_s3_url(s3_url)
+    if version is not None:
+        response = client.head_object(Bucket=bucket, Key=key, VersionId=version)
+    else:
+        response = client.head_object(Bucket=bucket, Key=key)
+    return response["ContentLength"]
+
+
+def download_s3_byte_range(s3_url, offset, length, client: BaseClient = None):
+    """Given an object URL in S3, download a range of bytes of the object with a ranged GetObject request
+    See: https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/get_object.html
+
+    Parameters
+    ----------
+    s3_url : str or Path
+        input S3 URL string
+    offset : int
+        position of the first byte to download
+    length : int
+        number of bytes to download
+    client: BaseClient, default=None
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+
+    Returns
+    -------
+    content: bytes
+        downloaded bytes
+    """
+    if length == 0:
+        return b""
+    if client is None:
+        client = get_s3_client()
+    bucket, key, version = parse_s3_url(s3_url)
+    byte_range = f"bytes={offset}-{offset + length - 1}"
+    if version is not None:
+        response = client.get_object(
+            Bucket=bucket, Key=key, Range=byte_range, VersionId=version
+        )
+    else:
+        response = client.get_object(Bucket=bucket, Key=key, Range=byte_range)
+    content = response["Body"].read()
+    if len(content) != length:
+        raise ValueError(
+            f"expected {length} bytes at offset {offset} in {s3_url}, got {len(content)}"
+        )
+    return content
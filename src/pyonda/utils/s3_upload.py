@@ -1,4 +1,6 @@
-import boto3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pyonda.utils.s3_client import get_s3_client
 from botocore.client import BaseClient
 
 
@@ -15,9 +17,183 @@ def upload_file_to_s3(input_path, bucket, key, client: BaseClient = None):
     key : str
         destination key
     client: BaseClient, default=None
-        boto3 client instance
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
 
     """
     if client is None:
-        client = boto3.client("s3")
+        client = get_s3_client()
     client.upload_file(str(input_path), bucket, key)
+
+
+# S3 requires all parts of a multipart upload but the last one to be at least 5 MiB
+MIN_PART_SIZE = 5 * 2**20
+DEFAULT_PART_SIZE = 16 * 2**20
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class S3UploadStream:
+    """Writable binary stream uploading its content to S3 with a multipart upload
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/s3/client/create_multipart_upload.html
+
+    Written bytes are buffered until a part of part_size bytes is full, the part is then uploaded
+    in a background thread while writing continues. At most max_concurrency parts are uploaded
+    concurrently, write blocks when this limit is reached, so that memory usage is bounded by
+    (max_concurrency + 1) * part_size. Objects smaller than part_size are uploaded with a single
+    PutObject request when the stream is closed.
+
+    The upload is completed by close() and aborted by abort(). Used as a context manager, the
+    upload is aborted if an exception is raised in the with block.
+
+    Parameters
+    ----------
+    bucket : str
+        destination bucket name
+    key : str
+        destination key
+    client: BaseClient, default=None
+        boto3 client instance, by default the shared client (cf. pyonda.utils.s3_client.get_s3_client)
+    part_size : int, optional
+        size of the uploaded parts in bytes (at least MIN_PART_SIZE), by default DEFAULT_PART_SIZE
+    max_concurrency : int, optional
+        maximum number of parts uploaded concurrently, by default DEFAULT_MAX_CONCURRENCY
+
+    Examples
+    --------
+    >>> with S3UploadStream("bucket", "key") as stream:
+    ...     stream.write(b"some content")
+    """
+
+    def __init__(
+        self,
+        bucket,
+        key,
+        client: BaseClient = None,
+        part_size=DEFAULT_PART_SIZE,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+    ):
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(
+                f"part_size should be at least {MIN_PART_SIZE} bytes (you have {part_size})"
+            )
+        if client is None:
+            client = get_s3_client()
+        self.bucket = bucket
+        self.key = key
+        self.client = client
+        self.part_size = part_size
+        self.closed = False
+        self._buffer = bytearray()
+        self._position = 0
+        self._upload_id = None
+        self._futures = []
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def readable(self):
+        return False
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write to closed S3UploadStream")
+        data = memoryview(data).cast("B")
+        self._buffer += data
+        self._position += data.nbytes
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+            self._submit_part(part)
+        return data.nbytes
+
+    def _submit_part(self, part):
+        if self._upload_id is None:
+            response = self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key
+            )
+            self._upload_id = response["UploadId"]
+        for future in self._futures:
+            if future.done() and future.exception() is not None:
+                raise future.exception()
+        part_number = len(self._futures) + 1
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._upload_part, part_number, part)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _upload_part(self, part_number, part):
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=part,
+        )
+        return {"ETag": response["ETag"], "PartNumber": part_number}
+
+    def close(self):
+        """Upload the remaining buffered bytes and complete the upload"""
+        if self.closed:
+            return
+        try:
+            if self._upload_id is None:
+                self.client.put_object(
+                    Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer)
+                )
+            else:
+                if len(self._buffer) > 0:
+                    self._submit_part(bytes(self._buffer))
+                parts = [future.result() for future in self._futures]
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except BaseException:
+            self.abort()
+            raise
+        self._release()
+
+    def abort(self):
+        """Abort the upload, parts already uploaded are discarded"""
+        if self.closed:
+            return
+        try:
+            for future in self._futures:
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            if self._upload_id is not None:
+                self.client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+                )
+        finally:
+            self._release()
+
+    def _release(self):
+        self.closed = True
+        self._buffer = bytearray()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
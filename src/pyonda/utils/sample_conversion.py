@@ -0,0 +1,245 @@
+import numpy as np
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from pyonda.utils.lpcm_layout import iter_lpcm_chunks
+
+DEFAULT_CHUNK_VALUES = 2**20
+DECODED_DTYPES = (np.float32, np.float64)
+
+# Encoding of samples in physical units to an Onda sample type (cf. ONDA_SIGNALS_SCHEMA)
+#   dtype: sample_type of the encoded samples
+#   resolution: sample_resolution_in_unit
+#   offset: sample_offset_in_unit
+SampleEncoding = namedtuple("SampleEncoding", ["dtype", "resolution", "offset"])
+
+
+def _sample_chunks(n_samples, n_channels, chunk_values):
+    """(first, last) sample ranges of at most chunk_values values (chunk_values // n_channels samples)"""
+    chunk_samples = max(1, chunk_values // max(1, n_channels))
+    return [
+        (first, min(first + chunk_samples, n_samples))
+        for first in range(0, n_samples, chunk_samples)
+    ]
+
+
+def decode_samples(
+    data,
+    resolution,
+    offset,
+    dtype=np.float64,
+    out=None,
+    chunk_values=DEFAULT_CHUNK_VALUES,
+    max_workers=None,
+):
+    """Convert encoded samples to physical units (resolution * data + offset), chunk by chunk
+
+    The transform is applied in place in the output array on chunks of chunk_values values (all channels,
+    consecutive samples), so that the only temporaries are the size of a chunk: memory mapped inputs are
+    read chunk by chunk, and decoding an int16 recording to float32 only allocates the float32 output.
+    The arithmetic is done in the output dtype.
+
+    Parameters
+    ----------
+    data : ndarray
+        encoded samples of shape (n_channels, n_samples) (or (n_samples,)), e.g. returned by the lpcm loaders
+    resolution : float
+        sample_resolution_in_unit of the signal
+    offset : float
+        sample_offset_in_unit of the signal
+    dtype : type, optional
+        float32 or float64, by default float64 (ignored if out is given)
+    out : ndarray, optional
+        float32 or float64 array with the shape of data to decode into, by default a new array
+    chunk_values : int, optional
+        number of values decoded at once, by default DEFAULT_CHUNK_VALUES
+    max_workers : int, optional
+        number of threads decoding chunks concurrently, by default None (no threads)
+
+    Returns
+    -------
+    out: ndarray
+        decoded samples with the shape of data
+    """
+    if out is None:
+        dtype = np.dtype(dtype)
+        if dtype not in DECODED_DTYPES:
+            raise ValueError(f"dtype should be float32 or float64 (you have {dtype})")
+        out = np.empty(data.shape, dtype=dtype)
+    else:
+        if out.dtype not in DECODED_DTYPES:
+            raise ValueError(
+                f"out dtype should be float32 or float64 (you have {out.dtype})"
+            )
+        if out.shape != data.shape:
+            raise ValueError(
+                f"out shape {out.shape} should match the data shape {data.shape}"
+            )
+    n_channels = data.shape[0] if data.ndim > 1 else 1
+    resolution = out.dtype.type(resolution)
+    offset = out.dtype.type(offset)
+
+    def decode_chunk(sample_range):
+        first, last = sample_range
+        out_chunk = out[..., first:last]
+        # cast into the output chunk first, the scaling is then done in place
+        np.copyto(out_chunk, data[..., first:last], casting="unsafe")
+        if resolution != 1:
+            np.multiply(out_chunk, resolution, out=out_chunk)
+        if offset != 0:
+            np.add(out_chunk, offset, out=out_chunk)
+
+    chunks = _sample_chunks(data.shape[-1], n_channels, chunk_values)
+    if max_workers is None or max_workers <= 1 or len(chunks) <= 1:
+        for sample_range in chunks:
+            decode_chunk(sample_range)
+    else:
+        # numpy releases the GIL in copyto and the arithmetic ufuncs
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(decode_chunk, chunks))
+    return out
+
+
+def _saturation_bounds(dtype):
+    """Float64 bounds of the values that can be cast to an integer dtype without overflow"""
+    info = np.iinfo(dtype)
+    lower, upper = float(info.min), float(info.max)
+    # the largest int64 / uint64 values round up to a power of 2 in float64
+    if int(upper) > info.max:
+        upper = np.nextafter(upper, -np.inf)
+    return lower, upper
+
+
+def _encode_chunk(chunk, resolution, offset, out, scratch=None):
+    """Encode a chunk of samples into out, using a float64 scratch array of the chunk size"""
+    scratch = np.subtract(chunk, offset, out=scratch, dtype=np.float64)
+    np.divide(scratch, resolution, out=scratch)
+    if np.issubdtype(out.dtype, np.integer):
+        np.rint(scratch, out=scratch)
+        if np.isnan(scratch).any():
+            raise ValueError("NaN samples cannot be encoded to an integer sample type")
+        lower, upper = _saturation_bounds(out.dtype)
+        np.clip(scratch, lower, upper, out=scratch)
+    np.copyto(out, scratch, casting="unsafe")
+    return out
+
+
+def _check_encoded_dtype(dtype):
+    dtype = np.dtype(dtype)
+    if not (np.issubdtype(dtype, np.integer) or np.issubdtype(dtype, np.floating)):
+        raise ValueError(
+            f"dtype should be an integer or float sample type (you have {dtype})"
+        )
+    return dtype
+
+
+def encode_samples(
+    data,
+    resolution,
+    offset,
+    dtype,
+    out=None,
+    chunk_values=DEFAULT_CHUNK_VALUES,
+    max_workers=None,
+):
+    """Convert samples in physical units to an Onda sample type ((data - offset) / resolution), chunk by chunk
+
+    Each chunk of chunk_values values is encoded in a single pass through a float64 scratch array of the
+    chunk size: for integer sample types the values are rounded half to even (numpy.rint) and saturated
+    to the range of the sample type.
+
+    Parameters
+    ----------
+    data : ndarray
+        samples in physical units of shape (n_channels, n_samples) (or (n_samples,))
+    resolution : float
+        sample_resolution_in_unit of the signal
+    offset : float
+        sample_offset_in_unit of the signal
+    dtype : type
+        sample_type of the encoded samples, e.g. int16 (ignored if out is given)
+    out : ndarray, optional
+        array with the shape of data to encode into, by default a new array
+    chunk_values : int, optional
+        number of values encoded at once, by default DEFAULT_CHUNK_VALUES
+    max_workers : int, optional
+        number of threads encoding chunks concurrently, by default None (no threads)
+
+    Returns
+    -------
+    out: ndarray
+        encoded samples with the shape of data
+
+    Raises
+    ------
+    ValueError
+        if samples are NaN and the sample type is an integer type
+    """
+    if out is None:
+        out = np.empty(data.shape, dtype=_check_encoded_dtype(dtype))
+    else:
+        _check_encoded_dtype(out.dtype)
+        if out.shape != data.shape:
+            raise ValueError(
+                f"out shape {out.shape} should match the data shape {data.shape}"
+            )
+    n_channels = data.shape[0] if data.ndim > 1 else 1
+
+    def encode_chunk(sample_range):
+        first, last = sample_range
+        _encode_chunk(data[..., first:last], resolution, offset, out[..., first:last])
+
+    chunks = _sample_chunks(data.shape[-1], n_channels, chunk_values)
+    if max_workers is None or max_workers <= 1 or len(chunks) <= 1:
+        for sample_range in chunks:
+            encode_chunk(sample_range)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(encode_chunk, chunks))
+    return out
+
+
+def iter_encoded_lpcm_chunks(
+    data, encoding, order="C", chunk_values=DEFAULT_CHUNK_VALUES
+):
+    """Iterate over the encoded values of samples in physical units in the order they are stored in an lpcm
+    file, in bounded chunks (cf. pyonda.utils.lpcm_layout.iter_lpcm_chunks), without full size temporaries
+
+    Parameters
+    ----------
+    data : ndarray
+        samples in physical units of shape (n_channels, n_samples) (or (n_samples,))
+    encoding : SampleEncoding
+        sample type, resolution and offset of the encoded samples, None to iterate over data as is
+    order : str
+        C or F, use F to read files from Julia, use C to save files for Julia
+    chunk_values : int, optional
+        number of values per chunk, by default DEFAULT_CHUNK_VALUES
+
+    Yields
+    ------
+    chunk: ndarray
+        contiguous 1D array of at most chunk_values encoded values
+    """
+    if encoding is None:
+        yield from iter_lpcm_chunks(data, order, chunk_values)
+        return
+    dtype = _check_encoded_dtype(encoding.dtype)
+    scratch = None
+    for chunk in iter_lpcm_chunks(data, order, chunk_values):
+        if scratch is None or scratch.size != chunk.size:
+            scratch = np.empty(chunk.size, dtype=np.float64)
+        yield _encode_chunk(
+            chunk,
+            encoding.resolution,
+            encoding.offset,
+            np.empty(chunk.size, dtype=dtype),
+            scratch,
+        )
+
+
+def encoded_nbytes(data, encoding):
+    """Size in bytes of the encoded samples (of data itself if encoding is None)"""
+    if encoding is None:
+        return data.nbytes
+    return data.size * np.dtype(encoding.dtype).itemsize
@@ -1,6 +1,9 @@
 import pyarrow as pa
 import warnings
 from collections import namedtuple
+from collections.abc import Mapping
+
+from pyonda.utils.extension_types import JuliaUUIDType, JuliaTimeSpanType
 
 
 def timespan_namedtuple(start, stop):
@@ -43,54 +46,91 @@ def timespan_namedtuple(start, stop):
     return timespan(start=start, stop=stop)
 
 
+def julia_uuid_field(name, nullable=False):
+    """Schema field for a column of UUIDs readable by julia (cf. pyonda.utils.processing.encode_julia_uuid_array)
+
+    Parameters
+    ----------
+    name : str
+        field name
+    nullable : bool, optional
+        if the column can hold null values, by default False
+
+    Returns
+    -------
+    field : pyarrow.Field
+        field with the JuliaLang.UUID extension type
+    """
+    return pa.field(name, JuliaUUIDType(), nullable=nullable)
+
+
+def _wrap_storage_column(column, field):
+    """Column of the field extension type from a column of its storage values (other columns are returned as is)"""
+    if not isinstance(field.type, pa.ExtensionType) or (
+        isinstance(column, (pa.Array, pa.ChunkedArray)) and column.type == field.type
+    ):
+        return column
+    if isinstance(column, pa.ChunkedArray):
+        return pa.chunked_array(
+            [_wrap_storage_column(chunk, field) for chunk in column.chunks],
+            type=field.type,
+        )
+    if isinstance(column, pa.ExtensionArray):
+        column = column.storage
+    if isinstance(column, pa.Array):
+        column = column.cast(field.type.storage_type)
+    else:
+        column = pa.array(column, type=field.type.storage_type)
+    return pa.ExtensionArray.from_storage(field.type, column)
+
+
+def table_from_storage_arrays(columns, schema):
+    """Table following a schema with extension types (e.g. ONDA_ANNOTATIONS_SCHEMA) from columns of their storage
+    values, e.g. fixed_size_binary(16) arrays (cf. pyonda.utils.processing.encode_julia_uuid_array) for
+    JuliaUUIDType columns and struct arrays for JuliaTimeSpanType columns, which pa.Table.from_arrays and
+    pa.Table.from_pydict do not accept for extension fields
+
+    Parameters
+    ----------
+    columns : dict, list or pyarrow.Table
+        columns by name (dict or table) or in the order of the schema fields: arrays, chunked arrays
+        or sequences of storage values
+    schema : pyarrow.Schema
+        schema of the table
+
+    Returns
+    -------
+    table : pyarrow.Table
+        table with the schema, extension columns wrapping the storage columns without copy
+    """
+    if isinstance(columns, pa.Table):
+        columns = [columns.column(name) for name in schema.names]
+    elif isinstance(columns, Mapping):
+        columns = [columns[name] for name in schema.names]
+    return pa.Table.from_arrays(
+        [_wrap_storage_column(column, field) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
 # https://github.com/beacon-biosignals/Onda.jl/blob/main/src/annotations.jl
 # cf. examples/generate_data.py
 ONDA_ANNOTATIONS_SCHEMA = pa.schema(
     [
-        pa.field(
-            "recording",
-            pa.binary(16),
-            nullable=False,
-            metadata={"ARROW:extension:name": "JuliaLang.UUID"},
-        ),
-        pa.field(
-            "id",
-            pa.binary(16),
-            nullable=False,
-            metadata={"ARROW:extension:name": "JuliaLang.UUID"},
-        ),
-        pa.field(
-            "span",
-            pa.struct([("start", pa.int64()), ("stop", pa.int64())]),
-            nullable=False,
-            metadata={"ARROW:extension:name": "JuliaLang.TimeSpan"},
-        ),
+        julia_uuid_field("recording"),
+        julia_uuid_field("id"),
+        pa.field("span", JuliaTimeSpanType(), nullable=False),
     ]
 )
 
 # https://github.com/beacon-biosignals/Onda.jl/blob/main/src/signals.jl
 ONDA_SIGNALS_SCHEMA = pa.schema(
     [
-        pa.field(
-            "recording",
-            pa.binary(16),
-            nullable=False,
-            metadata={"ARROW:extension:name": "JuliaLang.UUID"},
-        ),
-        pa.field(
-            "id",
-            pa.binary(16),
-            nullable=False,
-            metadata={"ARROW:extension:name": "JuliaLang.UUID"},
-        ),
+        julia_uuid_field("recording"),
+        julia_uuid_field("id"),
         pa.field("file_path", pa.string(), nullable=False),
         pa.field("file_format", pa.string(), nullable=False),
-        pa.field(
-            "span",
-            pa.struct([("start", pa.int64()), ("stop", pa.int64())]),
-            nullable=False,
-            metadata={"ARROW:extension:name": "JuliaLang.TimeSpan"},
-        ),
+        pa.field("span", JuliaTimeSpanType(), nullable=False),
         pa.field("sensor_type", pa.string(), nullable=False),
         pa.field("sensor_label", pa.string(), nullable=False),
         pa.field("channels", pa.list_(pa.string()), nullable=False),
@@ -0,0 +1,164 @@
+import struct
+import numpy as np
+import zstandard
+from collections import namedtuple
+
+from pyonda.utils.compression import get_zstd_compressor
+
+# https://github.com/facebook/zstd/blob/dev/contrib/seekable_format/zstd_seekable_compression_format.md
+SKIPPABLE_FRAME_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+SEEK_TABLE_FOOTER_SIZE = 9
+SKIPPABLE_FRAME_HEADER_SIZE = 8
+MAX_FRAME_SIZE = 2**32 - 1
+
+# Frame boundaries of a seekable .zst file, both arrays have n_frames + 1 elements
+#   compressed_offsets: position of each frame in the compressed file
+#   decompressed_offsets: position of each frame in the decompressed content
+SeekTable = namedtuple("SeekTable", ["compressed_offsets", "decompressed_offsets"])
+
+
+def encode_seek_table(frame_sizes):
+    """Encode a seek table as a zstd skippable frame (ignored by standard zstd decoders)
+
+    Parameters
+    ----------
+    frame_sizes : list of tuple
+        (compressed_size, decompressed_size) of each frame
+
+    Returns
+    -------
+    seek_table_frame: bytes
+        skippable frame holding the seek table, to be written at the end of the file
+    """
+    entries = b"".join(
+        struct.pack("<II", compressed_size, decompressed_size)
+        for compressed_size, decompressed_size in frame_sizes
+    )
+    footer = struct.pack("<IBI", len(frame_sizes), 0, SEEKABLE_MAGIC)
+    header = struct.pack(
+        "<II", SKIPPABLE_FRAME_MAGIC, len(entries) + SEEK_TABLE_FOOTER_SIZE
+    )
+    return header + entries + footer
+
+
+def write_seekable_zst(chunks, destination, compressor=None):
+    """Compress each chunk as an independent zstd frame and append a seek table
+
+    Parameters
+    ----------
+    chunks : iterable of ndarray or bytes
+        decompressed content of each frame
+    destination : file-like
+        binary stream the compressed frames are written to
+    compressor : zstandard.ZstdCompressor, optional
+        compressor used for each frame, by default configured with the default compression options
+        (cf. pyonda.utils.compression.get_zstd_compressor)
+    """
+    if compressor is None:
+        compressor = get_zstd_compressor()
+    frame_sizes = []
+    for chunk in chunks:
+        decompressed_size = memoryview(chunk).nbytes
+        if decompressed_size > MAX_FRAME_SIZE:
+            raise ValueError(
+                f"seekable zst frames are limited to {MAX_FRAME_SIZE} bytes (got {decompressed_size})"
+            )
+        frame = compressor.compress(chunk)
+        destination.write(frame)
+        frame_sizes.append((len(frame), decompressed_size))
+    destination.write(encode_seek_table(frame_sizes))
+
+
+def read_seek_table(read_range, size):
+    """Read the seek table of a seekable .zst file
+
+    Parameters
+    ----------
+    read_range : callable
+        read_range(offset, length) returns length bytes of the compressed file starting at offset
+    size : int
+        size of the compressed file in bytes
+
+    Returns
+    -------
+    seek_table: SeekTable or None
+        frame boundaries, None if the file has no seek table
+    """
+    if size < SEEK_TABLE_FOOTER_SIZE:
+        return None
+    footer = read_range(size - SEEK_TABLE_FOOTER_SIZE, SEEK_TABLE_FOOTER_SIZE)
+    n_frames, descriptor, magic = struct.unpack("<IBI", footer)
+    if magic != SEEKABLE_MAGIC:
+        return None
+
+    entry_size = 12 if descriptor & 0x80 else 8
+    frame_size = n_frames * entry_size + SEEK_TABLE_FOOTER_SIZE
+    table_start = size - frame_size - SKIPPABLE_FRAME_HEADER_SIZE
+    if table_start < 0:
+        raise ValueError("Corrupted seek table (larger than the file)")
+    table = read_range(
+        table_start,
+        SKIPPABLE_FRAME_HEADER_SIZE + frame_size - SEEK_TABLE_FOOTER_SIZE,
+    )
+    header_magic, header_frame_size = struct.unpack("<II", table[:8])
+    if header_magic != SKIPPABLE_FRAME_MAGIC or header_frame_size != frame_size:
+        raise ValueError("Corrupted seek table (invalid skippable frame header)")
+
+    entries = np.frombuffer(table, dtype="<u4", offset=8).reshape(-1, entry_size // 4)
+    compressed_offsets = np.zeros(n_frames + 1, dtype=np.int64)
+    np.cumsum(entries[:, 0], out=compressed_offsets[1:])
+    decompressed_offsets = np.zeros(n_frames + 1, dtype=np.int64)
+    np.cumsum(entries[:, 1], out=decompressed_offsets[1:])
+    return SeekTable(compressed_offsets, decompressed_offsets)
+
+
+def decompress_seekable_zst_range(read_range, seek_table, offset, length):
+    """Decompress a range of the content of a seekable .zst file, only the frames
+    covering the range are read and decompressed
+
+    Parameters
+    ----------
+    read_range : callable
+        read_range(offset, length) returns length bytes of the compressed file starting at offset
+    seek_table : SeekTable
+        frame boundaries returned by read_seek_table
+    offset : int
+        position of the first decompressed byte
+    length : int
+        number of decompressed bytes
+
+    Returns
+    -------
+    content: bytes
+        decompressed bytes
+    """
+    decompressed_offsets = seek_table.decompressed_offsets
+    if offset < 0 or offset + length > decompressed_offsets[-1]:
+        raise ValueError(
+            f"range ({offset}, {offset + length}) out of bounds for {decompressed_offsets[-1]} bytes"
+        )
+    if length == 0:
+        return b""
+    first_frame = np.searchsorted(decompressed_offsets, offset, side="right") - 1
+    last_frame = np.searchsorted(decompressed_offsets, offset + length, side="left")
+
+    compressed_offsets = seek_table.compressed_offsets
+    frames_offset = int(compressed_offsets[first_frame])
+    frames = read_range(
+        frames_offset, int(compressed_offsets[last_frame]) - frames_offset
+    )
+    decompressor = zstandard.ZstdDecompressor()
+    decompressed_frames = []
+    for frame in range(first_frame, last_frame):
+        frame_start = compressed_offsets[frame] - frames_offset
+        frame_stop = compressed_offsets[frame + 1] - frames_offset
+        frame_size = decompressed_offsets[frame + 1] - decompressed_offsets[frame]
+        decompressed_frames.append(
+            decompressor.decompress(
+                frames[frame_start:frame_stop], max_output_size=int(frame_size)
+            )
+        )
+    content = b"".join(decompressed_frames)
+    start = offset - decompressed_offsets[first_frame]
+    return content[start : start + length]
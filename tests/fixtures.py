@@ -5,6 +5,8 @@ import boto3
 from pathlib import Path
 from moto import mock_s3
 
+from pyonda.utils.s3_client import reset_s3_client
+
 
 @pytest.fixture
 def lpcm_zst_file_path():
@@ -73,6 +75,8 @@ def aws_credentials():
 @pytest.fixture(scope="function")
 def s3(aws_credentials, signal_arrow_table_path, lpcm_file_path, lpcm_zst_file_path):
     with mock_s3():
+        # the shared client must be created with the mocked credentials
+        reset_s3_client()
         s3 = boto3.client("s3", region_name="us-east-1")
         s3.create_bucket(Bucket="mock-bucket")
         s3.upload_file(signal_arrow_table_path, "mock-bucket", "test.onda.signal.arrow")
@@ -87,3 +91,4 @@ def s3(aws_credentials, signal_arrow_table_path, lpcm_file_path, lpcm_zst_file_p
             "176ecfcf-d4c7-49ba-adec-f338d0a0c01f_ecg.lpcm.zst",
         )
         yield s3
+    reset_s3_client()
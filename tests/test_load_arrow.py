@@ -1,11 +1,18 @@
 import inspect
 import io
+import uuid
+import pytest
 import pyarrow as pa
 
+import pandas as pd
+
 from pyonda.load_arrow import (
     load_table_from_arrow_file_buffer,
     load_table_from_arrow_file,
     load_table_from_arrow_file_in_s3,
+    iter_tables_from_arrow_file_buffer,
+    iter_tables_from_arrow_file,
+    iter_tables_from_arrow_file_in_s3,
 )
 from tests.utils import assert_signal_arrow_dataframes_equal
 
@@ -92,3 +99,126 @@ def test_load_table_from_arrow_file_in_s3_as_processed_dataframe(
         signal_arrow_table_s3_url, processed_pandas=True
     )
     assert_signal_arrow_dataframes_equal(df)
+
+
+RECORDING_UUID = uuid.UUID("176ecfcf-d4c7-49ba-adec-f338d0a0c01f")
+
+
+@pytest.fixture
+def multi_batch_arrow_table_path(signal_arrow_table_path, tmpdir):
+    table = load_table_from_arrow_file(signal_arrow_table_path, processed_pandas=False)
+    path = tmpdir / "test.onda.signal.arrow"
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, schema=table.schema) as writer:
+            writer.write_table(table, max_chunksize=2)
+    return path
+
+
+def test_load_table_from_arrow_file_columns(multi_batch_arrow_table_path):
+    table = load_table_from_arrow_file(
+        multi_batch_arrow_table_path,
+        processed_pandas=False,
+        columns=["span", "sensor_type"],
+    )
+    assert table.column_names == ["span", "sensor_type"]
+    assert table.num_rows == 6
+
+    df = load_table_from_arrow_file(
+        multi_batch_arrow_table_path, columns=["recording", "channels"]
+    )
+    assert list(df.columns) == ["recording", "channels"]
+    assert df["recording"].iloc[0] == RECORDING_UUID
+
+
+def test_load_table_from_arrow_file_recordings(multi_batch_arrow_table_path):
+    full_df = load_table_from_arrow_file(multi_batch_arrow_table_path)
+    expected_df = full_df[full_df["recording"] == RECORDING_UUID]
+
+    df = load_table_from_arrow_file(
+        multi_batch_arrow_table_path, recordings=[RECORDING_UUID]
+    )
+    assert list(df["sensor_type"]) == list(expected_df["sensor_type"])
+    assert set(df["recording"]) == {RECORDING_UUID}
+
+    # recordings given as strings, filter column not selected
+    table = load_table_from_arrow_file(
+        multi_batch_arrow_table_path,
+        processed_pandas=False,
+        columns=["sensor_type"],
+        recordings={str(RECORDING_UUID)},
+    )
+    assert table.column_names == ["sensor_type"]
+    assert table.column("sensor_type").to_pylist() == list(expected_df["sensor_type"])
+
+    df = load_table_from_arrow_file(multi_batch_arrow_table_path, recordings=[])
+    assert len(df) == 0
+    assert list(df.columns) == list(full_df.columns)
+
+
+def test_load_table_from_arrow_file_in_s3_recordings(s3, signal_arrow_table_s3_url):
+    df = load_table_from_arrow_file_in_s3(
+        signal_arrow_table_s3_url,
+        columns=["recording", "span"],
+        recordings=[RECORDING_UUID],
+    )
+    assert list(df.columns) == ["recording", "span"]
+    assert len(df) == 3
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 4, 6, 10])
+def test_iter_tables_from_arrow_file(multi_batch_arrow_table_path, chunk_rows):
+    reference_table = load_table_from_arrow_file(
+        multi_batch_arrow_table_path, processed_pandas=False
+    )
+    tables = list(
+        iter_tables_from_arrow_file(
+            multi_batch_arrow_table_path, chunk_rows, processed_pandas=False
+        )
+    )
+    assert [table.num_rows for table in tables[:-1]] == [chunk_rows] * (len(tables) - 1)
+    assert 0 < tables[-1].num_rows <= chunk_rows
+    # chunks can be used once the file is closed
+    assert pa.concat_tables(tables).equals(reference_table)
+
+    reference_df = load_table_from_arrow_file(multi_batch_arrow_table_path)
+    df = pd.concat(
+        iter_tables_from_arrow_file(multi_batch_arrow_table_path, chunk_rows),
+        ignore_index=True,
+    )
+    pd.testing.assert_frame_equal(df, reference_df)
+
+
+def test_iter_tables_from_arrow_file_filtered(multi_batch_arrow_table_path):
+    chunks = list(
+        iter_tables_from_arrow_file(
+            multi_batch_arrow_table_path,
+            chunk_rows=2,
+            columns=["recording", "sensor_type"],
+            recordings=[RECORDING_UUID],
+        )
+    )
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert all(list(chunk.columns) == ["recording", "sensor_type"] for chunk in chunks)
+    assert all((chunk["recording"] == RECORDING_UUID).all() for chunk in chunks)
+
+    assert (
+        list(iter_tables_from_arrow_file(multi_batch_arrow_table_path, recordings=[]))
+        == []
+    )
+    with pytest.raises(ValueError):
+        next(iter_tables_from_arrow_file(multi_batch_arrow_table_path, chunk_rows=0))
+
+
+def test_iter_tables_from_arrow_file_buffer(signal_arrow_table_path):
+    with open(signal_arrow_table_path, "rb") as fh:
+        buffer = io.BytesIO(fh.read())
+    df = pd.concat(iter_tables_from_arrow_file_buffer(buffer, 4), ignore_index=True)
+    assert_signal_arrow_dataframes_equal(df)
+
+
+def test_iter_tables_from_arrow_file_in_s3(s3, signal_arrow_table_s3_url):
+    df = pd.concat(
+        iter_tables_from_arrow_file_in_s3(signal_arrow_table_s3_url, 5),
+        ignore_index=True,
+    )
+    assert_signal_arrow_dataframes_equal(df)
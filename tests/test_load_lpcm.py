@@ -9,6 +9,8 @@ from pyonda.load_lpcm import (
     load_array_from_lpcm_file_buffer,
     load_array_from_lpcm_file,
     load_array_from_lpcm_file_in_s3,
+    load_array_window_from_lpcm_file,
+    load_array_window_from_lpcm_file_in_s3,
 )
 
 from tests.fixtures import (
@@ -62,3 +64,139 @@ def test_load_array_from_lpcm_file_in_s3(
 ):
     data = load_array_from_lpcm_file_in_s3(lpcm_file_s3_url, sample_type, n_channels)
     assert np.array_equal(data, expected_eeg_data)
+
+
+def test_load_array_from_lpcm_file_is_memory_mapped(
+    lpcm_file_path, sample_type, n_channels, expected_eeg_data
+):
+    data = load_array_from_lpcm_file(lpcm_file_path, sample_type, n_channels)
+    assert isinstance(data, np.memmap)
+    assert not data.flags.writeable
+    assert data.shape == expected_eeg_data.shape
+
+
+def test_load_array_from_lpcm_file_without_mmap(
+    lpcm_file_path, sample_type, n_channels, expected_eeg_data
+):
+    data = load_array_from_lpcm_file(
+        lpcm_file_path, sample_type, n_channels, mmap=False
+    )
+    assert not isinstance(data, np.memmap)
+    assert np.array_equal(data, expected_eeg_data)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_load_array_from_lpcm_file_bad_n_channels(
+    lpcm_file_path, sample_type, expected_eeg_data, mmap
+):
+    n_channels = expected_eeg_data.size + 1
+    with pytest.raises(ValueError):
+        load_array_from_lpcm_file(lpcm_file_path, sample_type, n_channels, mmap=mmap)
+
+
+def test_load_array_window_from_lpcm_file(
+    lpcm_file_path, sample_type, n_channels, expected_eeg_data
+):
+    data = load_array_window_from_lpcm_file(
+        lpcm_file_path, sample_type, n_channels, sample_range=(100, 350)
+    )
+    assert np.array_equal(data, expected_eeg_data[:, 100:350])
+
+    channels = [n_channels - 1, 0]
+    data = load_array_window_from_lpcm_file(
+        lpcm_file_path, sample_type, n_channels, (100, 350), channels
+    )
+    assert np.array_equal(data, expected_eeg_data[channels, 100:350])
+
+
+def test_load_array_window_from_lpcm_file_with_time_range(
+    lpcm_file_path, sample_type, n_channels, expected_eeg_data
+):
+    data = load_array_window_from_lpcm_file(
+        lpcm_file_path,
+        sample_type,
+        n_channels,
+        time_range=(int(1e9), int(2e9)),
+        sample_rate=128.0,
+    )
+    assert np.array_equal(data, expected_eeg_data[:, 128:256])
+
+
+@pytest.mark.parametrize("channels", [None, [1], [1, 0, 1]])
+def test_load_array_window_from_lpcm_file_c_order(expected_eeg_data, channels, tmpdir):
+    path = tmpdir / "c_order.lpcm"
+    expected_eeg_data.tofile(str(path))
+    data = load_array_window_from_lpcm_file(
+        path,
+        expected_eeg_data.dtype,
+        expected_eeg_data.shape[0],
+        (10, 20),
+        channels,
+        order="C",
+    )
+    expected = expected_eeg_data[:, 10:20]
+    if channels is not None:
+        expected = expected[channels]
+    assert np.array_equal(data, expected)
+
+
+def test_load_array_window_from_lpcm_file_out_of_bounds(
+    lpcm_file_path, sample_type, n_channels, expected_eeg_data
+):
+    n_samples = expected_eeg_data.shape[1]
+    with pytest.raises(ValueError):
+        load_array_window_from_lpcm_file(
+            lpcm_file_path, sample_type, n_channels, (0, n_samples + 1)
+        )
+    with pytest.raises(ValueError):
+        load_array_window_from_lpcm_file(
+            lpcm_file_path, sample_type, n_channels, channels=[n_channels]
+        )
+
+
+def test_load_array_window_from_lpcm_file_in_s3(
+    s3, lpcm_file_s3_url, sample_type, n_channels, expected_eeg_data
+):
+    data = load_array_window_from_lpcm_file_in_s3(
+        lpcm_file_s3_url, sample_type, n_channels, (100, 350), [1]
+    )
+    assert np.array_equal(data, expected_eeg_data[[1], 100:350])
+
+
+def test_load_array_window_from_lpcm_file_in_s3_with_version(
+    s3, sample_type, n_channels, expected_eeg_data
+):
+    s3.create_bucket(Bucket="versioned-bucket")
+    s3.put_bucket_versioning(
+        Bucket="versioned-bucket", VersioningConfiguration={"Status": "Enabled"}
+    )
+    response = s3.put_object(
+        Bucket="versioned-bucket", Key="eeg.lpcm", Body=expected_eeg_data.tobytes("F")
+    )
+    s3.put_object(Bucket="versioned-bucket", Key="eeg.lpcm", Body=b"")
+
+    data = load_array_window_from_lpcm_file_in_s3(
+        f"s3://versioned-bucket/eeg.lpcm?versionId={response['VersionId']}",
+        sample_type,
+        n_channels,
+        time_range=(int(1e9), int(2e9)),
+        sample_rate=128.0,
+    )
+    assert np.array_equal(data, expected_eeg_data[:, 128:256])
+
+
+@pytest.mark.parametrize("max_gap", [0, 10**6])
+def test_load_array_window_from_lpcm_file_in_s3_c_order(s3, expected_eeg_data, max_gap):
+    s3.put_object(
+        Bucket="mock-bucket", Key="c_order.lpcm", Body=expected_eeg_data.tobytes("C")
+    )
+    data = load_array_window_from_lpcm_file_in_s3(
+        "s3://mock-bucket/c_order.lpcm",
+        expected_eeg_data.dtype,
+        expected_eeg_data.shape[0],
+        (10, 20),
+        [1, 0],
+        order="C",
+        max_gap=max_gap,
+    )
+    assert np.array_equal(data, expected_eeg_data[[1, 0], 10:20])
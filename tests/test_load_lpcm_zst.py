@@ -7,6 +7,12 @@ from pyonda.load_arrow import load_table_from_arrow_file
 from pyonda.load_lpcm import (
     load_array_from_lpcm_zst_file,
     load_array_from_lpcm_zst_file_in_s3,
+    load_array_window_from_lpcm_zst_file,
+    load_array_window_from_lpcm_zst_file_in_s3,
+)
+from pyonda.save_lpcm import (
+    save_array_to_lpcm_zst_file,
+    save_array_to_lpcm_zst_file_in_s3,
 )
 
 from tests.fixtures import (
@@ -46,6 +52,19 @@ def test_load_array_from_lpcm_zst_file(
     assert np.array_equal(data, expected_ecg_data)
 
 
+@pytest.mark.parametrize("n_samples_delta", [-10, 0, 10])
+def test_load_array_from_lpcm_zst_file_with_n_samples(
+    lpcm_zst_file_path, sample_type, n_channels, expected_ecg_data, n_samples_delta
+):
+    data = load_array_from_lpcm_zst_file(
+        lpcm_zst_file_path,
+        sample_type,
+        n_channels,
+        n_samples=expected_ecg_data.shape[1] + n_samples_delta,
+    )
+    assert np.array_equal(data, expected_ecg_data)
+
+
 def test_load_array_from_lpcm_zst_file_in_s3(
     s3, lpcm_zst_file_s3_url, sample_type, n_channels, expected_ecg_data
 ):
@@ -53,3 +72,58 @@ def test_load_array_from_lpcm_zst_file_in_s3(
         lpcm_zst_file_s3_url, sample_type, n_channels
     )
     assert np.array_equal(data, expected_ecg_data)
+
+
+def test_load_array_window_from_lpcm_zst_file_without_seek_table(
+    lpcm_zst_file_path, sample_type, n_channels, expected_ecg_data
+):
+    data = load_array_window_from_lpcm_zst_file(
+        lpcm_zst_file_path, sample_type, n_channels, (100, 350), [1]
+    )
+    assert np.array_equal(data, expected_ecg_data[[1], 100:350])
+
+
+def test_load_array_window_from_lpcm_zst_file_in_s3_without_seek_table(
+    s3, lpcm_zst_file_s3_url, sample_type, n_channels, expected_ecg_data
+):
+    data = load_array_window_from_lpcm_zst_file_in_s3(
+        lpcm_zst_file_s3_url, sample_type, n_channels, (100, 350)
+    )
+    assert np.array_equal(data, expected_ecg_data[:, 100:350])
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+def test_load_array_window_from_seekable_lpcm_zst_file(
+    expected_ecg_data, order, tmpdir
+):
+    path = tmpdir / "seekable.lpcm.zst"
+    save_array_to_lpcm_zst_file(expected_ecg_data, path, order, frame_samples=1000)
+    n_channels = expected_ecg_data.shape[0]
+
+    data = load_array_from_lpcm_zst_file(
+        path, expected_ecg_data.dtype, n_channels, order
+    )
+    assert np.array_equal(data, expected_ecg_data)
+
+    data = load_array_window_from_lpcm_zst_file(
+        path, expected_ecg_data.dtype, n_channels, (1500, 4200), [1, 0], order
+    )
+    assert np.array_equal(data, expected_ecg_data[[1, 0], 1500:4200])
+
+
+def test_load_array_window_from_seekable_lpcm_zst_file_in_s3(s3, expected_ecg_data):
+    save_array_to_lpcm_zst_file_in_s3(
+        expected_ecg_data,
+        "mock-bucket",
+        "seekable.lpcm.zst",
+        order="F",
+        frame_samples=1000,
+    )
+    data = load_array_window_from_lpcm_zst_file_in_s3(
+        "s3://mock-bucket/seekable.lpcm.zst",
+        expected_ecg_data.dtype,
+        expected_ecg_data.shape[0],
+        time_range=(int(1e9), int(3e9)),
+        sample_rate=256.0,
+    )
+    assert np.array_equal(data, expected_ecg_data[:, 256:768])
@@ -0,0 +1,117 @@
+import uuid
+import pytest
+import numpy as np
+import pyarrow as pa
+
+from pyonda.load_arrow import load_table_from_arrow_file
+from pyonda.load_signals import (
+    load_array_from_signal,
+    load_decoded_array_from_signal,
+    iter_arrays_from_signals,
+    load_arrays_from_signals,
+)
+
+from tests.fixtures import (
+    aws_credentials,
+    signal_arrow_table_path,
+    lpcm_file_path,
+    lpcm_zst_file_path,
+    s3,
+    lpcm_file_s3_url,
+    lpcm_zst_file_s3_url,
+    expected_eeg_data,
+    expected_ecg_data,
+)
+
+
+@pytest.fixture
+def signals(signal_arrow_table_path):
+    """eeg and ecg signals of the test table, with their ids"""
+    df = load_table_from_arrow_file(signal_arrow_table_path, processed_pandas=True)
+    df = df.iloc[:2].copy()
+    df["id"] = [uuid.uuid4(), uuid.uuid4()]
+    return df
+
+
+@pytest.fixture
+def local_signals(signals, lpcm_file_path, lpcm_zst_file_path):
+    signals["file_path"] = [str(lpcm_file_path), str(lpcm_zst_file_path)]
+    return signals
+
+
+@pytest.fixture
+def s3_signals(signals, lpcm_file_s3_url, lpcm_zst_file_s3_url):
+    signals["file_path"] = [lpcm_file_s3_url, lpcm_zst_file_s3_url]
+    return signals
+
+
+def test_load_array_from_signal(local_signals, expected_eeg_data, expected_ecg_data):
+    data = load_array_from_signal(local_signals.iloc[0])
+    assert np.array_equal(data, expected_eeg_data)
+    data = load_array_from_signal(local_signals.iloc[1])
+    assert np.array_equal(data, expected_ecg_data)
+
+
+@pytest.mark.parametrize("span_delta", [-(10**9), 10**9])
+def test_load_array_from_signal_with_inexact_span(
+    local_signals, expected_ecg_data, span_delta
+):
+    signal = local_signals.iloc[1].copy()
+    signal["span"] = {
+        "start": signal["span"]["start"],
+        "stop": signal["span"]["stop"] + span_delta,
+    }
+    data = load_array_from_signal(signal)
+    assert np.array_equal(data, expected_ecg_data)
+
+
+def test_load_decoded_array_from_signal(local_signals, expected_ecg_data):
+    signal = local_signals.iloc[1]
+    expected = (
+        signal["sample_resolution_in_unit"] * expected_ecg_data
+        + signal["sample_offset_in_unit"]
+    )
+    data = load_decoded_array_from_signal(signal, chunk_values=1000, max_workers=2)
+    assert data.dtype == np.float64
+    np.testing.assert_allclose(data, expected)
+
+    out = np.empty(expected.shape, dtype=np.float32)
+    assert load_decoded_array_from_signal(signal, out=out) is out
+    np.testing.assert_allclose(out, expected, rtol=1e-6)
+
+
+def test_load_array_from_signal_unsupported_format(local_signals):
+    signal = local_signals.iloc[0].copy()
+    signal["file_format"] = "edf"
+    with pytest.raises(ValueError):
+        load_array_from_signal(signal)
+
+
+def test_load_arrays_from_signals(local_signals, expected_eeg_data, expected_ecg_data):
+    arrays = load_arrays_from_signals(local_signals, max_workers=1)
+    eeg_id, ecg_id = local_signals["id"]
+    assert arrays.keys() == {eeg_id, ecg_id}
+    assert np.array_equal(arrays[eeg_id], expected_eeg_data)
+    assert np.array_equal(arrays[ecg_id], expected_ecg_data)
+
+
+def test_iter_arrays_from_signals_in_s3(
+    s3, s3_signals, expected_eeg_data, expected_ecg_data
+):
+    arrays = dict(iter_arrays_from_signals(s3_signals, max_workers=4))
+    eeg_id, ecg_id = s3_signals["id"]
+    assert np.array_equal(arrays[eeg_id], expected_eeg_data)
+    assert np.array_equal(arrays[ecg_id], expected_ecg_data)
+
+
+def test_load_arrays_from_signals_arrow_table(
+    local_signals, expected_eeg_data, expected_ecg_data
+):
+    # without an id column, signals are keyed by row index
+    table = pa.Table.from_pandas(
+        local_signals[["file_path", "file_format", "sample_type", "channels"]],
+        preserve_index=False,
+    )
+    arrays = load_arrays_from_signals(table)
+    assert np.array_equal(arrays[0], expected_eeg_data)
+    assert np.array_equal(arrays[1], expected_ecg_data)
@@ -1,4 +1,6 @@
+import os
 import pytest
+import pyarrow as pa
 from pyonda.save_arrow import save_table_to_arrow_file, save_table_to_s3
 from pyonda.load_arrow import (
     load_table_from_arrow_file,
@@ -28,9 +30,136 @@ def test_save_table_to_arrow_file(ref_table, tmpdir):
     assert saved_table == ref_table
 
 
+def test_save_table_with_storage_columns(ref_table, tmpdir):
+    # plain fixed_size_binary(16) and struct columns for the extension fields of the schema
+    storage_table = pa.Table.from_arrays(
+        [
+            (
+                column.cast(column.type.storage_type)
+                if isinstance(column.type, pa.ExtensionType)
+                else column
+            )
+            for column in ref_table.columns
+        ],
+        names=ref_table.column_names,
+    )
+    save_table_to_arrow_file(
+        storage_table, ref_table.schema, tmpdir / "test_table.arrow"
+    )
+    saved_table = load_table_from_arrow_file(
+        tmpdir / "test_table.arrow", processed_pandas=False
+    )
+    assert saved_table == ref_table
+
+
 def test_save_table_to_s3(ref_table, s3):
     save_table_to_s3(ref_table, ref_table.schema, "mock-bucket", "test_table.arrow")
     saved_table = load_table_from_arrow_file_in_s3(
         "s3://mock-bucket/test_table.arrow", processed_pandas=False
     )
     assert saved_table == ref_table
+
+
+@pytest.mark.parametrize(
+    "compression, compression_level", [("lz4", None), ("zstd", None), ("zstd", 9)]
+)
+def test_save_table_to_arrow_file_compressed(
+    ref_table, tmpdir, compression, compression_level
+):
+    output_path = tmpdir / "test_table.arrow"
+    save_table_to_arrow_file(
+        ref_table,
+        ref_table.schema,
+        output_path,
+        compression=compression,
+        compression_level=compression_level,
+    )
+    saved_table = load_table_from_arrow_file(output_path, processed_pandas=False)
+    assert saved_table == ref_table
+    with pytest.raises(ValueError):
+        save_table_to_arrow_file(
+            ref_table, ref_table.schema, output_path, compression="gzip"
+        )
+
+
+def test_save_table_to_arrow_file_batches_and_dictionaries(ref_table, tmpdir):
+    output_path = tmpdir / "test_table.arrow"
+    save_table_to_arrow_file(
+        ref_table,
+        ref_table.schema,
+        output_path,
+        max_chunksize=4,
+        dictionary_columns=["sensor_type", "file_format"],
+    )
+    with pa.memory_map(str(output_path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        assert reader.num_record_batches == 2
+        assert pa.types.is_dictionary(reader.schema.field("sensor_type").type)
+    saved_table = load_table_from_arrow_file(output_path, processed_pandas=False)
+    assert saved_table.cast(ref_table.schema) == ref_table
+    saved_df = load_table_from_arrow_file(output_path)
+    assert saved_df["sensor_type"].tolist() == ref_table["sensor_type"].to_pylist()
+
+
+def test_save_table_to_s3_compressed(ref_table, s3):
+    save_table_to_s3(
+        ref_table,
+        ref_table.schema,
+        "mock-bucket",
+        "test_table.arrow",
+        compression="zstd",
+        max_chunksize=2,
+    )
+    saved_table = load_table_from_arrow_file_in_s3(
+        "s3://mock-bucket/test_table.arrow", processed_pandas=False
+    )
+    assert saved_table == ref_table
+
+
+def test_save_record_batches_to_arrow_file(ref_table, tmpdir):
+    output_path = tmpdir / "test_table.arrow"
+    save_table_to_arrow_file(
+        iter(ref_table.to_batches(max_chunksize=2)), ref_table.schema, output_path
+    )
+    saved_table = load_table_from_arrow_file(output_path, processed_pandas=False)
+    assert saved_table == ref_table
+    with pytest.raises(ValueError):
+        save_table_to_arrow_file(
+            iter(ref_table.to_batches()),
+            ref_table.schema,
+            output_path,
+            dictionary_columns=["sensor_type"],
+        )
+
+
+def test_save_record_batches_to_s3_multipart(s3):
+    schema = pa.schema([("index", pa.int64()), ("payload", pa.binary())])
+    n_batches = 5
+    consumed = []
+
+    def iter_batches():
+        for i in range(n_batches):
+            consumed.append(i)
+            yield pa.record_batch(
+                [pa.array([i]), pa.array([os.urandom(5 * 2**20)])], schema=schema
+            )
+
+    save_table_to_s3(iter_batches(), schema, "mock-bucket", "large_table.arrow")
+    assert consumed == list(range(n_batches))
+
+    response = s3.head_object(Bucket="mock-bucket", Key="large_table.arrow")
+    assert response["ETag"].endswith('-2"')
+    saved_table = load_table_from_arrow_file_in_s3(
+        "s3://mock-bucket/large_table.arrow", processed_pandas=False
+    )
+    assert saved_table.column("index").to_pylist() == list(range(n_batches))
+
+
+def test_save_table_to_s3_is_aborted_on_error(ref_table, s3):
+    def iter_batches():
+        yield from ref_table.to_batches()
+        raise RuntimeError("Failure while writing")
+
+    with pytest.raises(RuntimeError):
+        save_table_to_s3(iter_batches(), ref_table.schema, "mock-bucket", "table.arrow")
+    assert "Contents" not in s3.list_objects_v2(Bucket="mock-bucket", Prefix="table")
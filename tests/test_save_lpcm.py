@@ -16,6 +16,8 @@ from pyonda.save_lpcm import (
     save_array_to_lpcm_zst_file_in_s3,
 )
 
+from pyonda.utils.sample_conversion import SampleEncoding, decode_samples
+
 from tests.fixtures import (
     aws_credentials,
     signal_arrow_table_path,
@@ -63,6 +65,20 @@ def test_save_array_to_lpcm_zst_file(
     assert np.array_equal(saved_data, expected_eeg_data)
 
 
+def test_save_array_to_lpcm_zst_file_with_compression_options(
+    sample_type, n_channels, expected_eeg_data, tmpdir
+):
+    save_array_to_lpcm_zst_file(
+        expected_eeg_data,
+        tmpdir / "test_array.lpcm.zst",
+        compression_options={"level": 19, "threads": 2, "long_distance_matching": True},
+    )
+    saved_data = load_array_from_lpcm_zst_file(
+        tmpdir / "test_array.lpcm.zst", sample_type, n_channels, "C"
+    )
+    assert np.array_equal(saved_data, expected_eeg_data)
+
+
 def test_save_array_to_lpcm_file_in_s3(s3, sample_type, n_channels, expected_eeg_data):
     save_array_to_lpcm_file_in_s3(expected_eeg_data, "mock-bucket", "test_array.lpcm")
     saved_data = load_array_from_lpcm_file_in_s3(
@@ -81,3 +97,65 @@ def test_save_array_to_lpcm_zst_file_in_s3(
         "s3://mock-bucket/test_array.lpcm.zst", sample_type, n_channels, "C"
     )
     assert np.array_equal(saved_data, expected_eeg_data)
+
+
+@pytest.fixture
+def encoded_data():
+    rng = np.random.default_rng(0)
+    return rng.integers(-1000, 1000, size=(3, 5000), dtype=np.int16)
+
+
+def test_save_encoded_array(encoded_data, s3, tmpdir):
+    encoding = SampleEncoding(np.int16, 0.25, 10.0)
+    physical_data = decode_samples(encoded_data, encoding.resolution, encoding.offset)
+
+    save_array_to_lpcm_file(physical_data, tmpdir / "a.lpcm", "F", encoding=encoding)
+    saved_data = load_array_from_lpcm_file(tmpdir / "a.lpcm", np.int16, 3, "F")
+    assert np.array_equal(saved_data, encoded_data)
+
+    for frame_samples in [None, 1000]:
+        save_array_to_lpcm_zst_file(
+            physical_data,
+            tmpdir / "a.lpcm.zst",
+            "F",
+            frame_samples=frame_samples,
+            encoding=encoding,
+        )
+        saved_data = load_array_from_lpcm_zst_file(
+            tmpdir / "a.lpcm.zst", np.int16, 3, "F"
+        )
+        assert np.array_equal(saved_data, encoded_data)
+
+    save_array_to_lpcm_file_in_s3(
+        physical_data, "mock-bucket", "a.lpcm", order="F", encoding=encoding
+    )
+    saved_data = load_array_from_lpcm_file_in_s3(
+        "s3://mock-bucket/a.lpcm", np.int16, 3, "F"
+    )
+    assert np.array_equal(saved_data, encoded_data)
+
+    save_array_to_lpcm_zst_file_in_s3(
+        physical_data, "mock-bucket", "a.lpcm.zst", order="F", encoding=encoding
+    )
+    saved_data = load_array_from_lpcm_zst_file_in_s3(
+        "s3://mock-bucket/a.lpcm.zst", np.int16, 3, "F"
+    )
+    assert np.array_equal(saved_data, encoded_data)
+
+
+@pytest.mark.parametrize("frame_samples", [0, -10, 2.5, "1000", True])
+def test_save_array_to_lpcm_zst_bad_frame_samples(
+    encoded_data, frame_samples, s3, tmpdir
+):
+    with pytest.raises(ValueError):
+        save_array_to_lpcm_zst_file(
+            encoded_data, tmpdir / "a.lpcm.zst", frame_samples=frame_samples
+        )
+    assert not (tmpdir / "a.lpcm.zst").exists()
+    with pytest.raises(ValueError):
+        save_array_to_lpcm_zst_file_in_s3(
+            encoded_data, "mock-bucket", "a.lpcm.zst", frame_samples=frame_samples
+        )
+    save_array_to_lpcm_zst_file(
+        encoded_data, tmpdir / "a.lpcm.zst", frame_samples=np.int64(1000)
+    )
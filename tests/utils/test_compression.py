@@ -1,10 +1,20 @@
 import pytest
+import io
 import shutil
+import zstandard
 import numpy as np
 
 from pathlib import Path
 
-from pyonda.utils.compression import compress_file_to_zst
+from pyonda.utils.compression import (
+    compress_file_to_zst,
+    compress_array_to_zst_stream,
+    get_zstd_compressor,
+    get_default_compression_options,
+    set_default_compression_options,
+    DEFAULT_COMPRESSION_OPTIONS,
+    MAX_PORTABLE_WINDOW_LOG,
+)
 from pyonda.utils.decompression import decompress_zstandard_file_to_stream
 
 from tests.fixtures import lpcm_file_path
@@ -28,3 +38,68 @@ def test_compress_file_to_zst(tmpdir, lpcm_file_path):
     )
     assert np.array_equal(decompressed_data, reference_data)
     shutil.rmtree(tmpdir)
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+def test_compress_array_to_zst_stream(order):
+    array = np.arange(3 * 10**6, dtype=np.int16).reshape(3, -1)[:, ::2]
+    destination = io.BytesIO()
+    compress_array_to_zst_stream(array, destination, order)
+
+    content = destination.getvalue()
+    assert zstandard.frame_content_size(content) == array.nbytes
+    assert zstandard.ZstdDecompressor().decompress(content) == array.tobytes(order)
+
+
+@pytest.fixture
+def restore_default_compression_options():
+    yield
+    set_default_compression_options(**DEFAULT_COMPRESSION_OPTIONS)
+
+
+def test_get_zstd_compressor():
+    content = bytes(range(256)) * 1000
+    compressor = get_zstd_compressor(
+        {"level": 19, "threads": 2, "window_log": 24, "long_distance_matching": True}
+    )
+    compressed = compressor.compress(content)
+    assert zstandard.ZstdDecompressor().decompress(compressed) == content
+
+    with pytest.raises(ValueError):
+        get_zstd_compressor({"compression_level": 3})
+    with pytest.raises(ValueError):
+        get_zstd_compressor({"window_log": 30})
+
+
+def test_set_default_compression_options(restore_default_compression_options):
+    set_default_compression_options(level=7, threads=0)
+    assert get_default_compression_options() == {
+        **DEFAULT_COMPRESSION_OPTIONS,
+        "level": 7,
+        "threads": 0,
+    }
+    with pytest.raises(ValueError):
+        set_default_compression_options(window_log=31)
+    assert get_default_compression_options()["window_log"] is None
+
+
+@pytest.mark.parametrize(
+    "compression_options, window_size",
+    [
+        ({"long_distance_matching": False}, None),
+        ({"long_distance_matching": True}, 2**MAX_PORTABLE_WINDOW_LOG),
+        ({"long_distance_matching": True, "window_log": 24}, 2**24),
+    ],
+)
+def test_get_zstd_compressor_long_distance_matching_window(
+    compression_options, window_size
+):
+    compressor = get_zstd_compressor({"threads": 0, **compression_options})
+    compressobj = compressor.compressobj()
+    # the content size is unknown, the frame header holds the configured window size
+    frame = compressobj.compress(b"x" * 1000) + compressobj.flush()
+    frame_window_size = zstandard.get_frame_parameters(frame).window_size
+    if window_size is None:
+        assert frame_window_size < 2**MAX_PORTABLE_WINDOW_LOG
+    else:
+        assert frame_window_size == window_size
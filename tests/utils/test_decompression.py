@@ -1,5 +1,8 @@
 import pytest
+import io
+import tracemalloc
 import os
+import zstandard
 import shutil
 import numpy as np
 
@@ -10,7 +13,11 @@ from pyonda.utils.decompression import (
     decompress_zstandard_file_to_stream,
     decompress_zstandard_stream_to_file,
     decompress_zstandard_stream_to_stream,
+    decompress_zstandard_file_to_array,
+    decompress_zstandard_stream_to_array,
+    get_zstandard_stream_decompressed_size,
 )
+from pyonda.utils.zstd_seekable import write_seekable_zst
 
 from tests.fixtures import lpcm_zst_file_path
 
@@ -74,3 +81,61 @@ def test_decompress_zstandard_stream_to_stream(lpcm_zst_file_path):
         )
     )
     assert np.array_equal(decompressed_data, reference_data)
+
+
+def test_get_zstandard_stream_decompressed_size(lpcm_zst_file_path):
+    # the test file was compressed as a stream, its size is unknown
+    with open(lpcm_zst_file_path, "rb") as f:
+        assert get_zstandard_stream_decompressed_size(f) is None
+        assert f.tell() == 0
+
+    stream = io.BytesIO(zstandard.ZstdCompressor().compress(b"x" * 1000))
+    assert get_zstandard_stream_decompressed_size(stream) == 1000
+
+    stream = io.BytesIO()
+    write_seekable_zst([b"x" * 1000, b"y" * 500], stream)
+    stream.seek(0)
+    assert get_zstandard_stream_decompressed_size(stream) == 1500
+
+
+@pytest.mark.parametrize("size", [None, 1000, 2 * 77490 * 2, 10**6])
+def test_decompress_zstandard_file_to_array(lpcm_zst_file_path, size):
+    data = decompress_zstandard_file_to_array(lpcm_zst_file_path, size)
+    reference_data = np.fromfile(lpcm_zst_file_path.with_suffix(""), dtype=np.uint8)
+    assert data.dtype == np.uint8
+    assert np.array_equal(data, reference_data)
+
+
+def test_decompress_zstandard_stream_to_array():
+    content = np.arange(10**6, dtype=np.int32)
+    stream = io.BytesIO()
+    write_seekable_zst(np.split(content, 4), stream)
+    stream.seek(0)
+    data = decompress_zstandard_stream_to_array(stream)
+    assert np.array_equal(data.view(np.int32), content)
+
+    stream = io.BytesIO(zstandard.ZstdCompressor().compress(b""))
+    assert decompress_zstandard_stream_to_array(stream).size == 0
+
+
+@pytest.mark.parametrize("size_delta", [None, -4, 4])
+def test_decompress_zstandard_stream_to_array_prefers_stored_size(size_delta):
+    content = np.arange(2**20, dtype=np.int32)
+    stream = io.BytesIO(zstandard.ZstdCompressor().compress(content.tobytes()))
+    size = None if size_delta is None else content.nbytes + size_delta
+    tracemalloc.start()
+    data = decompress_zstandard_stream_to_array(stream, size)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert np.array_equal(data.view(np.int32), content)
+    # a single allocation of the stored size
+    assert peak < 1.1 * content.nbytes
+
+
+def test_decompress_zstandard_stream_to_array_oversized_hint(lpcm_zst_file_path):
+    reference_data = np.fromfile(lpcm_zst_file_path.with_suffix(""), dtype=np.uint8)
+    with open(lpcm_zst_file_path, "rb") as f:
+        data = decompress_zstandard_stream_to_array(f, reference_data.size + 1000)
+    assert np.array_equal(data, reference_data)
+    assert data.flags.owndata
+    assert data.size == data.nbytes == reference_data.size
@@ -0,0 +1,175 @@
+import pickle
+import uuid
+import pytest
+import pandas as pd
+import pyarrow as pa
+
+from pyonda.load_arrow import load_table_from_arrow_file
+from pyonda.save_arrow import save_table_to_arrow_file
+from pyonda.utils.extension_types import (
+    JuliaUUIDType,
+    JuliaUUIDDtype,
+    JuliaUUIDArray,
+    JuliaTimeSpanType,
+    JuliaTimeSpanDtype,
+    JuliaTimeSpanArray,
+    register_julia_extension_types,
+)
+from pyonda.utils.processing import encode_julia_uuid_array
+from pyonda.utils.schemas import ONDA_ANNOTATIONS_SCHEMA, timespan_namedtuple
+from tests.fixtures import signal_arrow_table_path
+
+
+@pytest.fixture
+def annotations_table():
+    uuids = [uuid.uuid4() for _ in range(4)]
+    rows = {
+        "recording": encode_julia_uuid_array([uuids[0]] * 4),
+        "id": encode_julia_uuid_array(uuids),
+        "span": [
+            timespan_namedtuple(start=int(n * 30 * 1e9), stop=int((n + 1) * 30 * 1e9))
+            for n in range(4)
+        ],
+    }
+    return pa.Table.from_pydict(rows, schema=ONDA_ANNOTATIONS_SCHEMA)
+
+
+def test_read_julia_extension_types(signal_arrow_table_path):
+    table = load_table_from_arrow_file(signal_arrow_table_path, processed_pandas=False)
+    assert table.schema.field("recording").type == JuliaUUIDType()
+    span_type = table.schema.field("span").type
+    assert isinstance(span_type, JuliaTimeSpanType)
+    assert span_type.storage_type.field("start").type == pa.duration("ns")
+
+    df = table.to_pandas()
+    assert isinstance(df["recording"].dtype, JuliaUUIDDtype)
+    assert isinstance(df["span"].dtype, JuliaTimeSpanDtype)
+    assert str(df["recording"].iloc[0]) == "176ecfcf-d4c7-49ba-adec-f338d0a0c01f"
+    assert df["span"].iloc[0] == {"start": 20000000000, "stop": 260000000000}
+
+    # sliced tables
+    sliced_df = table.slice(1, 3).to_pandas()
+    assert list(sliced_df["recording"]) == list(df["recording"].iloc[1:4])
+    assert list(sliced_df["span"]) == list(df["span"].iloc[1:4])
+
+
+def test_julia_extension_arrays_pandas_operations(annotations_table):
+    df = annotations_table.to_pandas()
+    recording = df["recording"].iloc[0]
+    assert isinstance(df["id"].array, JuliaUUIDArray)
+    assert isinstance(df["span"].array, JuliaTimeSpanArray)
+
+    assert (df["recording"] == recording).all()
+    assert df.groupby("recording").size()[recording] == 4
+    assert list(df["span"].map(lambda x: x["stop"] - x["start"])) == [30 * 10**9] * 4
+    assert df["id"].map(str).iloc[1] == str(df["id"].iloc[1])
+
+    subset = df.take([3, 1])
+    assert list(subset["id"]) == [df["id"].iloc[3], df["id"].iloc[1]]
+    df.loc[0, "id"] = None
+    assert df["id"].isna().tolist() == [True, False, False, False]
+    assert len(pd.concat([df, df])) == 8
+
+
+def test_julia_extension_arrays_to_arrow(annotations_table):
+    df = annotations_table.to_pandas()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    assert table.schema.field("id").type == JuliaUUIDType()
+    assert table.schema.field("span").type == JuliaTimeSpanType()
+    assert table.cast(ONDA_ANNOTATIONS_SCHEMA).equals(annotations_table)
+
+
+def test_save_julia_extension_types(annotations_table, tmpdir):
+    path = tmpdir / "test.annotations.arrow"
+    save_table_to_arrow_file(annotations_table, ONDA_ANNOTATIONS_SCHEMA, path)
+    assert load_table_from_arrow_file(path, processed_pandas=False).equals(
+        annotations_table
+    )
+
+    # without the registered types, the columns are read as Onda.jl writes them
+    pa.unregister_extension_type("JuliaLang.UUID")
+    pa.unregister_extension_type("JuliaLang.TimeSpan")
+    try:
+        schema = pa.ipc.open_file(pa.memory_map(str(path), "r")).schema
+    finally:
+        register_julia_extension_types()
+    for name, extension_name in [
+        ("recording", b"JuliaLang.UUID"),
+        ("id", b"JuliaLang.UUID"),
+        ("span", b"JuliaLang.TimeSpan"),
+    ]:
+        assert schema.field(name).metadata == {
+            b"ARROW:extension:name": extension_name,
+            b"ARROW:extension:metadata": b"",
+        }
+    assert schema.field("id").type == pa.binary(16)
+
+
+def test_julia_timespan_type_storage():
+    with pytest.raises(ValueError):
+        JuliaTimeSpanType(pa.struct([("first", pa.int64()), ("last", pa.int64())]))
+    with pytest.raises(ValueError):
+        JuliaTimeSpanType(pa.int64())
+
+
+def test_read_foreign_columns_with_julia_extension_names(tmpdir):
+    fields = [
+        pa.field(
+            name,
+            storage_type,
+            metadata={
+                b"ARROW:extension:name": extension_name,
+                b"ARROW:extension:metadata": b"",
+            },
+        )
+        for name, storage_type, extension_name in [
+            ("id", pa.string(), b"JuliaLang.UUID"),
+            ("span", pa.struct([("first", pa.int64())]), b"JuliaLang.TimeSpan"),
+        ]
+    ]
+    table = pa.Table.from_pydict(
+        {"id": ["a"], "span": [{"first": 1}]},
+        schema=pa.schema([field.remove_metadata() for field in fields]),
+    )
+    output_path = tmpdir / "foreign.arrow"
+    with pa.OSFile(str(output_path), "wb") as sink:
+        with pa.ipc.new_file(sink, pa.schema(fields)) as writer:
+            writer.write_table(table.cast(pa.schema(fields)))
+
+    loaded = load_table_from_arrow_file(output_path, processed_pandas=False)
+    assert loaded.schema.field("id").type == pa.string()
+    assert loaded.schema.field("span").type == pa.struct([("first", pa.int64())])
+    assert loaded.to_pylist() == [{"id": "a", "span": {"first": 1}}]
+
+
+def test_pickle_julia_extension_types(signal_arrow_table_path):
+    table = load_table_from_arrow_file(signal_arrow_table_path, processed_pandas=False)
+    assert isinstance(table.schema.field("recording").type, JuliaUUIDType)
+    assert isinstance(table.schema.field("span").type, JuliaTimeSpanType)
+    unpickled = pickle.loads(pickle.dumps(table))
+    assert unpickled.schema == table.schema
+    assert unpickled == table
+    for extension_type in [JuliaUUIDType(), JuliaTimeSpanType()]:
+        assert pickle.loads(pickle.dumps(extension_type)) == extension_type
+
+
+def test_julia_extension_arrays_value_counts(signal_arrow_table_path):
+    raw = load_table_from_arrow_file(signal_arrow_table_path, processed_pandas=False)
+    df = raw.to_pandas()
+    recording = df["recording"].iloc[0]
+
+    counts = df["recording"].value_counts()
+    assert isinstance(counts.index.dtype, JuliaUUIDDtype)
+    assert counts[recording] == (df["recording"] == recording).sum()
+    assert counts.sum() == len(df)
+    span_counts = df["span"].value_counts()
+    assert isinstance(span_counts.index.dtype, JuliaTimeSpanDtype)
+    assert span_counts.sum() == len(df)
+
+    df.loc[0, "recording"] = None
+    assert df["recording"].value_counts().sum() == len(df) - 1
+    assert df["recording"].value_counts(dropna=False).sum() == len(df)
+
+    for frame in [df, load_table_from_arrow_file(signal_arrow_table_path)]:
+        description = frame.describe(include="all")
+        assert description.loc["count", "recording"] == frame["recording"].count()
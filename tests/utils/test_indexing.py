@@ -0,0 +1,171 @@
+import os
+import uuid
+import numpy as np
+import pyarrow as pa
+import pytest
+from pyonda.load_arrow import load_table_from_arrow_file
+from pyonda.utils.indexing import (
+    RecordingIndex,
+    SpanIndex,
+    get_recording_index,
+    recording_index_path,
+    _grouped_running_max,
+)
+from pyonda.utils.processing import arrow_to_processed_pandas, encode_julia_uuid_array
+from pyonda.utils.schemas import ONDA_ANNOTATIONS_SCHEMA
+from tests.fixtures import signal_arrow_table_path
+
+RECORDING_A = uuid.UUID("176ecfcf-d4c7-49ba-adec-f338d0a0c01f")
+RECORDING_B = uuid.UUID("bf11f8f0-36a4-4ef6-b339-9b4f98f72af2")
+
+
+@pytest.fixture
+def signals_table(signal_arrow_table_path):
+    return load_table_from_arrow_file(signal_arrow_table_path, processed_pandas=False)
+
+
+def test_recording_index_from_table(signals_table):
+    index = RecordingIndex.from_table(signals_table)
+    assert len(index) == 2
+    assert index.n_rows == 6
+    assert index.get_recordings() == [RECORDING_A, RECORDING_B]
+    for recording in [RECORDING_B, str(RECORDING_B), RECORDING_B.bytes]:
+        assert recording in index
+        np.testing.assert_array_equal(index.get_rows(recording), [3, 4, 5])
+    assert uuid.uuid4() not in index
+    assert index.get_rows(uuid.uuid4()).size == 0
+    np.testing.assert_array_equal(
+        index.get_rows_of_recordings([RECORDING_B, RECORDING_A]), np.arange(6)
+    )
+
+    df = arrow_to_processed_pandas(signals_table)
+    df_index = RecordingIndex.from_table(df)
+    assert df_index.get_recordings() == index.get_recordings()
+    np.testing.assert_array_equal(df_index.positions, index.positions)
+
+
+def test_recording_index_groups_interleaved_rows_and_skips_nulls():
+    recordings = [RECORDING_B, None, RECORDING_A, RECORDING_B, RECORDING_A, None]
+    table = pa.table({"recording": encode_julia_uuid_array(recordings)})
+    index = RecordingIndex.from_table(table)
+    assert index.get_recordings() == [RECORDING_A, RECORDING_B]
+    np.testing.assert_array_equal(index.get_rows(RECORDING_A), [2, 4])
+    np.testing.assert_array_equal(index.get_rows(RECORDING_B), [0, 3])
+
+    empty = RecordingIndex.from_table(table.slice(0, 0))
+    assert len(empty) == 0
+    assert empty.get_recordings() == []
+
+
+def test_recording_index_take(signals_table):
+    index = RecordingIndex.from_table(signals_table)
+    selected = index.take(signals_table, RECORDING_B)
+    assert selected.column("sensor_type").to_pylist() == ["eeg", "ecg", "spo2"]
+
+    df = arrow_to_processed_pandas(signals_table)
+    selected_df = index.take(df, [str(RECORDING_B)])
+    assert selected_df.index.tolist() == [3, 4, 5]
+    assert set(selected_df["recording"]) == {RECORDING_B}
+
+    with pytest.raises(ValueError):
+        index.take(signals_table.slice(1), RECORDING_B)
+
+
+def test_recording_index_save_load(signals_table, tmp_path):
+    index = RecordingIndex.from_table(signals_table)
+    path = tmp_path / "index.npz"
+    index.save(path)
+    loaded = RecordingIndex.load(path)
+    assert loaded.get_recordings() == index.get_recordings()
+    assert loaded.n_rows == index.n_rows
+    np.testing.assert_array_equal(loaded.get_rows(RECORDING_A), [0, 1, 2])
+    assert os.listdir(tmp_path) == ["index.npz"]
+
+
+def test_get_recording_index(signals_table, tmp_path):
+    table_path = tmp_path / "test.onda.signal.arrow"
+    with pa.OSFile(str(table_path), "wb") as sink:
+        with pa.ipc.new_file(sink, signals_table.schema) as writer:
+            writer.write_table(signals_table)
+
+    index = get_recording_index(table_path)
+    index_path = recording_index_path(table_path)
+    assert os.path.exists(index_path)
+    np.testing.assert_array_equal(index.get_rows(RECORDING_B), [3, 4, 5])
+    # the sidecar file is reused while the table is unchanged
+    assert get_recording_index(table_path).get_recordings() == index.get_recordings()
+
+    with pa.OSFile(str(table_path), "wb") as sink:
+        with pa.ipc.new_file(sink, signals_table.schema) as writer:
+            writer.write_table(signals_table.slice(3))
+    rebuilt = get_recording_index(table_path)
+    assert rebuilt.get_recordings() == [RECORDING_B]
+    np.testing.assert_array_equal(rebuilt.get_rows(RECORDING_B), [0, 1, 2])
+
+
+@pytest.fixture
+def annotations_table():
+    spans = [
+        (0, 10),
+        (5, 15),
+        (20, 30),
+        (0, 100),
+        (12, 18),
+        (40, 50),
+        (25, 26),
+    ]
+    recordings = [RECORDING_A] * 5 + [RECORDING_B] * 2
+    return pa.Table.from_pydict(
+        {
+            "recording": encode_julia_uuid_array(recordings),
+            "id": encode_julia_uuid_array([uuid.uuid4() for _ in spans]),
+            "span": [{"start": start, "stop": stop} for start, stop in spans],
+        },
+        schema=ONDA_ANNOTATIONS_SCHEMA,
+    )
+
+
+def test_span_index_queries(annotations_table):
+    index = SpanIndex.from_table(annotations_table)
+    assert len(index) == 7
+    np.testing.assert_array_equal(index.query(RECORDING_A, 8, 13), [0, 1, 3, 4])
+    np.testing.assert_array_equal(index.query(RECORDING_A, 15, 20), [3, 4])
+    np.testing.assert_array_equal(
+        index.query(RECORDING_A, 0, 20, predicate="within"), [0, 1, 4]
+    )
+    np.testing.assert_array_equal(
+        index.query(RECORDING_A, 6, 9, predicate="contains"), [0, 1, 3]
+    )
+    np.testing.assert_array_equal(index.at(RECORDING_A, 10), [1, 3])
+    np.testing.assert_array_equal(index.at(str(RECORDING_B), 25), [6])
+    assert index.query(uuid.uuid4(), 0, 100).size == 0
+    with pytest.raises(ValueError):
+        index.query(RECORDING_A, 0, 10, predicate="intersects")
+
+
+def test_span_index_query_batch(annotations_table):
+    index = SpanIndex.from_table(annotations_table)
+    windows, rows = index.query_batch(RECORDING_A, [8, 15, 200], [13, 20, 300])
+    np.testing.assert_array_equal(windows, [0, 0, 0, 0, 1, 1])
+    np.testing.assert_array_equal(rows, [0, 1, 3, 4, 3, 4])
+
+    df = arrow_to_processed_pandas(annotations_table)
+    df_windows, df_rows = SpanIndex.from_table(df).query_batch(
+        RECORDING_A, [8, 15, 200], [13, 20, 300]
+    )
+    np.testing.assert_array_equal(df_windows, windows)
+    np.testing.assert_array_equal(df_rows, rows)
+
+
+@pytest.mark.parametrize("high", [10**6, 2**62])
+def test_grouped_running_max(high):
+    rng = np.random.default_rng(0)
+    values = rng.integers(-high, high, 1000)
+    offsets = np.array([0, 0, 10, 500, 501, 1000])
+    expected = np.concatenate(
+        [
+            np.maximum.accumulate(values[first:last])
+            for first, last in zip(offsets[:-1], offsets[1:])
+        ]
+    )
+    np.testing.assert_array_equal(_grouped_running_max(values, offsets), expected)
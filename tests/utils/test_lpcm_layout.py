@@ -0,0 +1,101 @@
+import pytest
+import numpy as np
+
+from pyonda.utils.lpcm_layout import (
+    n_samples_from_byte_size,
+    time_range_to_sample_range,
+    resolve_sample_range,
+    plan_lpcm_window,
+    merge_byte_ranges,
+    read_byte_ranges,
+    iter_lpcm_chunks,
+    lpcm_window_from_flat_array,
+)
+
+
+def test_n_samples_from_byte_size():
+    assert n_samples_from_byte_size(24, np.int16, 3) == 4
+    with pytest.raises(ValueError):
+        n_samples_from_byte_size(23, np.int16, 3)
+    with pytest.raises(ValueError):
+        n_samples_from_byte_size(24, np.int16, 5)
+
+
+def test_time_range_to_sample_range():
+    assert time_range_to_sample_range((0, int(1e9)), 256) == (0, 256)
+    assert time_range_to_sample_range((int(0.5e9), int(1.01e9)), 10) == (5, 11)
+    with pytest.raises(ValueError):
+        time_range_to_sample_range((int(2e9), int(1e9)), 10)
+
+
+def test_resolve_sample_range():
+    assert resolve_sample_range() is None
+    assert resolve_sample_range((1, 2)) == (1, 2)
+    assert resolve_sample_range(time_range=(0, int(1e9)), sample_rate=4) == (0, 4)
+    with pytest.raises(ValueError):
+        resolve_sample_range((1, 2), time_range=(0, int(1e9)), sample_rate=4)
+    with pytest.raises(ValueError):
+        resolve_sample_range(time_range=(0, int(1e9)))
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+@pytest.mark.parametrize("channels", [None, [2], [0, 2], [2, 0, 0]])
+def test_plan_lpcm_window(order, channels):
+    data = np.arange(3 * 10, dtype=np.int32).reshape(3, 10)
+    file_bytes = data.tobytes(order=order)
+
+    plan = plan_lpcm_window(10, np.int32, 3, (2, 7), channels, order)
+    flat = np.frombuffer(
+        b"".join(file_bytes[offset : offset + n] for offset, n in plan.byte_ranges),
+        dtype=np.int32,
+    )
+    expected = data[:, 2:7] if channels is None else data[channels, 2:7]
+    assert np.array_equal(lpcm_window_from_flat_array(plan, flat), expected)
+
+
+def test_merge_byte_ranges():
+    assert merge_byte_ranges([(0, 10), (10, 5), (20, 5), (25, 0)]) == [
+        (0, 15),
+        (20, 5),
+    ]
+    assert merge_byte_ranges([(0, 10), (10, 5), (20, 5)], max_gap=5) == [(0, 25)]
+
+
+@pytest.mark.parametrize("max_gap, n_reads", [(0, 3), (5, 1)])
+def test_read_byte_ranges(max_gap, n_reads):
+    content = bytes(range(100))
+    reads = []
+
+    def read_range(offset, length):
+        reads.append((offset, length))
+        return content[offset : offset + length]
+
+    output = np.empty(12, dtype=np.uint8)
+    read_byte_ranges([(0, 4), (6, 4), (12, 4)], read_range, output, max_gap)
+    assert len(reads) == n_reads
+    assert output.tobytes() == content[0:4] + content[6:10] + content[12:16]
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+@pytest.mark.parametrize("chunk_values", [1, 7, 100, 1000])
+@pytest.mark.parametrize(
+    "array",
+    [
+        np.arange(60, dtype=np.int16).reshape(3, 20),
+        np.asfortranarray(np.arange(60, dtype=np.int16).reshape(3, 20)),
+        np.arange(120, dtype=np.int16).reshape(3, 40)[:, ::2],
+        np.arange(0, dtype=np.int16).reshape(3, 0),
+    ],
+)
+def test_iter_lpcm_chunks(array, order, chunk_values):
+    chunks = list(iter_lpcm_chunks(array, order, chunk_values))
+    assert all(chunk.size == chunk_values for chunk in chunks[:-1])
+    assert all(chunk.flags.c_contiguous for chunk in chunks)
+    content = b"".join(chunk.tobytes() for chunk in chunks)
+    assert content == array.tobytes(order=order)
+
+
+@pytest.mark.parametrize("chunk_values", [0, -1])
+def test_iter_lpcm_chunks_bad_chunk_values(chunk_values):
+    with pytest.raises(ValueError):
+        next(iter_lpcm_chunks(np.zeros((3, 20)), "C", chunk_values))
@@ -1,11 +1,23 @@
+import uuid
 import pytest
+import pyonda.utils.processing
+import numpy as np
+import pandas as pd
 import pyarrow as pa
 from pyonda.utils.processing import (
     arrow_to_processed_pandas,
+    decode_julia_uuid_array,
+    encode_julia_uuid_array,
+    get_processing_plan,
+    julia_uuid_array_to_uint8,
+    list_column_lengths,
+    timespan_array_to_start_stop,
+    uuid_value_to_bytes,
     convert_julia_uuid_bytestring_to_uuid,
     convert_python_uuid_to_uuid_bytestring,
     check_if_schema_field_has_unsupported_binary_data,
 )
+from pyonda.utils.schemas import julia_uuid_field
 from tests.utils import assert_signal_arrow_dataframes_equal
 from tests.fixtures import signal_arrow_table_path
 
@@ -14,6 +26,8 @@ def test_convert_julia_uuid():
     assert (
         convert_julia_uuid_bytestring_to_uuid(None) is None
     ), "None input should return a None output"
+    value = uuid.uuid4()
+    assert convert_julia_uuid_bytestring_to_uuid(value) is value
     # TODO how to test this
 
 
@@ -149,3 +163,277 @@ def test_arrow_to_processed_pandas(signal_arrow_table_path):
     ).read_all()
     df_processed = arrow_to_processed_pandas(table)
     assert_signal_arrow_dataframes_equal(df_processed)
+
+
+def test_decode_julia_uuid_array():
+    uuids = [uuid.uuid4() for _ in range(10)]
+    julia_bytes = [convert_python_uuid_to_uuid_bytestring(u) for u in uuids]
+    julia_bytes[3] = None
+    uuids[3] = None
+    array = pa.array(julia_bytes, pa.binary(16))
+
+    assert list(decode_julia_uuid_array(array)) == uuids
+    assert list(decode_julia_uuid_array(array, uuid_format="str")) == [
+        None if u is None else str(u) for u in uuids
+    ]
+    assert list(decode_julia_uuid_array(array, uuid_format="bytes")) == [
+        None if u is None else u.bytes for u in uuids
+    ]
+    # the values are the same as with the row by row conversion
+    assert list(decode_julia_uuid_array(array)) == [
+        convert_julia_uuid_bytestring_to_uuid(x) for x in julia_bytes
+    ]
+
+    # sliced and chunked arrays
+    assert list(decode_julia_uuid_array(array.slice(2, 5))) == uuids[2:7]
+    chunked_array = pa.chunked_array([array.slice(0, 4), array.slice(4)])
+    assert list(decode_julia_uuid_array(chunked_array)) == uuids
+    empty_array = pa.chunked_array([], pa.binary(16))
+    assert len(decode_julia_uuid_array(empty_array)) == 0
+
+    # values ending with null bytes are kept whole
+    zero_uuid = uuid.UUID(int=0)
+    array = pa.array([bytes(16)], pa.binary(16))
+    assert decode_julia_uuid_array(array, uuid_format="bytes")[0] == bytes(16)
+    assert decode_julia_uuid_array(array)[0] == zero_uuid
+
+    with pytest.raises(ValueError):
+        decode_julia_uuid_array(array, uuid_format="hex")
+
+
+def test_arrow_to_processed_pandas_uuid_format(signal_arrow_table_path):
+    table = pa.ipc.open_file(
+        pa.memory_map(str(signal_arrow_table_path), "r")
+    ).read_all()
+    df_uuid = arrow_to_processed_pandas(table)
+    df_str = arrow_to_processed_pandas(table, uuid_format="str")
+    df_bytes = arrow_to_processed_pandas(table, uuid_format="bytes")
+
+    assert list(df_str.columns) == table.column_names
+    assert list(df_str["recording"]) == [str(u) for u in df_uuid["recording"]]
+    assert list(df_bytes["recording"]) == [u.bytes for u in df_uuid["recording"]]
+    assert np.all(df_str["file_path"] == df_uuid["file_path"])
+
+
+def test_encode_julia_uuid_array():
+    uuids = [uuid.uuid4() for _ in range(10)]
+    expected = [convert_python_uuid_to_uuid_bytestring(u) for u in uuids]
+
+    array = encode_julia_uuid_array(uuids)
+    assert array.type == pa.binary(16)
+    assert array.to_pylist() == expected
+    assert list(decode_julia_uuid_array(array)) == uuids
+
+    # hex strings
+    assert encode_julia_uuid_array([str(u) for u in uuids]).to_pylist() == expected
+    assert (
+        encode_julia_uuid_array([u.hex.upper() for u in uuids]).to_pylist() == expected
+    )
+    assert (
+        encode_julia_uuid_array(["{" + str(u) + "}" for u in uuids]).to_pylist()
+        == expected
+    )
+
+    # numpy arrays of big-endian bytes
+    uuid_bytes = np.frombuffer(b"".join(u.bytes for u in uuids), dtype=np.uint8)
+    assert encode_julia_uuid_array(uuid_bytes.reshape(-1, 16)).to_pylist() == expected
+    assert encode_julia_uuid_array(uuid_bytes.view("V16")).to_pylist() == expected
+
+    # null values and mixed types
+    values = [uuids[0], None, str(uuids[2]), uuids[3].bytes]
+    assert encode_julia_uuid_array(values).to_pylist() == [
+        expected[0],
+        None,
+        expected[2],
+        expected[3],
+    ]
+
+    assert len(encode_julia_uuid_array([])) == 0
+
+    # invalid lengths summing up to a valid total length
+    hex_str = [u.hex for u in uuids[:2]]
+    misaligned = [hex_str[0][:-1], hex_str[0][-1] + hex_str[1]]
+    canonical = [str(u) for u in uuids[:2]]
+    misaligned_canonical = [canonical[0][:-1], canonical[0][-1] + canonical[1]]
+    for bad_values in [
+        ["not a uuid"],
+        [12],
+        np.zeros((2, 8), dtype=np.uint8),
+        misaligned,
+        misaligned_canonical,
+    ]:
+        with pytest.raises(ValueError):
+            encode_julia_uuid_array(bad_values)
+
+
+def test_encode_julia_uuid_array_table():
+    uuids = [uuid.uuid4() for _ in range(5)]
+    schema = pa.schema([julia_uuid_field("id"), pa.field("value", pa.int64())])
+    table = pa.Table.from_pydict(
+        {"id": encode_julia_uuid_array(uuids), "value": range(5)}, schema=schema
+    )
+    df = arrow_to_processed_pandas(table)
+    assert list(df["id"]) == uuids
+
+
+def test_timespan_array_to_start_stop():
+    storage_type = pa.struct(
+        [("start", pa.duration("ms")), ("stop", pa.duration("ms"))]
+    )
+    array = pa.array(
+        [
+            {"start": 0, "stop": 1},
+            None,
+            {"start": 2, "stop": 5},
+            {"start": 5, "stop": 9},
+        ],
+        storage_type,
+    )
+    start, stop = timespan_array_to_start_stop(array)
+    assert start.type == pa.int64()
+    assert start.to_pylist() == [0, None, 2 * 10**6, 5 * 10**6]
+    assert stop.to_pylist() == [10**6, None, 5 * 10**6, 9 * 10**6]
+
+    start, stop = timespan_array_to_start_stop(pa.chunked_array([array.slice(2)]))
+    assert start.to_pylist() == [2 * 10**6, 5 * 10**6]
+    assert stop.to_pylist() == [5 * 10**6, 9 * 10**6]
+
+
+def test_arrow_to_processed_pandas_span_format(signal_arrow_table_path):
+    table = pa.ipc.open_file(
+        pa.memory_map(str(signal_arrow_table_path), "r")
+    ).read_all()
+    df_dict = arrow_to_processed_pandas(table)
+    expected_start = [int(span["start"]) for span in df_dict["span"]]
+    expected_stop = [int(span["stop"]) for span in df_dict["span"]]
+
+    df_columns = arrow_to_processed_pandas(table, span_format="columns")
+    position = table.column_names.index("span")
+    assert list(df_columns.columns) == (
+        table.column_names[:position]
+        + ["span_start", "span_stop"]
+        + table.column_names[position + 1 :]
+    )
+    assert df_columns["span_start"].dtype == np.int64
+    assert list(df_columns["span_start"]) == expected_start
+    assert list(df_columns["span_stop"]) == expected_stop
+
+    df_interval = arrow_to_processed_pandas(table, span_format="interval")
+    assert list(df_interval.columns) == table.column_names
+    assert isinstance(df_interval["span"].dtype, pd.IntervalDtype)
+    assert list(df_interval["span"].array.left) == expected_start
+    assert list(df_interval["span"].array.right) == expected_stop
+    assert df_interval["span"].array.closed == "left"
+
+    df_arrow = arrow_to_processed_pandas(table, span_format="arrow")
+    assert isinstance(df_arrow["span"].dtype, pd.ArrowDtype)
+    assert pa.array(df_arrow["span"].array).equals(
+        table.column("span").combine_chunks().storage
+    )
+
+    with pytest.raises(ValueError):
+        arrow_to_processed_pandas(table, span_format="tuple")
+
+
+def test_arrow_to_processed_pandas_arrow_backed(signal_arrow_table_path):
+    table = pa.ipc.open_file(
+        pa.memory_map(str(signal_arrow_table_path), "r")
+    ).read_all()
+    df = arrow_to_processed_pandas(table)
+    df_arrow = arrow_to_processed_pandas(table, arrow_backed=True)
+
+    assert list(df_arrow.columns) == list(df.columns)
+    for column in ["channels", "file_path", "sample_rate"]:
+        assert isinstance(df_arrow[column].dtype, pd.ArrowDtype)
+        assert df_arrow[column].tolist() == df[column].tolist()
+    assert (
+        df_arrow["channels"].dtype.pyarrow_dtype == table.schema.field("channels").type
+    )
+    # UUIDs and spans are still converted
+    assert df_arrow["recording"].tolist() == df["recording"].tolist()
+    assert df_arrow["span"].tolist() == df["span"].tolist()
+
+
+def test_list_column_lengths(signal_arrow_table_path):
+    table = pa.ipc.open_file(
+        pa.memory_map(str(signal_arrow_table_path), "r")
+    ).read_all()
+    expected = [len(channels) for channels in table.column("channels").to_pylist()]
+
+    for column in [
+        table.column("channels"),
+        arrow_to_processed_pandas(table)["channels"],
+        arrow_to_processed_pandas(table, arrow_backed=True)["channels"],
+    ]:
+        lengths = list_column_lengths(column)
+        assert lengths.dtype == np.int64
+        assert lengths.tolist() == expected
+
+    assert list_column_lengths(pa.array([["a"], None, []])).tolist() == [1, 0, 0]
+
+
+def test_get_processing_plan(signal_arrow_table_path, monkeypatch):
+    table = pa.ipc.open_file(
+        pa.memory_map(str(signal_arrow_table_path), "r")
+    ).read_all()
+    plan = get_processing_plan(table.schema)
+    assert plan.uuid_columns == {"recording"}
+    assert plan.timespan_columns == {"span"}
+    assert plan.list_columns == {"channels"}
+
+    # the plan is computed once per schema
+    n_checks = []
+    monkeypatch.setattr(
+        pyonda.utils.processing,
+        "check_if_schema_field_has_unsupported_binary_data",
+        lambda field: n_checks.append(field.name),
+    )
+    assert get_processing_plan(table.slice(2).schema) is plan
+    arrow_to_processed_pandas(table)
+    assert n_checks == []
+
+    # field metadata is part of the cache key
+    schema = pa.schema([pa.field("id", pa.binary(16))])
+    assert get_processing_plan(schema).uuid_columns == set()
+    assert n_checks == ["id"]
+    schema = pa.schema(
+        [
+            pa.field(
+                "id",
+                pa.binary(16),
+                metadata={b"ARROW:extension:name": b"JuliaLang.UUID"},
+            )
+        ]
+    )
+    assert get_processing_plan(schema).uuid_columns == {"id"}
+
+
+def test_get_processing_plan_unsupported_binary_data():
+    schema = pa.schema([pa.field("weird_binary", pa.binary(16))])
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            get_processing_plan(schema)
+
+
+def test_julia_uuid_array_to_uint8():
+    values = [uuid.uuid4(), None, uuid.uuid4()]
+    storage = encode_julia_uuid_array(values)
+    expected = np.array(
+        [list(values[0].bytes), [0] * 16, list(values[2].bytes)], dtype=np.uint8
+    )
+    np.testing.assert_array_equal(julia_uuid_array_to_uint8(storage), expected)
+    chunked = pa.chunked_array([storage[:1], storage[1:]])
+    np.testing.assert_array_equal(julia_uuid_array_to_uint8(chunked), expected)
+    assert julia_uuid_array_to_uint8(pa.chunked_array([], pa.binary(16))).shape == (
+        0,
+        16,
+    )
+
+
+def test_uuid_value_to_bytes():
+    value = uuid.uuid4()
+    for representation in [value, str(value), value.hex, value.bytes]:
+        assert uuid_value_to_bytes(representation) == value.bytes
+    for bad_value in ["not a uuid", b"short", 12]:
+        with pytest.raises(ValueError):
+            uuid_value_to_bytes(bad_value)
@@ -0,0 +1,170 @@
+import io
+import os
+import time
+import pytest
+import numpy as np
+
+from pyonda.load_arrow import load_table_from_arrow_file_in_s3
+from pyonda.load_lpcm import (
+    load_array_from_lpcm_file_in_s3,
+    load_array_from_lpcm_zst_file_in_s3,
+)
+from pyonda.utils.s3_cache import (
+    enable_s3_cache,
+    disable_s3_cache,
+    get_s3_cache,
+    MemoryMappedStream,
+    STALE_TEMP_FILE_SECONDS,
+)
+from pyonda.utils.s3_download import download_s3_fileobj, download_s3_file
+from tests.utils import assert_signal_arrow_dataframes_equal
+
+from tests.fixtures import (
+    aws_credentials,
+    signal_arrow_table_path,
+    lpcm_file_path,
+    lpcm_zst_file_path,
+    s3,
+    signal_arrow_table_s3_url,
+    lpcm_file_s3_url,
+    lpcm_zst_file_s3_url,
+    expected_eeg_data,
+    expected_ecg_data,
+)
+
+
+@pytest.fixture
+def s3_cache(tmpdir):
+    cache = enable_s3_cache(tmpdir / "cache", max_bytes=10**7)
+    yield cache
+    disable_s3_cache()
+
+
+def test_enable_s3_cache(s3_cache):
+    assert get_s3_cache() is s3_cache
+    disable_s3_cache()
+    assert get_s3_cache() is None
+
+
+def test_s3_cache_hit(s3, s3_cache, lpcm_file_s3_url, lpcm_file_path):
+    with open(lpcm_file_path, "rb") as fh:
+        reference = fh.read()
+
+    buf = download_s3_fileobj(lpcm_file_s3_url)
+    assert isinstance(buf, MemoryMappedStream)
+    assert buf.read() == reference
+    assert s3_cache.stats()["misses"] == 1
+
+    buf = download_s3_fileobj(lpcm_file_s3_url)
+    assert bytes(buf.getbuffer()) == reference
+    buf.seek(10)
+    assert buf.read(5) == reference[10:15]
+    assert s3_cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+        "size": len(reference),
+    }
+
+
+def test_s3_cache_is_validated_with_etag(s3, s3_cache):
+    s3.put_object(Bucket="mock-bucket", Key="object", Body=b"first content")
+    assert download_s3_fileobj("s3://mock-bucket/object").read() == b"first content"
+    s3.put_object(Bucket="mock-bucket", Key="object", Body=b"second content")
+    assert download_s3_fileobj("s3://mock-bucket/object").read() == b"second content"
+
+    stats = s3_cache.stats()
+    assert stats["misses"] == 2
+    assert stats["size"] == len(b"second content")
+
+
+def test_s3_cache_eviction(s3, tmpdir):
+    cache = enable_s3_cache(tmpdir / "cache", max_bytes=25)
+    try:
+        for key in ["a", "b", "c"]:
+            s3.put_object(Bucket="mock-bucket", Key=key, Body=key.encode() * 10)
+        for key in ["a", "b", "a", "c"]:
+            download_s3_fileobj(f"s3://mock-bucket/{key}")
+        # b is the least recently used object when c is cached
+        assert cache.stats() == {"hits": 1, "misses": 3, "evictions": 1, "size": 20}
+        download_s3_fileobj("s3://mock-bucket/a")
+        assert cache.stats()["hits"] == 2
+        download_s3_fileobj("s3://mock-bucket/b")
+        assert cache.stats()["misses"] == 4
+
+        # objects larger than the cache are downloaded without being cached
+        s3.put_object(Bucket="mock-bucket", Key="large", Body=b"x" * 30)
+        buf = download_s3_fileobj("s3://mock-bucket/large")
+        assert isinstance(buf, io.BytesIO)
+        assert buf.read() == b"x" * 30
+        assert cache.stats()["size"] == 20
+    finally:
+        disable_s3_cache()
+
+
+def test_s3_cache_download_s3_file(s3, s3_cache, lpcm_file_s3_url, tmpdir):
+    for _ in range(2):
+        output_file_path = os.path.join(tmpdir, "downloaded.lpcm")
+        download_s3_file(lpcm_file_s3_url, output_file_path)
+    assert s3_cache.stats()["hits"] == 1
+
+
+def test_s3_cache_loaders(
+    s3,
+    s3_cache,
+    signal_arrow_table_s3_url,
+    lpcm_file_s3_url,
+    lpcm_zst_file_s3_url,
+    expected_eeg_data,
+    expected_ecg_data,
+):
+    for _ in range(2):
+        df = load_table_from_arrow_file_in_s3(signal_arrow_table_s3_url)
+        assert_signal_arrow_dataframes_equal(df)
+        data = load_array_from_lpcm_file_in_s3(
+            lpcm_file_s3_url, expected_eeg_data.dtype, expected_eeg_data.shape[0]
+        )
+        assert np.array_equal(data, expected_eeg_data)
+        data = load_array_from_lpcm_zst_file_in_s3(
+            lpcm_zst_file_s3_url, expected_ecg_data.dtype, expected_ecg_data.shape[0]
+        )
+        assert np.array_equal(data, expected_ecg_data)
+    assert s3_cache.stats()["hits"] == 3
+
+
+def test_s3_cache_object_evicted_before_opening(
+    s3, s3_cache, lpcm_file_s3_url, lpcm_file_path, monkeypatch
+):
+    with open(lpcm_file_path, "rb") as fh:
+        reference = fh.read()
+    download_s3_fileobj(lpcm_file_s3_url)
+
+    get_path = s3_cache.get_path
+    evicted = []
+
+    def get_path_evicted_by_another_process(*args, **kwargs):
+        path = get_path(*args, **kwargs)
+        if not evicted:
+            os.remove(path)
+            evicted.append(path)
+        return path
+
+    monkeypatch.setattr(s3_cache, "get_path", get_path_evicted_by_another_process)
+    buf = download_s3_fileobj(lpcm_file_s3_url)
+    assert buf.read() == reference
+    assert s3_cache.stats()["hits"] == 0
+    assert s3_cache.stats()["misses"] == 2
+
+
+def test_s3_cache_removes_stale_temp_files(s3, s3_cache):
+    stale_path = os.path.join(s3_cache.directory, "crashed.tmp")
+    recent_path = os.path.join(s3_cache.directory, "in-progress.tmp")
+    for path in [stale_path, recent_path]:
+        with open(path, "wb") as fh:
+            fh.write(b"partial")
+    stale_time = time.time() - 2 * STALE_TEMP_FILE_SECONDS
+    os.utime(stale_path, (stale_time, stale_time))
+
+    s3_cache.evict()
+    assert not os.path.exists(stale_path)
+    assert os.path.exists(recent_path)
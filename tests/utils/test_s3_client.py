@@ -0,0 +1,52 @@
+import os
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from pyonda.utils.s3_client import (
+    get_s3_client,
+    configure_s3_client,
+    reset_s3_client,
+    DEFAULT_S3_CLIENT_CONFIG,
+)
+
+from tests.fixtures import aws_credentials
+
+
+@pytest.fixture
+def shared_client_reset(aws_credentials):
+    reset_s3_client()
+    yield
+    configure_s3_client(**DEFAULT_S3_CLIENT_CONFIG)
+
+
+def test_get_s3_client_is_shared(shared_client_reset):
+    client = get_s3_client()
+    assert get_s3_client() is client
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        clients = list(executor.map(lambda _: get_s3_client(), range(8)))
+    assert all(c is client for c in clients)
+
+    reset_s3_client()
+    assert get_s3_client() is not client
+
+
+def test_get_s3_client_after_fork(shared_client_reset, monkeypatch):
+    client = get_s3_client()
+    pid = os.getpid()
+    monkeypatch.setattr(os, "getpid", lambda: pid + 1)
+    child_client = get_s3_client()
+    assert child_client is not client
+    assert get_s3_client() is child_client
+
+
+def test_configure_s3_client(shared_client_reset):
+    client = get_s3_client()
+    configure_s3_client(max_pool_connections=3, read_timeout=5)
+    configured_client = get_s3_client()
+    assert configured_client is not client
+    assert configured_client.meta.config.max_pool_connections == 3
+    assert configured_client.meta.config.read_timeout == 5
+
+    with pytest.raises(TypeError):
+        configure_s3_client(unknown_option=1)
@@ -8,6 +8,8 @@ from pyonda.utils.s3_download import (
     path_is_an_s3_url,
     download_s3_file,
     download_s3_fileobj,
+    get_s3_object_size,
+    download_s3_byte_range,
 )
 
 from tests.fixtures import (
@@ -68,3 +70,16 @@ def test_download_s3_fileobj(s3, signal_arrow_table_s3_url, signal_arrow_table_p
     downloaded_table = pa.ipc.open_file(buf).read_all()
 
     assert downloaded_table == reference_table, "Loaded arrow table is not as expected"
+
+
+def test_get_s3_object_size(s3, signal_arrow_table_s3_url, signal_arrow_table_path):
+    size = get_s3_object_size(signal_arrow_table_s3_url)
+    assert size == os.path.getsize(signal_arrow_table_path)
+
+
+def test_download_s3_byte_range(s3, signal_arrow_table_s3_url, signal_arrow_table_path):
+    with open(signal_arrow_table_path, "rb") as fh:
+        reference = fh.read()
+    content = download_s3_byte_range(signal_arrow_table_s3_url, 10, 100)
+    assert content == reference[10:110]
+    assert download_s3_byte_range(signal_arrow_table_s3_url, 10, 0) == b""
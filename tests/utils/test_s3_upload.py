@@ -1,9 +1,14 @@
 import os
+import pytest
 import shutil
 import pyarrow as pa
 import boto3
 
-from pyonda.utils.s3_upload import upload_file_to_s3
+from pyonda.utils.s3_upload import (
+    upload_file_to_s3,
+    S3UploadStream,
+    MIN_PART_SIZE,
+)
 
 from tests.fixtures import (
     aws_credentials,
@@ -34,3 +39,45 @@ def test_upload_s3_file(s3, signal_arrow_table_s3_url, signal_arrow_table_path,
     assert downloaded_table == reference_table, "Loaded arrow table is not as expected"
 
     shutil.rmtree(tmpdir)
+
+
+def test_s3_upload_stream_single_request(s3):
+    with S3UploadStream("mock-bucket", "small-object") as stream:
+        stream.write(b"some ")
+        stream.write(b"content")
+        assert stream.tell() == 12
+
+    response = s3.get_object(Bucket="mock-bucket", Key="small-object")
+    assert response["Body"].read() == b"some content"
+
+
+def test_s3_upload_stream_multipart(s3):
+    content = os.urandom(2 * MIN_PART_SIZE + 1000)
+    with S3UploadStream(
+        "mock-bucket", "large-object", part_size=MIN_PART_SIZE, max_concurrency=2
+    ) as stream:
+        for start in range(0, len(content), 10**6):
+            stream.write(content[start : start + 10**6])
+
+    response = s3.get_object(Bucket="mock-bucket", Key="large-object")
+    assert response["Body"].read() == content
+    assert response["ETag"].endswith('-3"')
+
+
+def test_s3_upload_stream_is_aborted_on_error(s3):
+    with pytest.raises(RuntimeError):
+        with S3UploadStream(
+            "mock-bucket", "aborted-object", part_size=MIN_PART_SIZE
+        ) as stream:
+            stream.write(os.urandom(MIN_PART_SIZE + 1))
+            raise RuntimeError("Failure while writing")
+
+    assert "Contents" not in s3.list_objects_v2(
+        Bucket="mock-bucket", Prefix="aborted-object"
+    )
+    assert "Uploads" not in s3.list_multipart_uploads(Bucket="mock-bucket")
+
+
+def test_s3_upload_stream_part_size_too_small(s3):
+    with pytest.raises(ValueError):
+        S3UploadStream("mock-bucket", "key", part_size=MIN_PART_SIZE - 1)
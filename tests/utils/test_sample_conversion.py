@@ -0,0 +1,97 @@
+import pytest
+import numpy as np
+
+from pyonda.utils.lpcm_layout import iter_lpcm_chunks
+from pyonda.utils.sample_conversion import (
+    SampleEncoding,
+    decode_samples,
+    encode_samples,
+    iter_encoded_lpcm_chunks,
+)
+
+
+@pytest.fixture
+def encoded_samples():
+    rng = np.random.default_rng(0)
+    return rng.integers(-(2**15), 2**15, size=(3, 1001), dtype=np.int16)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_decode_samples(encoded_samples, dtype, max_workers):
+    expected = 0.25 * encoded_samples.astype(np.float64) - 3.0
+    decoded = decode_samples(
+        encoded_samples,
+        0.25,
+        -3.0,
+        dtype=dtype,
+        chunk_values=100,
+        max_workers=max_workers,
+    )
+    assert decoded.dtype == dtype
+    np.testing.assert_allclose(decoded, expected, rtol=1e-6)
+
+
+def test_decode_samples_layouts(encoded_samples):
+    expected = decode_samples(encoded_samples, 0.5, 1.0)
+    f_order = np.asfortranarray(encoded_samples)
+    np.testing.assert_array_equal(
+        decode_samples(f_order, 0.5, 1.0, chunk_values=7), expected
+    )
+    np.testing.assert_array_equal(
+        decode_samples(encoded_samples[0], 0.5, 1.0, chunk_values=7), expected[0]
+    )
+    np.testing.assert_array_equal(
+        decode_samples(encoded_samples, 1.0, 0.0), encoded_samples
+    )
+
+
+def test_decode_samples_out(encoded_samples):
+    out = np.empty(encoded_samples.shape, dtype=np.float32)
+    decoded = decode_samples(encoded_samples, 2.0, 0.0, out=out, chunk_values=64)
+    assert decoded is out
+    np.testing.assert_array_equal(out, 2.0 * encoded_samples)
+
+    with pytest.raises(ValueError):
+        decode_samples(encoded_samples, 2.0, 0.0, out=out[:, 1:])
+    with pytest.raises(ValueError):
+        decode_samples(encoded_samples, 2.0, 0.0, out=out.astype(np.int32))
+    with pytest.raises(ValueError):
+        decode_samples(encoded_samples, 2.0, 0.0, dtype=np.int32)
+
+
+def test_encode_samples_rounding_and_saturation():
+    data = np.array([[0.5, 1.5, 2.5, -0.5, 1e9, -1e9, 3.2, np.inf]])
+    encoded = encode_samples(data, 1.0, 0.0, np.int16, chunk_values=3)
+    np.testing.assert_array_equal(encoded, [[0, 2, 2, 0, 32767, -32768, 3, 32767]])
+    encoded = encode_samples(np.array([1e30, -1e30]), 1.0, 0.0, np.int64)
+    np.testing.assert_array_equal(
+        encoded, [np.iinfo(np.int64).max - 1023, np.iinfo(np.int64).min]
+    )
+    with pytest.raises(ValueError):
+        encode_samples(np.array([0.0, np.nan]), 1.0, 0.0, np.int32)
+
+
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_encode_samples_round_trip(encoded_samples, max_workers):
+    decoded = decode_samples(encoded_samples, 0.25, -3.0)
+    encoded = encode_samples(
+        decoded, 0.25, -3.0, np.int16, chunk_values=100, max_workers=max_workers
+    )
+    np.testing.assert_array_equal(encoded, encoded_samples)
+
+    out = np.empty(encoded_samples.shape, dtype=np.int32)
+    assert encode_samples(decoded, 0.25, -3.0, None, out=out) is out
+    np.testing.assert_array_equal(out, encoded_samples)
+    with pytest.raises(ValueError):
+        encode_samples(decoded, 0.25, -3.0, np.bool_)
+
+
+@pytest.mark.parametrize("order", ["C", "F"])
+def test_iter_encoded_lpcm_chunks(encoded_samples, order):
+    decoded = decode_samples(encoded_samples, 0.5, 1.0)
+    encoding = SampleEncoding(np.int16, 0.5, 1.0)
+    chunks = list(iter_encoded_lpcm_chunks(decoded, encoding, order, 256))
+    assert all(chunk.dtype == np.int16 and chunk.size <= 256 for chunk in chunks)
+    expected = np.concatenate(list(iter_lpcm_chunks(encoded_samples, order)))
+    np.testing.assert_array_equal(np.concatenate(chunks), expected)
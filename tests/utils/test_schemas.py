@@ -1,10 +1,15 @@
+import uuid
 import pyarrow as pa
 import pytest
+from pyonda.utils.extension_types import JuliaUUIDType, JuliaTimeSpanType
 from pyonda.utils.schemas import (
     ONDA_ANNOTATIONS_SCHEMA,
     ONDA_SIGNALS_SCHEMA,
+    julia_uuid_field,
+    table_from_storage_arrays,
     timespan_namedtuple,
 )
+from pyonda.utils.processing import encode_julia_uuid_array
 
 
 def test_timespan_namedtuple():
@@ -39,23 +44,14 @@ def test_timespan_namedtuple_bad_types():
 def test_onda_annotations_schema():
     assert ONDA_ANNOTATIONS_SCHEMA == pa.schema(
         [
-            pa.field(
-                "recording",
-                pa.binary(16),
-                nullable=False,
-                metadata={"ARROW:extension:name": "JuliaLang.UUID"},
-            ),
-            pa.field(
-                "id",
-                pa.binary(16),
-                nullable=False,
-                metadata={"ARROW:extension:name": "JuliaLang.UUID"},
-            ),
+            pa.field("recording", JuliaUUIDType(), nullable=False),
+            pa.field("id", JuliaUUIDType(), nullable=False),
             pa.field(
                 "span",
-                pa.struct([("start", pa.int64()), ("stop", pa.int64())]),
+                JuliaTimeSpanType(
+                    pa.struct([("start", pa.int64()), ("stop", pa.int64())])
+                ),
                 nullable=False,
-                metadata={"ARROW:extension:name": "JuliaLang.TimeSpan"},
             ),
         ]
     )
@@ -64,25 +60,16 @@ def test_onda_annotations_schema():
 def test_onda_signals_schema():
     assert ONDA_SIGNALS_SCHEMA == pa.schema(
         [
-            pa.field(
-                "recording",
-                pa.binary(16),
-                nullable=False,
-                metadata={"ARROW:extension:name": "JuliaLang.UUID"},
-            ),
-            pa.field(
-                "id",
-                pa.binary(16),
-                nullable=False,
-                metadata={"ARROW:extension:name": "JuliaLang.UUID"},
-            ),
+            pa.field("recording", JuliaUUIDType(), nullable=False),
+            pa.field("id", JuliaUUIDType(), nullable=False),
             pa.field("file_path", pa.string(), nullable=False),
             pa.field("file_format", pa.string(), nullable=False),
             pa.field(
                 "span",
-                pa.struct([("start", pa.int64()), ("stop", pa.int64())]),
+                JuliaTimeSpanType(
+                    pa.struct([("start", pa.int64()), ("stop", pa.int64())])
+                ),
                 nullable=False,
-                metadata={"ARROW:extension:name": "JuliaLang.TimeSpan"},
             ),
             pa.field("sensor_type", pa.string(), nullable=False),
             pa.field("sensor_label", pa.string(), nullable=False),
@@ -94,3 +81,54 @@ def test_onda_signals_schema():
             pa.field("sample_rate", pa.float64(), nullable=False),
         ]
     )
+
+
+def test_julia_uuid_field():
+    assert julia_uuid_field("recording") == ONDA_ANNOTATIONS_SCHEMA.field("recording")
+    field = julia_uuid_field("id", nullable=True)
+    assert field.nullable
+    assert field.type == JuliaUUIDType()
+    assert field.type.storage_type == pa.binary(16)
+
+
+def test_table_from_storage_arrays():
+    uuids = encode_julia_uuid_array([uuid.uuid4() for _ in range(2)])
+    spans = pa.array(
+        [{"start": 0, "stop": 10**9}, {"start": 10**9, "stop": 2 * 10**9}],
+        type=pa.struct([("start", pa.int64()), ("stop", pa.int64())]),
+    )
+    with pytest.raises(pa.ArrowInvalid):
+        pa.Table.from_arrays([uuids, uuids, spans], schema=ONDA_ANNOTATIONS_SCHEMA)
+
+    table = table_from_storage_arrays([uuids, uuids, spans], ONDA_ANNOTATIONS_SCHEMA)
+    assert table.schema == ONDA_ANNOTATIONS_SCHEMA
+    assert table.column("id").chunk(0).storage.equals(uuids)
+    assert table.column("span").chunk(0).storage.equals(spans)
+    by_name = table_from_storage_arrays(
+        {"span": pa.chunked_array([spans]), "id": uuids, "recording": uuids},
+        ONDA_ANNOTATIONS_SCHEMA,
+    )
+    assert by_name.equals(table)
+    assert table_from_storage_arrays(table, ONDA_ANNOTATIONS_SCHEMA).equals(table)
+
+    columns = {
+        "recording": uuids[:1],
+        "id": uuids[1:],
+        "file_path": ["test.lpcm"],
+        "file_format": ["lpcm"],
+        "span": pa.array(
+            [{"start": 0, "stop": 10**9}],
+            type=pa.struct([("start", pa.duration("ns")), ("stop", pa.duration("ns"))]),
+        ),
+        "sensor_type": ["eeg"],
+        "sensor_label": ["eeg"],
+        "channels": [["c3", "c4"]],
+        "sample_unit": ["microvolt"],
+        "sample_resolution_in_unit": [0.25],
+        "sample_offset_in_unit": [0.0],
+        "sample_type": ["int16"],
+        "sample_rate": [256.0],
+    }
+    table = table_from_storage_arrays(columns, ONDA_SIGNALS_SCHEMA)
+    assert table.schema == ONDA_SIGNALS_SCHEMA
+    assert table.column("span").to_pylist() == [{"start": 0, "stop": 10**9}]
@@ -0,0 +1,94 @@
+import io
+import pytest
+import numpy as np
+import zstandard
+
+from pyonda.utils.compression import (
+    set_default_compression_options,
+    DEFAULT_COMPRESSION_OPTIONS,
+)
+from pyonda.utils.zstd_seekable import (
+    encode_seek_table,
+    write_seekable_zst,
+    read_seek_table,
+    decompress_seekable_zst_range,
+)
+
+
+def _read_range_from(content):
+    reads = []
+
+    def read_range(offset, length):
+        reads.append((offset, length))
+        return content[offset : offset + length]
+
+    return read_range, reads
+
+
+@pytest.fixture
+def seekable_content():
+    data = np.arange(1000, dtype=np.int32)
+    buffer = io.BytesIO()
+    write_seekable_zst(np.split(data, 10), buffer)
+    return data, buffer.getvalue()
+
+
+def test_seekable_zst_is_readable_by_standard_decoders(seekable_content):
+    data, content = seekable_content
+    output = io.BytesIO()
+    zstandard.ZstdDecompressor().copy_stream(io.BytesIO(content), output)
+    assert output.getvalue() == data.tobytes()
+
+
+def test_read_seek_table(seekable_content):
+    _, content = seekable_content
+    read_range, _ = _read_range_from(content)
+    seek_table = read_seek_table(read_range, len(content))
+    assert np.array_equal(seek_table.decompressed_offsets, np.arange(0, 4001, 400))
+    assert seek_table.compressed_offsets[-1] == len(content) - len(
+        encode_seek_table([(0, 0)] * 10)
+    )
+
+
+def test_read_seek_table_without_table():
+    content = zstandard.ZstdCompressor().compress(b"some content")
+    read_range, _ = _read_range_from(content)
+    assert read_seek_table(read_range, len(content)) is None
+
+
+def test_decompress_seekable_zst_range(seekable_content):
+    data, content = seekable_content
+    read_range, reads = _read_range_from(content)
+    seek_table = read_seek_table(read_range, len(content))
+    reads.clear()
+
+    decompressed = decompress_seekable_zst_range(read_range, seek_table, 900, 400)
+    assert decompressed == data.tobytes()[900:1300]
+    # only frames 2 and 3 are read, with a single read
+    assert reads == [
+        (
+            int(seek_table.compressed_offsets[2]),
+            int(seek_table.compressed_offsets[4] - seek_table.compressed_offsets[2]),
+        )
+    ]
+
+    with pytest.raises(ValueError):
+        decompress_seekable_zst_range(read_range, seek_table, 3900, 101)
+
+
+@pytest.fixture
+def restore_default_compression_options():
+    yield
+    set_default_compression_options(**DEFAULT_COMPRESSION_OPTIONS)
+
+
+def test_write_seekable_zst_uses_default_compression_options(
+    restore_default_compression_options,
+):
+    chunks = np.split(np.arange(10**5, dtype=np.int32) % 1000, 4)
+    set_default_compression_options(level=19, threads=0)
+    default_buffer = io.BytesIO()
+    write_seekable_zst(chunks, default_buffer)
+    expected_buffer = io.BytesIO()
+    write_seekable_zst(chunks, expected_buffer, zstandard.ZstdCompressor(level=19))
+    assert default_buffer.getvalue() == expected_buffer.getvalue()